@@ -9,7 +9,7 @@ python3 verify.py generate
 
 # Compile the Verilog files
 echo "--- Compiling Verilog files ---"
-iverilog -o tb_brr_pp.vvp ../BitRevReorder.v tb_BRR_PP.v ../buffer.v
+python3 ../tool/vvpcache.py -o tb_brr_pp.vvp ../BitRevReorder.v tb_BRR_PP.v ../buffer.v
 
 # Run the simulation
 echo "--- Running simulation ---"
@@ -18,3 +18,7 @@ vvp tb_brr_pp.vvp
 # # Verify the output
 # echo "--- Verifying output ---"
 # python3 verify.py verify
+
+# Check the write/read handshakes in the waveform (two frames each)
+echo "--- Checking handshakes in tb_brr_pp.vcd ---"
+python3 ../tool/vcd.py tb_brr_pp.vcd --bursts wr_en rd_en --expect-count 2
@@ -20,7 +20,7 @@ fi
 echo ""
 echo "[Step 1] Compiling Verilog files..."
 
-compile_cmd="iverilog -o tb_fake_mem.vvp -g2005-sv ../fake_mem.v tb_fake_mem.v"
+compile_cmd="python3 ../tool/vvpcache.py -o tb_fake_mem.vvp -g2005-sv ../fake_mem.v tb_fake_mem.v"
 
 echo "  Command: $compile_cmd"
 eval $compile_cmd
@@ -44,6 +44,17 @@ fi
 
 echo "  ✓ Simulation completed"
 
+# Check the read enables in the waveform: the sequential/mid/upper reads and
+# the rapid-change reads form two wr_en bursts around the wr_en=0 cycle of Test 4
+echo ""
+echo "[Step 2b] Checking wr_en bursts in tb_fake_mem.vcd..."
+python3 ../tool/vcd.py tb_fake_mem.vcd --bursts tb_fake_mem.wr_en --expect-count 2
+
+if [ $? -ne 0 ]; then
+    echo "Waveform check failed!"
+    exit 1
+fi
+
 # Step 3: Display results
 echo ""
 echo "[Step 3] Test Results:"
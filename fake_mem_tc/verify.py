@@ -2,23 +2,18 @@
 Verify fake_mem testbench output against golden reference
 """
 
+import os
 import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tool'))
+import hexio
 
 def read_hex_file(filename):
     """Read hex values from file, ignoring comments"""
-    values = []
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                line = line.strip()
-                # Skip comments and empty lines
-                if line and not line.startswith('//'):
-                    try:
-                        val = int(line, 16)
-                        values.append(val)
-                    except ValueError:
-                        continue
-        return values
+        values, unknown = hexio.read_hex_columns(filename, ncols=1, width=32,
+                                                 signed=False, return_unknown=True)
+        # Lines with x/z digits are not valid data
+        return values[~unknown].tolist()
     except FileNotFoundError:
         print(f"Error: File '{filename}' not found!")
         return None
@@ -9,7 +9,7 @@ python3 verify_fft.py generate
 
 # Compile the Verilog files
 echo "--- Compiling Verilog files ---"
-iverilog -o tb128.vvp -g2005-sv \
+python3 ../tool/vvpcache.py -o tb128.vvp -g2005-sv \
     ../FFT128.v \
     ../SdfUnit_TC.v \
     ../SdfUnit2.v \
@@ -9,39 +9,26 @@ The FFT uses:
 - Q1.15 fixed-point format
 - Scaling by 1/N
 - Bit-reversed output order
+
+Plots are opt-in (--plot) and rendered in a background process pool
+(tool/plotting.py), by default only when the comparison fails.
 """
 
+import os
+import sys
 import numpy as np
-import matplotlib.pyplot as plt
+from argparse import ArgumentParser
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tool'))
+import batch_compare
+from error_stats import ErrorStats
+import hexio
+import plotting
+import qformat
+import rom_tables
 
 def read_hex_data(filename):
     """Read hex data from file (real, imag pairs)"""
-    data_re = []
-    data_im = []
-    with open(filename, 'r') as f:
-        for line in f:
-            if '//' in line:
-                parts = line.split('//')
-                hex_values = parts[0].strip().split()
-                if len(hex_values) >= 2:
-                    re_val = int(hex_values[0], 16)
-                    im_val = int(hex_values[1], 16)
-                    # Convert to signed 16-bit
-                    if re_val >= 0x8000:
-                        re_val -= 0x10000
-                    if im_val >= 0x8000:
-                        im_val -= 0x10000
-                    data_re.append(re_val)
-                    data_im.append(im_val)
-    return np.array(data_re), np.array(data_im)
-
-def q15_to_float(val):
-    """Convert Q1.15 fixed-point to float"""
-    return val / 32768.0
-
-def float_to_q15(val):
-    """Convert float to Q1.15 fixed-point"""
-    return int(np.round(val * 32768.0))
+    return hexio.read_hex_pairs(filename)
 
 def signed_to_hex(val):
     """Convert signed 16-bit value to hex string"""
@@ -60,23 +47,10 @@ def bit_reverse(n, bits):
 def read_twiddle_factors():
     """
     Read twiddle factors from Twiddle128.v
-    Returns arrays of twiddle factors in Q1.15 format
+    Returns (wn_re, wn_im, known) int16 arrays in Q1.15 format; don't-care
+    (16'hxxxx) entries read 0 with known False
     """
-    # Based on Twiddle128.v comments: wn_re = cos(-2pi*n/128), wn_im = sin(-2pi*n/128)
-    # We'll generate all 128 twiddle factors programmatically
-    N = 128
-    twiddle_re = []
-    twiddle_im = []
-    
-    for n in range(N):
-        # w_n = exp(-j * 2 * pi * n / N)
-        angle = -2 * np.pi * n / N
-        re = np.cos(angle)
-        im = np.sin(angle)
-        twiddle_re.append(re)
-        twiddle_im.append(im)
-    
-    return np.array(twiddle_re), np.array(twiddle_im)
+    return rom_tables.twiddle(128)
 
 def compute_fft_golden(input_re, input_im):
     """
@@ -92,17 +66,17 @@ def compute_fft_golden(input_re, input_im):
         end
     So the output file is in NATURAL order, not bit-reversed order.
     """
-    N = len(input_re)
+    N = np.shape(input_re)[-1]
     
     # Convert Q1.15 to float
-    x_re = q15_to_float(input_re)
-    x_im = q15_to_float(input_im)
+    x_re = qformat.to_float(input_re)
+    x_im = qformat.to_float(input_im)
     
     # Create complex array
     x = x_re + 1j * x_im
     
     # Compute FFT using numpy (natural order output)
-    X = np.fft.fft(x)
+    X = np.fft.fft(x, axis=-1)
     
     # Scale by 1/N (as per README)
     X = X / N
@@ -111,8 +85,8 @@ def compute_fft_golden(input_re, input_im):
     # So we can use X directly
     
     # Convert back to Q1.15
-    output_re = np.array([float_to_q15(np.real(x)) for x in X])
-    output_im = np.array([float_to_q15(np.imag(x)) for x in X])
+    output_re = qformat.quantize(np.real(X))
+    output_im = qformat.quantize(np.imag(X))
     
     return output_re, output_im
 
@@ -121,9 +95,11 @@ def compare_results(golden_re, golden_im, rtl_re, rtl_im, tolerance=2):
     Compare golden reference with RTL output
     tolerance: maximum allowed difference in Q1.15 units
     """
+    golden_re = np.asarray(golden_re)
+    golden_im = np.asarray(golden_im)
+    rtl_re = np.asarray(rtl_re)
+    rtl_im = np.asarray(rtl_im)
     N = len(golden_re)
-    errors = []
-    max_error = 0
     
     print("\n" + "="*80)
     print("VERIFICATION RESULTS")
@@ -131,68 +107,80 @@ def compare_results(golden_re, golden_im, rtl_re, rtl_im, tolerance=2):
     print(f"{'Index':<8} {'Golden (Re,Im)':<25} {'RTL (Re,Im)':<25} {'Error (Re,Im)':<20} {'Status':<10}")
     print("-"*80)
     
-    num_shown = 0
-    for i in range(N):
-        err_re = abs(golden_re[i] - rtl_re[i])
-        err_im = abs(golden_im[i] - rtl_im[i])
-        total_err = max(err_re, err_im)
-        max_error = max(max_error, total_err)
-        
-        status = "PASS" if total_err <= tolerance else "FAIL"
-        
-        # Print entries with significant values or errors (limit output)
-        if (total_err > tolerance or abs(golden_re[i]) > 10 or abs(golden_im[i]) > 10) and num_shown < 20:
-            golden_str = f"{signed_to_hex(golden_re[i])},{signed_to_hex(golden_im[i])}"
-            rtl_str = f"{signed_to_hex(rtl_re[i])},{signed_to_hex(rtl_im[i])}"
-            err_str = f"{err_re},{err_im}"
-            print(f"{i:<8} {golden_str:<25} {rtl_str:<25} {err_str:<20} {status:<10}")
-            num_shown += 1
-            
-        if total_err > tolerance:
-            errors.append({
-                'index': i,
-                'golden': (golden_re[i], golden_im[i]),
-                'rtl': (rtl_re[i], rtl_im[i]),
-                'error': (err_re, err_im)
-            })
+    err_re = np.abs(golden_re - rtl_re)
+    err_im = np.abs(golden_im - rtl_im)
+    total_err = np.maximum(err_re, err_im)
+    max_error = int(total_err.max()) if N else 0
+    failing = total_err > tolerance
+    error_idx = np.flatnonzero(failing)
+    
+    # Print entries with significant values or errors (limit output)
+    shown = failing | (np.abs(golden_re) > 10) | (np.abs(golden_im) > 10)
+    for i in np.flatnonzero(shown)[:20]:
+        status = "FAIL" if failing[i] else "PASS"
+        golden_str = f"{signed_to_hex(golden_re[i])},{signed_to_hex(golden_im[i])}"
+        rtl_str = f"{signed_to_hex(rtl_re[i])},{signed_to_hex(rtl_im[i])}"
+        err_str = f"{err_re[i]},{err_im[i]}"
+        print(f"{i:<8} {golden_str:<25} {rtl_str:<25} {err_str:<20} {status:<10}")
     
     print("-"*80)
     print(f"\nTotal points: {N}")
-    print(f"Maximum error: {max_error} Q1.15 units ({q15_to_float(max_error):.6f} in float)")
-    print(f"Number of mismatches (tolerance={tolerance}): {len(errors)}")
+    print(f"Maximum error: {max_error} Q1.15 units ({qformat.to_float(max_error):.6f} in float)")
+    print(f"Number of mismatches (tolerance={tolerance}): {len(error_idx)}")
+    stats = ErrorStats(n_bins=N, tolerance=tolerance)
+    stats.update(golden_re + 1j * golden_im, rtl_re + 1j * rtl_im)
+    stats.report("Error")
     
-    if len(errors) == 0:
+    if len(error_idx) == 0:
         print("\n✓ VERIFICATION PASSED - All outputs match within tolerance!")
     else:
-        print(f"\n✗ VERIFICATION FAILED - {len(errors)} mismatches found")
+        print(f"\n✗ VERIFICATION FAILED - {len(error_idx)} mismatches found")
         print("\nFirst 10 errors:")
-        for i, err in enumerate(errors[:10]):
-            print(f"  Index {err['index']}: Golden={err['golden']}, RTL={err['rtl']}, Error={err['error']}")
+        for i in error_idx[:10]:
+            print(f"  Index {i}: Golden=({golden_re[i]}, {golden_im[i]}), RTL=({rtl_re[i]}, {rtl_im[i]}), Error=({err_re[i]}, {err_im[i]})")
     
-    return len(errors) == 0, max_error
+    return len(error_idx) == 0, max_error
+
+def compare_batch(golden_re, golden_im, rtl_re, rtl_im, tolerance=2, names=None):
+    """
+    Compare a (frames, N) stack of golden and RTL frames in one vectorized pass
+    Returns (passed, result) where result holds per-frame max error,
+    mismatch counts and mismatch index arrays. Only failing frames are reported,
+    followed by the error statistics and per-bin SQNR of the whole batch.
+    """
+    stats = ErrorStats(tolerance=tolerance)
+    result = batch_compare.compare_frames(golden_re, golden_im, rtl_re, rtl_im, tolerance, stats)
+    passed = batch_compare.report_failures(result, golden_re, golden_im, rtl_re, rtl_im, names)
+    stats.report("Batch error")
+    return passed, result
 
-def plot_comparison(input_re, input_im, golden_re, golden_im, rtl_re, rtl_im):
-    """Plot comparison of input, golden, and RTL outputs"""
+def plot_comparison(input_re, input_im, golden_re, golden_im, rtl_re, rtl_im,
+                    fig_path='fft_verification.png'):
+    """
+    Plot comparison of input, golden, and RTL outputs
+    Runs in a plotting worker process; returns the saved path.
+    """
+    plt = plotting.pyplot()
     N = len(input_re)
     
     fig, axes = plt.subplots(3, 2, figsize=(15, 12))
     
     # Input signal
-    axes[0, 0].plot(q15_to_float(input_re), 'b.-', linewidth=1, markersize=3)
+    axes[0, 0].plot(qformat.to_float(input_re), 'b.-', linewidth=1, markersize=3)
     axes[0, 0].set_title('Input Signal - Real Part')
     axes[0, 0].set_xlabel('Sample Index')
     axes[0, 0].set_ylabel('Amplitude')
     axes[0, 0].grid(True, alpha=0.3)
     
-    axes[0, 1].plot(q15_to_float(input_im), 'r.-', linewidth=1, markersize=3)
+    axes[0, 1].plot(qformat.to_float(input_im), 'r.-', linewidth=1, markersize=3)
     axes[0, 1].set_title('Input Signal - Imaginary Part')
     axes[0, 1].set_xlabel('Sample Index')
     axes[0, 1].set_ylabel('Amplitude')
     axes[0, 1].grid(True, alpha=0.3)
     
     # FFT Magnitude
-    golden_mag = np.sqrt(q15_to_float(golden_re)**2 + q15_to_float(golden_im)**2)
-    rtl_mag = np.sqrt(q15_to_float(rtl_re)**2 + q15_to_float(rtl_im)**2)
+    golden_mag = np.sqrt(qformat.to_float(golden_re)**2 + qformat.to_float(golden_im)**2)
+    rtl_mag = np.sqrt(qformat.to_float(rtl_re)**2 + qformat.to_float(rtl_im)**2)
     
     axes[1, 0].plot(golden_mag, 'g.-', label='Golden', linewidth=1, markersize=3)
     axes[1, 0].plot(rtl_mag, 'b.--', label='RTL', linewidth=1, markersize=2, alpha=0.7)
@@ -203,8 +191,8 @@ def plot_comparison(input_re, input_im, golden_re, golden_im, rtl_re, rtl_im):
     axes[1, 0].grid(True, alpha=0.3)
     
     # FFT Phase
-    golden_phase = np.angle(q15_to_float(golden_re) + 1j*q15_to_float(golden_im))
-    rtl_phase = np.angle(q15_to_float(rtl_re) + 1j*q15_to_float(rtl_im))
+    golden_phase = np.angle(qformat.to_float(golden_re) + 1j*qformat.to_float(golden_im))
+    rtl_phase = np.angle(qformat.to_float(rtl_re) + 1j*qformat.to_float(rtl_im))
     
     axes[1, 1].plot(golden_phase, 'g.-', label='Golden', linewidth=1, markersize=3)
     axes[1, 1].plot(rtl_phase, 'b.--', label='RTL', linewidth=1, markersize=2, alpha=0.7)
@@ -231,11 +219,11 @@ def plot_comparison(input_re, input_im, golden_re, golden_im, rtl_re, rtl_im):
     axes[2, 1].grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig('fft_verification.png', dpi=150)
-    print("\nPlot saved as 'fft_verification.png'")
-    plt.show()
+    plt.savefig(fig_path, dpi=150)
+    plt.close(fig)
+    return fig_path
 
-def main():
+def main(plot=None):
     print("="*80)
     print("128-Point FFT Verification")
     print("="*80)
@@ -269,8 +257,11 @@ def main():
     passed, max_error = compare_results(golden_re, golden_im, rtl_re, rtl_im, tolerance=2)
     
     # Plot results
-    print("\n[5/5] Generating comparison plots...")
-    plot_comparison(input_re, input_im, golden_re, golden_im, rtl_re, rtl_im)
+    if plot == 'all' or (plot and not passed):
+        print("\n[5/5] Generating comparison plots in the background...")
+        plotting.submit(plot_comparison, input_re, input_im, golden_re, golden_im, rtl_re, rtl_im)
+    else:
+        print("\n[5/5] Plots skipped" + ("" if plot else " (use --plot)"))
     
     # Summary
     print("\n" + "="*80)
@@ -278,13 +269,60 @@ def main():
     print("="*80)
     if passed:
         print("✓ FFT implementation verification PASSED")
-        print(f"  Maximum error: {max_error} Q1.15 units ({q15_to_float(max_error):.6f} in float)")
+        print(f"  Maximum error: {max_error} Q1.15 units ({qformat.to_float(max_error):.6f} in float)")
     else:
         print("✗ FFT implementation verification FAILED")
-        print(f"  Maximum error: {max_error} Q1.15 units ({q15_to_float(max_error):.6f} in float)")
+        print(f"  Maximum error: {max_error} Q1.15 units ({qformat.to_float(max_error):.6f} in float)")
     print("="*80)
     
     return passed
 
+def verify_batch(input_pths, output_pths, tolerance=2, plot=None):
+    """
+    Verify several input/output vector pairs as one (frames, 128) batch
+    plot: None, 'fail' (plot failing frames) or 'all'
+    """
+    print("="*80)
+    print(f"128-Point FFT Batch Verification ({len(input_pths)} frames)")
+    print("="*80)
+    input_frames = [read_hex_data(pth) for pth in input_pths]
+    rtl_frames = [read_hex_data(pth) for pth in output_pths]
+    input_re = np.stack([re for re, _ in input_frames])
+    input_im = np.stack([im for _, im in input_frames])
+    rtl_re = np.stack([re for re, _ in rtl_frames])
+    rtl_im = np.stack([im for _, im in rtl_frames])
+
+    golden_re, golden_im = compute_fft_golden(input_re, input_im)
+    passed, result = compare_batch(golden_re, golden_im, rtl_re, rtl_im,
+                                   tolerance=tolerance, names=list(output_pths))
+    if plot:
+        frames = range(len(output_pths)) if plot == 'all' else plotting.failing_frames(result)
+        for f in frames:
+            name = os.path.splitext(os.path.basename(output_pths[f]))[0]
+            plotting.submit(plot_comparison, input_re[f], input_im[f], golden_re[f], golden_im[f],
+                            rtl_re[f], rtl_im[f], f'fft_verification_{name}.png')
+    print("\n" + "="*80)
+    print("✓ Batch verification PASSED" if passed else "✗ Batch verification FAILED")
+    print("="*80)
+    return passed
+
 if __name__ == "__main__":
-    main()
+    parser = ArgumentParser(description="Verify 128-point FFT implementation")
+    parser.add_argument('--batch-inputs', type=str, nargs='+', default=None, help=
+                        "Input files verified together as one batch (with --batch-outputs)")
+    parser.add_argument('--batch-outputs', type=str, nargs='+', default=None, help=
+                        "RTL output files matching --batch-inputs")
+    parser.add_argument('--tolerance', type=int, default=2, help=
+                        "Allowed error in Q1.15 units for --batch-inputs (default: 2)")
+    parser.add_argument('--plot', nargs='?', const='fail', choices=['fail', 'all'], default=None, help=
+                        "Render comparison plots in the background: on failure (default) or always")
+    args = parser.parse_args()
+    if args.batch_inputs:
+        if not args.batch_outputs or len(args.batch_inputs) != len(args.batch_outputs):
+            parser.error("--batch-inputs and --batch-outputs must have the same length")
+        passed = verify_batch(args.batch_inputs, args.batch_outputs,
+                              tolerance=args.tolerance, plot=args.plot)
+        plotting.wait()
+        sys.exit(0 if passed else 1)
+    main(plot=args.plot)
+    plotting.wait()
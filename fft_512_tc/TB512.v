@@ -77,6 +77,8 @@ end
 //----------------------------------------------------------------------
 //	Tasks
 //----------------------------------------------------------------------
+`include "vecbin.vh"
+
 task LoadInputData;
 	input[80*8:1]	filename;
 begin
@@ -113,6 +115,35 @@ begin
 end
 endtask
 
+//	Binary vector files (tool/vecbin.vh): real plane, then imaginary plane
+task LoadInputBinary;
+	input integer	fd;
+	integer			n, p;
+begin
+	for (p = 0; p < 2; p = p + 1)
+		for (n = 0; n < N; n = n + 2)
+			VecbinReadPair(fd, imem[2*n+p], imem[2*n+2+p]);
+end
+endtask
+
+task SaveOutputBinary;
+	input integer	fd;
+	integer			n, k, m0, m1, i, p;
+begin
+	for (p = 0; p < 2; p = p + 1)
+		for (n = 0; n < N; n = n + 2) begin
+			k = n + 1;
+			m0 = 0;
+			m1 = 0;
+			for (i = 0; i < NN; i = i + 1) begin
+				m0[NN-1-i] = n[i];
+				m1[NN-1-i] = k[i];
+			end
+			VecbinWritePair(fd, omem[2*m0+p], omem[2*m1+p]);
+		end
+end
+endtask
+
 //----------------------------------------------------------------------
 //	Module Instances
 //----------------------------------------------------------------------
@@ -11,21 +11,34 @@ Supported test vectors:
 4. Multi-tone - Sum of multiple frequencies
 5. Chirp - Frequency sweep
 6. Random noise - White noise
+
+With --pack the real standard vectors are also written in packed mode: two
+real frames per vector, the first in re and the second in im (see
+tool/pack_model.py for the spectrum split).
 """
 
+import os
+import hashlib
+import inspect
+import json
 import numpy as np
 import argparse
 import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tool'))
+import hexio
+import pack_model
+import qformat
+import vecbin
 
-def float_to_q15(val):
-    """Convert float to Q1.15 fixed-point"""
-    # Clamp to valid range
-    val = np.clip(val, -1.0, 0.99997)
-    return int(np.round(val * 32768.0))
-
-def q15_to_float(val):
-    """Convert Q1.15 fixed-point to float"""
-    return val / 32768.0
+def quantize_q15(values, rounding='even'):
+    """
+    Vectorized float -> Q1.15 conversion (qformat), saturated to [-1.0, 1 - 2^-15]
+    rounding: 'even' rounds half to even (np.round), 'up' rounds half up
+    (floor(x + 0.5), as tool/twiddle.py does)
+    """
+    if rounding not in ('even', 'up'):
+        raise ValueError(f"Unknown rounding mode: {rounding}")
+    return qformat.quantize(values, 16, 15, 'even' if rounding == 'even' else 'half_up')
 
 def signed_to_hex(val):
     """Convert signed 16-bit value to hex string"""
@@ -35,33 +48,32 @@ def signed_to_hex(val):
 
 def save_test_vector(filename, data_re, data_im, description=""):
     """Save test vector to hex file"""
-    N = len(data_re)
-    with open(filename, 'w') as f:
-        if description:
-            f.write(f"// {description}\n")
-        for i in range(N):
-            f.write(f"{signed_to_hex(data_re[i])}  {signed_to_hex(data_im[i])}  // {i}\n")
+    # Formatted in one vectorized pass and written to a temporary file first
+    # so parallel readers never see a partial file
+    tmp = f"{filename}.{os.getpid()}.tmp"
+    hexio.write_hex_pairs(tmp, data_re, data_im, description=description)
+    os.replace(tmp, filename)
     print(f"Generated: {filename} - {description}")
 
 def generate_dc_impulse(N=512, amplitude=0.99):
     """Generate DC impulse (delta function at t=0)"""
     data_re = np.zeros(N, dtype=int)
     data_im = np.zeros(N, dtype=int)
-    data_re[0] = float_to_q15(amplitude)
+    data_re[0] = int(quantize_q15(amplitude))
     return data_re, data_im
 
 def generate_impulse(N=512, position=0, amplitude=0.99):
     """Generate impulse at specified position"""
     data_re = np.zeros(N, dtype=int)
     data_im = np.zeros(N, dtype=int)
-    data_re[position] = float_to_q15(amplitude)
+    data_re[position] = int(quantize_q15(amplitude))
     return data_re, data_im
 
 def generate_sine_wave(N=512, freq_bin=10, amplitude=0.8, phase=0.0):
     """Generate real sine wave at specified frequency bin"""
     t = np.arange(N)
     sine_wave = amplitude * np.sin(2 * np.pi * freq_bin * t / N + phase)
-    data_re = np.array([float_to_q15(x) for x in sine_wave])
+    data_re = quantize_q15(sine_wave)
     data_im = np.zeros(N, dtype=int)
     return data_re, data_im
 
@@ -69,7 +81,7 @@ def generate_cosine_wave(N=512, freq_bin=10, amplitude=0.8, phase=0.0):
     """Generate real cosine wave at specified frequency bin"""
     t = np.arange(N)
     cosine_wave = amplitude * np.cos(2 * np.pi * freq_bin * t / N + phase)
-    data_re = np.array([float_to_q15(x) for x in cosine_wave])
+    data_re = quantize_q15(cosine_wave)
     data_im = np.zeros(N, dtype=int)
     return data_re, data_im
 
@@ -79,8 +91,8 @@ def generate_complex_tone(N=512, freq_bin=20, amplitude=0.7):
     angle = 2 * np.pi * freq_bin * t / N
     real_part = amplitude * np.cos(angle)
     imag_part = amplitude * np.sin(angle)
-    data_re = np.array([float_to_q15(x) for x in real_part])
-    data_im = np.array([float_to_q15(x) for x in imag_part])
+    data_re = quantize_q15(real_part)
+    data_im = quantize_q15(imag_part)
     return data_re, data_im
 
 def generate_multi_tone(N=512, freq_bins=[10, 30, 50], amplitudes=None):
@@ -94,7 +106,7 @@ def generate_multi_tone(N=512, freq_bins=[10, 30, 50], amplitudes=None):
     for freq_bin, amp in zip(freq_bins, amplitudes):
         signal += amp * np.sin(2 * np.pi * freq_bin * t / N)
     
-    data_re = np.array([float_to_q15(x) for x in signal])
+    data_re = quantize_q15(signal)
     data_im = np.zeros(N, dtype=int)
     return data_re, data_im
 
@@ -106,7 +118,7 @@ def generate_chirp(N=512, f_start=0, f_end=100, amplitude=0.6):
     phase = 2 * np.pi * (f_start * t + 0.5 * k * t**2) / N
     chirp_signal = amplitude * np.sin(phase)
     
-    data_re = np.array([float_to_q15(x) for x in chirp_signal])
+    data_re = quantize_q15(chirp_signal)
     data_im = np.zeros(N, dtype=int)
     return data_re, data_im
 
@@ -116,7 +128,7 @@ def generate_noise(N=512, amplitude=0.3, seed=42):
     noise = amplitude * np.random.randn(N)
     noise = np.clip(noise, -1.0, 0.99997)
     
-    data_re = np.array([float_to_q15(x) for x in noise])
+    data_re = quantize_q15(noise)
     data_im = np.zeros(N, dtype=int)
     return data_re, data_im
 
@@ -128,8 +140,8 @@ def generate_complex_noise(N=512, amplitude=0.3, seed=42):
     noise_re = np.clip(noise_re, -1.0, 0.99997)
     noise_im = np.clip(noise_im, -1.0, 0.99997)
     
-    data_re = np.array([float_to_q15(x) for x in noise_re])
-    data_im = np.array([float_to_q15(x) for x in noise_im])
+    data_re = quantize_q15(noise_re)
+    data_im = quantize_q15(noise_im)
     return data_re, data_im
 
 def generate_square_wave(N=512, freq_bin=8, amplitude=0.8):
@@ -138,7 +150,7 @@ def generate_square_wave(N=512, freq_bin=8, amplitude=0.8):
     period = N / freq_bin
     square = amplitude * np.sign(np.sin(2 * np.pi * freq_bin * t / N))
     
-    data_re = np.array([float_to_q15(x) for x in square])
+    data_re = quantize_q15(square)
     data_im = np.zeros(N, dtype=int)
     return data_re, data_im
 
@@ -148,14 +160,83 @@ def generate_sawtooth_wave(N=512, freq_bin=8, amplitude=0.7):
     period = N / freq_bin
     sawtooth = amplitude * (2 * ((t % period) / period) - 1)
     
-    data_re = np.array([float_to_q15(x) for x in sawtooth])
+    data_re = quantize_q15(sawtooth)
     data_im = np.zeros(N, dtype=int)
     return data_re, data_im
 
-def generate_all_standard_vectors():
-    input_dir = "input_iverilog"
-    """Generate all standard test vectors"""
-    N = 512
+INPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "input_iverilog")
+MANIFEST = "manifest.json"
+STANDARD_N = 512
+
+# (file, generator, parameters, description) of the standard test vectors
+STANDARD_VECTORS = [
+    ("input1.txt", generate_dc_impulse, dict(amplitude=0.99),
+     "Test 1: DC Impulse (delta at n=0)"),
+    ("input2.txt", generate_sine_wave, dict(freq_bin=10, amplitude=0.8),
+     "Test 2: Sine wave at frequency bin 10"),
+    ("input3.txt", generate_complex_tone, dict(freq_bin=20, amplitude=0.7),
+     "Test 3: Complex exponential at bin 20"),
+    ("input4.txt", generate_multi_tone, dict(freq_bins=[5, 15, 25, 50],
+                                             amplitudes=[0.25, 0.25, 0.25, 0.25]),
+     "Test 4: Multi-tone (bins 5, 15, 25, 50)"),
+    ("input5.txt", generate_noise, dict(amplitude=0.3, seed=42),
+     "Test 5: White noise (seed=42)"),
+    ("input6.txt", generate_sine_wave, dict(freq_bin=STANDARD_N // 2, amplitude=0.8),
+     f"Test 6: Nyquist frequency (bin {STANDARD_N // 2})"),
+    ("input7.txt", generate_chirp, dict(f_start=0, f_end=100, amplitude=0.6),
+     "Test 7: Linear chirp (0 to 100 bins)"),
+    ("input8.txt", generate_cosine_wave, dict(freq_bin=30, amplitude=0.8),
+     "Test 8: Cosine wave at frequency bin 30"),
+]
+
+def vector_hash(generator, params, N=STANDARD_N):
+    """
+    Hash of everything a vector file depends on: generator code, N and
+    parameters, the Q1.15 quantizer and the qformat/hexio modules behind
+    the sample values and the file format
+    """
+    h = hashlib.sha256()
+    h.update(inspect.getsource(generator).encode())
+    h.update(inspect.getsource(save_test_vector).encode())
+    h.update(inspect.getsource(quantize_q15).encode())
+    for module in (qformat, hexio):
+        h.update(inspect.getsource(module).encode())
+    h.update(json.dumps({'N': N, 'params': params}, sort_keys=True).encode())
+    return h.hexdigest()
+
+def load_manifest(input_dir=INPUT_DIR):
+    try:
+        with open(os.path.join(input_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_manifest(manifest, input_dir):
+    tmp = os.path.join(input_dir, f"{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(input_dir, MANIFEST))
+
+def generate_all_standard_vectors(input_dir=INPUT_DIR, force=False):
+    """
+    Generate the standard test vectors, rebuilding only files whose
+    generator, parameters or seed changed since the manifest was written
+    Returns the number of files rebuilt.
+    """
+    N = STANDARD_N
+    os.makedirs(input_dir, exist_ok=True)
+    manifest = {} if force else load_manifest(input_dir)
+    hashes = {}
+    stale = []
+    for name, generator, params, _ in STANDARD_VECTORS:
+        hashes[name] = vector_hash(generator, params, N)
+        if manifest.get(name) != hashes[name] or not os.path.exists(os.path.join(input_dir, name)):
+            stale.append(name)
+    hashes["input.bin"] = hashlib.sha256("".join(hashes.values()).encode()).hexdigest()
+    bin_stale = (manifest.get("input.bin") != hashes["input.bin"]
+                 or not os.path.exists(os.path.join(input_dir, "input.bin")))
+    if not stale and not bin_stale:
+        return 0
     
     print("="*80)
     print("Generating FFT512 Standard Test Vectors")
@@ -165,51 +246,53 @@ def generate_all_standard_vectors():
     print("="*80)
     print()
     
-    # Test 1: DC Impulse
-    data_re, data_im = generate_dc_impulse(N, amplitude=0.99)
-    save_test_vector(f"{input_dir}/input1.txt", data_re, data_im, 
-                     "Test 1: DC Impulse (delta at n=0)")
+    frames = []
+    for name, generator, params, description in STANDARD_VECTORS:
+        data_re, data_im = generator(N, **params)
+        frames.append((data_re, data_im))
+        if name in stale:
+            save_test_vector(os.path.join(input_dir, name), data_re, data_im, description)
+        else:
+            print(f"Up to date: {name}")
     
-    # Test 2: Sine wave at bin 10
-    data_re, data_im = generate_sine_wave(N, freq_bin=10, amplitude=0.8)
-    save_test_vector(f"{input_dir}/input2.txt", data_re, data_im, 
-                     "Test 2: Sine wave at frequency bin 10")
-    
-    # Test 3: Complex tone at bin 20
-    data_re, data_im = generate_complex_tone(N, freq_bin=20, amplitude=0.7)
-    save_test_vector(f"{input_dir}/input3.txt", data_re, data_im, 
-                     "Test 3: Complex exponential at bin 20")
-    
-    # Test 4: Multi-tone signal
-    data_re, data_im = generate_multi_tone(N, freq_bins=[5, 15, 25, 50], 
-                                           amplitudes=[0.25, 0.25, 0.25, 0.25])
-    save_test_vector(f"{input_dir}/input4.txt", data_re, data_im, 
-                     "Test 4: Multi-tone (bins 5, 15, 25, 50)")
-    
-    # Test 5: White noise
-    data_re, data_im = generate_noise(N, amplitude=0.3, seed=42)
-    save_test_vector(f"{input_dir}/input5.txt", data_re, data_im, 
-                     "Test 5: White noise (seed=42)")
-    
-    # Test 6: Nyquist frequency (bin N/2)
-    data_re, data_im = generate_sine_wave(N, freq_bin=N//2, amplitude=0.8)
-    save_test_vector(f"{input_dir}/input6.txt", data_re, data_im, 
-                     f"Test 6: Nyquist frequency (bin {N//2})")
-    
-    # Test 7: Chirp signal
-    data_re, data_im = generate_chirp(N, f_start=0, f_end=100, amplitude=0.6)
-    save_test_vector(f"{input_dir}/input7.txt", data_re, data_im, 
-                     "Test 7: Linear chirp (0 to 100 bins)")
-    
-    # Test 8: Cosine wave at bin 30
-    data_re, data_im = generate_cosine_wave(N, freq_bin=30, amplitude=0.8)
-    save_test_vector(f"{input_dir}/input8.txt", data_re, data_im, 
-                     "Test 8: Cosine wave at frequency bin 30")
+    # All frames in one binary vector file for BIN_VECTORS runs
+    if bin_stale:
+        bin_pth = os.path.join(input_dir, "input.bin")
+        tmp = f"{bin_pth}.{os.getpid()}.tmp"
+        vecbin.write_vectors(tmp, np.stack([re for re, _ in frames]),
+                             np.stack([im for _, im in frames]))
+        os.replace(tmp, bin_pth)
+        print(f"Generated: {bin_pth} - {len(frames)} frames (binary)")
+    _write_manifest(hashes, input_dir)
     
     print()
     print("="*80)
     print("✓ All standard test vectors generated successfully!")
     print("="*80)
+    return len(stale) + bin_stale
+
+def generate_packed_vectors(input_dir=INPUT_DIR):
+    """
+    Packed-mode stimulus: the real standard vectors (data_im all zero) in
+    pairs, the first in re and the second in im (an odd one pairs with
+    zeros), written to packed1.txt, packed2.txt, ...
+    Returns the number of files written.
+    """
+    N = STANDARD_N
+    os.makedirs(input_dir, exist_ok=True)
+    names, frames = [], []
+    for name, generator, params, _ in STANDARD_VECTORS:
+        data_re, data_im = generator(N, **params)
+        if not np.any(data_im):
+            names.append(name)
+            frames.append(data_re)
+    packed_re, packed_im = pack_model.pack_frames(frames)
+    names.append("zeros")
+    for i, (data_re, data_im) in enumerate(zip(packed_re, packed_im)):
+        description = f"Packed: {names[2 * i]} (re) + {names[2 * i + 1]} (im)"
+        save_test_vector(os.path.join(input_dir, f"packed{i + 1}.txt"),
+                         data_re, data_im, description)
+    return len(packed_re)
 
 def main():
     parser = argparse.ArgumentParser(
@@ -218,6 +301,7 @@ def main():
         epilog="""
 Examples:
   python generate_data.py                    # Generate all standard vectors
+  python generate_data.py --pack             # ... plus packed real-input vectors
   python generate_data.py --type sine --bin 15 --output input_sine.txt
   python generate_data.py --type impulse --pos 10 --output input_impulse.txt
   python generate_data.py --type multi --bins 5 10 20 --output input_multi.txt
@@ -241,11 +325,19 @@ Examples:
                        help='Output filename (default: auto-generated)')
     parser.add_argument('--seed', type=int, default=42,
                        help='Random seed for noise (default: 42)')
+    parser.add_argument('--force', action='store_true',
+                       help='Rebuild all standard vectors even if the manifest is current')
+    parser.add_argument('--pack', action='store_true',
+                       help='Also write the real standard vectors packed two per frame')
     
     args = parser.parse_args()
     
     if args.type == 'all':
-        generate_all_standard_vectors()
+        if generate_all_standard_vectors(force=args.force) == 0:
+            print("All standard vectors are up to date (see input_iverilog/manifest.json)")
+        if args.pack:
+            count = generate_packed_vectors()
+            print(f"\n✓ {count} packed vectors generated")
         return
     
     N = args.size
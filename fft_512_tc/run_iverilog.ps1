@@ -2,7 +2,7 @@
 # Author: Auto-generated
 # Date: November 12, 2025
 Write-Host '--- Generating test data ---'
-python verify_fft.py generate
+python generate_data.py
 
 
 Write-Host "====================================" -ForegroundColor Cyan
@@ -31,7 +31,7 @@ Write-Host ""
 
 # Compile the design
 Write-Host "[Step 2] Compiling Verilog files..." -ForegroundColor Yellow
-$compile_cmd = "iverilog -o tb512.vvp -g2005-sv " +
+$compile_cmd = "iverilog -o tb512.vvp -g2005-sv -I..\tool " +
     "..\FFT512.v " +
     "..\SdfUnit.v " +
     "..\SdfUnit2.v " +
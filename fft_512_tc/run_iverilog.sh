@@ -4,7 +4,7 @@
 # Date: November 12, 2025
 
 echo '--- Generating test data ---'
-python3 verify_fft.py generate
+python3 generate_data.py
 
 echo "===================================="
 echo "FFT512 Testbench - Icarus Verilog"
@@ -19,9 +19,16 @@ echo "[Step 1] Cleaning up previous simulation files..."
 rm -f tb512.vvp output1.txt output2.txt
 echo ""
 
+# BIN_VECTORS=1 streams all frames through input_iverilog/input.bin and
+# output_iverilog/output.bin instead of the per-test text files
+DEFINES=""
+if [ -n "$BIN_VECTORS" ]; then
+    DEFINES="-DBIN_VECTORS"
+fi
+
 # Compile the design
 echo "[Step 2] Compiling Verilog files..."
-iverilog -o tb512.vvp -g2005-sv \
+python3 ../tool/vvpcache.py -o tb512.vvp -g2005-sv -I../tool $DEFINES \
     ../FFT512.v \
     ../SdfUnit.v \
     ../SdfUnit2.v \
@@ -57,24 +64,10 @@ echo ""
 # Check results
 echo "[Step 4] Checking results..."
 success=true
-INPUT_DIR="input_iverilog"
-OUTPUT_DIR="output_iverilog"
-
-
-for i in {1..8}; do
-    input_file="${INPUT_DIR}/input${i}.txt"
-    output_file="${OUTPUT_DIR}/output${i}.txt"
 
-    if [ -f "$output_file" ]; then
-        size=$(stat -f%z "$output_file" 2>/dev/null || stat -c%s "$output_file" 2>/dev/null)
-        echo "  [OK] $output_file generated ($size bytes)"
-        echo "--- Verifying bit-reversal of FFT output ---"
-        python3 verify_fft.py --input-pth "$input_file" --output-pth "$output_file"
-    else
-        echo "  [FAIL] $output_file not found!"
-        success=false
-    fi
-done
+# All input/output pairs (and output.bin for BIN_VECTORS runs) are verified
+# in parallel by the shared regression runner
+python3 ../tool/regress.py --tc fft_512_tc || success=false
 echo ""
 
 # Final status
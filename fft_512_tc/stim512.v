@@ -2,6 +2,45 @@
 //	Test Stimuli for FFT512
 //----------------------------------------------------------------------
 
+`ifdef BIN_VECTORS
+//	All frames streamed from one binary vector file
+initial begin : STIM
+	integer	fi, fo, n_in, frames, fin, fout;
+	frames = 0;
+	wait (reset == 1);
+	wait (reset == 0);
+	repeat(10) @(posedge clock);
+
+	fi = $fopen("input_iverilog/input.bin", "rb");
+	fo = $fopen("output_iverilog/output.bin", "wb");
+	VecbinReadHeader(fi, n_in, frames);
+	if (n_in != N) $display("[ERROR] input.bin holds %0d-point frames", n_in);
+	VecbinWriteHeader(fo, N, frames);
+
+	fork
+		begin
+			for (fin = 0; fin < frames; fin = fin + 1) begin
+				LoadInputBinary(fi);
+				GenerateInputWave;
+				@(posedge clock);
+			end
+		end
+		begin
+			for (fout = 0; fout < frames; fout = fout + 1) begin
+				wait (do_en == 1);
+				repeat(N) @(posedge clock);
+				SaveOutputBinary(fo);
+				@(negedge clock);
+			end
+		end
+	join
+
+	$fclose(fi);
+	$fclose(fo);
+	repeat(10) @(posedge clock);
+	$finish;
+end
+`else
 initial begin : STIM
 	wait (reset == 1);
 	wait (reset == 0);
@@ -73,8 +112,14 @@ initial begin : STIM
 	repeat(10) @(posedge clock);
 	$finish;
 end
+`endif
 initial begin : TIMEOUT
+`ifdef BIN_VECTORS
+	wait (STIM.frames > 0);
+	repeat((STIM.frames + 4) * 2 * N) @(posedge clock);
+`else
 	repeat(5000) #20;	//  5000 Clock Cycle Time (increased for 512-point FFT)
+`endif
 	$display("[FAILED] Simulation timed out.");
 	$finish;
 end
@@ -9,41 +9,43 @@ The FFT uses:
 - Q1.15 fixed-point format
 - Scaling by 1/N
 - Bit-reversed output order
+
+The default golden reference is the bit-accurate model in tool/fft_model.py,
+which reproduces the SDF pipeline arithmetic and is compared with tolerance 0.
+The float NumPy reference (tolerance 2) is kept for cross-checking.
+Plots are opt-in (--plot) and rendered in a background process pool
+(tool/plotting.py), by default only for failing frames.
 """
 
+import os
+import sys
 import numpy as np
-import matplotlib.pyplot as plt
 from argparse import ArgumentParser
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tool'))
+import fft_model
+import batch_compare
+from error_stats import ErrorStats
+import hexio
+import plotting
+import qformat
+import rom_tables
+import vecbin
+import generate_data
 VIVADO = False
 
 def read_hex_data(filename):
     """Read hex data from file (real, imag pairs)"""
-    data_re = []
-    data_im = []
-    with open(filename, 'r') as f:
-        for line in f:
-            if '//' in line:
-                parts = line.split('//')
-                hex_values = parts[0].strip().split()
-                if len(hex_values) >= 2:
-                    re_val = int(hex_values[0], 16)
-                    im_val = int(hex_values[1], 16)
-                    # Convert to signed 16-bit
-                    if re_val >= 0x8000:
-                        re_val -= 0x10000
-                    if im_val >= 0x8000:
-                        im_val -= 0x10000
-                    data_re.append(re_val)
-                    data_im.append(im_val)
-    return np.array(data_re), np.array(data_im)
-
-def q15_to_float(val):
-    """Convert Q1.15 fixed-point to float"""
-    return val / 32768.0
+    return hexio.read_hex_pairs(filename)
 
-def float_to_q15(val):
-    """Convert float to Q1.15 fixed-point"""
-    return int(np.round(val * 32768.0))
+def read_frames(filename):
+    """
+    Read a vector file as (frames, N) arrays
+    .bin files (tool/vecbin.py) are memory-mapped, text files hold one frame
+    """
+    if filename.endswith('.bin'):
+        return vecbin.read_vectors(filename)
+    data_re, data_im = read_hex_data(filename)
+    return data_re[np.newaxis], data_im[np.newaxis]
 
 def signed_to_hex(val):
     """Convert signed 16-bit value to hex string"""
@@ -62,23 +64,10 @@ def bit_reverse(n, bits):
 def read_twiddle_factors():
     """
     Read twiddle factors from Twiddle512.v
-    Returns arrays of twiddle factors in Q1.15 format
+    Returns (wn_re, wn_im, known) int16 arrays in Q1.15 format; don't-care
+    (16'hxxxx) entries read 0 with known False
     """
-    # Based on Twiddle512.v comments: wn_re = cos(-2pi*n/512), wn_im = sin(-2pi*n/512)
-    # We'll generate all 512 twiddle factors programmatically
-    N = 512
-    twiddle_re = []
-    twiddle_im = []
-    
-    for n in range(N):
-        # w_n = exp(-j * 2 * pi * n / N)
-        angle = -2 * np.pi * n / N
-        re = np.cos(angle)
-        im = np.sin(angle)
-        twiddle_re.append(re)
-        twiddle_im.append(im)
-    
-    return np.array(twiddle_re), np.array(twiddle_im)
+    return rom_tables.twiddle(512)
 
 def compute_fft_golden(input_re, input_im):
     """
@@ -94,17 +83,17 @@ def compute_fft_golden(input_re, input_im):
         end
     So the output file is in NATURAL order, not bit-reversed order.
     """
-    N = len(input_re)
+    N = np.shape(input_re)[-1]
     
     # Convert Q1.15 to float
-    x_re = q15_to_float(input_re)
-    x_im = q15_to_float(input_im)
+    x_re = qformat.to_float(input_re)
+    x_im = qformat.to_float(input_im)
     
     # Create complex array
     x = x_re + 1j * x_im
     
     # Compute FFT using numpy (natural order output)
-    X = np.fft.fft(x)
+    X = np.fft.fft(x, axis=-1)
     
     # Scale by 1/N (as per README)
     X = X / N
@@ -113,19 +102,28 @@ def compute_fft_golden(input_re, input_im):
     # So we can use X directly
     
     # Convert back to Q1.15
-    output_re = np.array([float_to_q15(np.real(x)) for x in X])
-    output_im = np.array([float_to_q15(np.imag(x)) for x in X])
+    output_re = qformat.quantize(np.real(X))
+    output_im = qformat.quantize(np.imag(X))
     
     return output_re, output_im
 
+def compute_fft_bittrue(input_re, input_im):
+    """
+    Compute bit-accurate golden reference with the fixed-point SDF model
+    Accepts a single frame or a (frames, 512) stack; output in natural order
+    """
+    return fft_model.fft_fixed(input_re, input_im)
+
 def compare_results(golden_re, golden_im, rtl_re, rtl_im, tolerance=2):
     """
     Compare golden reference with RTL output
     tolerance: maximum allowed difference in Q1.15 units
     """
+    golden_re = np.asarray(golden_re)
+    golden_im = np.asarray(golden_im)
+    rtl_re = np.asarray(rtl_re)
+    rtl_im = np.asarray(rtl_im)
     N = len(golden_re)
-    errors = []
-    max_error = 0
     
     print("\n" + "="*80)
     print("VERIFICATION RESULTS")
@@ -133,71 +131,86 @@ def compare_results(golden_re, golden_im, rtl_re, rtl_im, tolerance=2):
     print(f"{'Index':<8} {'Golden (Re,Im)':<25} {'RTL (Re,Im)':<25} {'Error (Re,Im)':<20} {'Status':<10}")
     print("-"*80)
     
-    num_shown = 0
-    for i in range(N):
-        err_re = abs(golden_re[i] - rtl_re[i])
-        err_im = abs(golden_im[i] - rtl_im[i])
-        total_err = max(err_re, err_im)
-        max_error = max(max_error, total_err)
-        
-        status = "PASS" if total_err <= tolerance else "FAIL"
-        
-        # Print entries with significant values or errors (limit output)
-        if (total_err > tolerance or abs(golden_re[i]) > 10 or abs(golden_im[i]) > 10) and num_shown < 20:
-            golden_str = f"{signed_to_hex(golden_re[i])},{signed_to_hex(golden_im[i])}"
-            rtl_str = f"{signed_to_hex(rtl_re[i])},{signed_to_hex(rtl_im[i])}"
-            err_str = f"{err_re},{err_im}"
-            print(f"{i:<8} {golden_str:<25} {rtl_str:<25} {err_str:<20} {status:<10}")
-            num_shown += 1
-            
-        if total_err > tolerance:
-            errors.append({
-                'index': i,
-                'golden': (golden_re[i], golden_im[i]),
-                'rtl': (rtl_re[i], rtl_im[i]),
-                'error': (err_re, err_im)
-            })
+    err_re = np.abs(golden_re - rtl_re)
+    err_im = np.abs(golden_im - rtl_im)
+    total_err = np.maximum(err_re, err_im)
+    max_error = int(total_err.max()) if N else 0
+    failing = total_err > tolerance
+    error_idx = np.flatnonzero(failing)
+    
+    # Print entries with significant values or errors (limit output)
+    shown = failing | (np.abs(golden_re) > 10) | (np.abs(golden_im) > 10)
+    for i in np.flatnonzero(shown)[:20]:
+        status = "FAIL" if failing[i] else "PASS"
+        golden_str = f"{signed_to_hex(golden_re[i])},{signed_to_hex(golden_im[i])}"
+        rtl_str = f"{signed_to_hex(rtl_re[i])},{signed_to_hex(rtl_im[i])}"
+        err_str = f"{err_re[i]},{err_im[i]}"
+        print(f"{i:<8} {golden_str:<25} {rtl_str:<25} {err_str:<20} {status:<10}")
     
     print("-"*80)
     print(f"\nTotal points: {N}")
-    print(f"Maximum error: {max_error} Q1.15 units ({q15_to_float(max_error):.6f} in float)")
-    print(f"Number of mismatches (tolerance={tolerance}): {len(errors)}")
+    print(f"Maximum error: {max_error} Q1.15 units ({qformat.to_float(max_error):.6f} in float)")
+    print(f"Number of mismatches (tolerance={tolerance}): {len(error_idx)}")
+    stats = ErrorStats(n_bins=N, tolerance=tolerance)
+    stats.update(golden_re + 1j * golden_im, rtl_re + 1j * rtl_im)
+    stats.report("Error")
     
-    if len(errors) == 0:
+    if len(error_idx) == 0:
         print("\n✓ VERIFICATION PASSED - All outputs match within tolerance!")
     else:
-        print(f"\n✗ VERIFICATION FAILED - {len(errors)} mismatches found")
+        print(f"\n✗ VERIFICATION FAILED - {len(error_idx)} mismatches found")
         print("\nFirst 10 errors:")
-        for i, err in enumerate(errors[:10]):
-            print(f"  Index {err['index']}: Golden={err['golden']}, RTL={err['rtl']}, Error={err['error']}")
+        for i in error_idx[:10]:
+            print(f"  Index {i}: Golden=({golden_re[i]}, {golden_im[i]}), RTL=({rtl_re[i]}, {rtl_im[i]}), Error=({err_re[i]}, {err_im[i]})")
     
-    return len(errors) == 0, max_error
+    return len(error_idx) == 0, max_error
+
+def compare_batch(golden_re, golden_im, rtl_re, rtl_im, tolerance=2, names=None):
+    """
+    Compare a (frames, N) stack of golden and RTL frames in one vectorized pass
+    Returns (passed, result) where result holds per-frame max error,
+    mismatch counts and mismatch index arrays. Only failing frames are reported,
+    followed by the error statistics and per-bin SQNR of the whole batch.
+    """
+    stats = ErrorStats(tolerance=tolerance)
+    result = batch_compare.compare_frames(golden_re, golden_im, rtl_re, rtl_im, tolerance, stats)
+    passed = batch_compare.report_failures(result, golden_re, golden_im, rtl_re, rtl_im, names)
+    stats.report("Batch error")
+    return passed, result
 
-def plot_comparison(input_re, input_im, golden_re, golden_im, rtl_re, rtl_im):
-    import os
+def plot_path(output_pth):
+    """vf_*/fft_vf_<n>.png path of the comparison plot of an output vector"""
     vf_pth = "vf_vivado" if VIVADO else "vf_iverilog"
+    name = output_pth.replace("\\", "/").split("/")[-1]
+    fig_name = f'fft_vf_{name.replace(".txt", "").replace(".bin", "").replace("output", "")}.png'
+    return os.path.join(vf_pth, fig_name)
 
-    """Plot comparison of input, golden, and RTL outputs"""
+def plot_comparison(input_re, input_im, golden_re, golden_im, rtl_re, rtl_im, fig_path):
+    """
+    Plot comparison of input, golden, and RTL outputs of one frame
+    Runs in a plotting worker process; returns the saved path.
+    """
+    plt = plotting.pyplot()
     N = len(input_re)
     
     fig, axes = plt.subplots(3, 2, figsize=(15, 12))
     
     # Input signal
-    axes[0, 0].plot(q15_to_float(input_re), 'g--', linewidth=1, markersize=3)
+    axes[0, 0].plot(qformat.to_float(input_re), 'g--', linewidth=1, markersize=3)
     axes[0, 0].set_title('Input Signal - Real Part')
     axes[0, 0].set_xlabel('Sample Index')
     axes[0, 0].set_ylabel('Amplitude')
     axes[0, 0].grid(True, alpha=0.3)
     
-    axes[0, 1].plot(q15_to_float(input_im), 'g--', linewidth=1, markersize=3)
+    axes[0, 1].plot(qformat.to_float(input_im), 'g--', linewidth=1, markersize=3)
     axes[0, 1].set_title('Input Signal - Imaginary Part')
     axes[0, 1].set_xlabel('Sample Index')
     axes[0, 1].set_ylabel('Amplitude')
     axes[0, 1].grid(True, alpha=0.3)
     
     # FFT Magnitude
-    golden_mag = q15_to_float(golden_re)**2 + q15_to_float(golden_im)**2
-    rtl_mag = q15_to_float(rtl_re)**2 + q15_to_float(rtl_im)**2
+    golden_mag = qformat.to_float(golden_re)**2 + qformat.to_float(golden_im)**2
+    rtl_mag = qformat.to_float(rtl_re)**2 + qformat.to_float(rtl_im)**2
     
     axes[1, 0].plot(golden_mag, 'b--', label='Golden', linewidth=1, markersize=3)
     axes[1, 0].plot(rtl_mag, 'r--', label='RTL', linewidth=1, markersize=2, alpha=0.7)
@@ -208,8 +221,8 @@ def plot_comparison(input_re, input_im, golden_re, golden_im, rtl_re, rtl_im):
     axes[1, 0].grid(True, alpha=0.3)
     
     # FFT Phase
-    golden_phase = np.angle(q15_to_float(golden_re) + 1j*q15_to_float(golden_im))
-    rtl_phase = np.angle(q15_to_float(rtl_re) + 1j*q15_to_float(rtl_im))
+    golden_phase = np.angle(qformat.to_float(golden_re) + 1j*qformat.to_float(golden_im))
+    rtl_phase = np.angle(qformat.to_float(rtl_re) + 1j*qformat.to_float(rtl_im))
     
     axes[1, 1].plot(golden_phase, 'b--', label='Golden', linewidth=1, markersize=3)
     axes[1, 1].plot(rtl_phase, 'r--', label='RTL', linewidth=1, markersize=2, alpha=0.7)
@@ -235,13 +248,14 @@ def plot_comparison(input_re, input_im, golden_re, golden_im, rtl_re, rtl_im):
     axes[2, 1].set_ylabel('Error')
     axes[2, 1].grid(True, alpha=0.3)
     
-    fig_name = f'fft_vf_{args.output_pth.split("/")[-1].replace(".txt", "").replace("output", "")}.png'
+    os.makedirs(os.path.dirname(fig_path) or '.', exist_ok=True)
     plt.tight_layout()
-    plt.savefig(os.path.join(vf_pth, fig_name))
-    print(f"\nPlot saved as '{os.path.join(vf_pth, fig_name)}'")
-    # plt.show()
+    plt.savefig(fig_path)
+    plt.close(fig)
+    return fig_path
 
-def main(input_pth='input2.txt', output_pth='output2.txt'):
+def main(input_pth='input2.txt', output_pth='output2.txt', golden='bittrue', tolerance=None,
+         plot=None):
     print("="*80)
     print("512-Point FFT Verification")
     print("="*80)
@@ -251,8 +265,11 @@ def main(input_pth='input2.txt', output_pth='output2.txt'):
     print("  - Format: Q1.15 fixed-point")
     print("  - Scaling: 1/N")
     print("  - Output Order: Bit-reversed")
+    print(f"  - Golden Model: {golden}")
     print("="*80)
-    import generate_data
+    if tolerance is None:
+        tolerance = 0 if golden == 'bittrue' else 2
+    # Rebuilds only vectors whose generator parameters changed (manifest hashes)
     generate_data.generate_all_standard_vectors()
     
     # Read input data
@@ -269,16 +286,23 @@ def main(input_pth='input2.txt', output_pth='output2.txt'):
     
     # Compute golden reference
     print("\n[3/5] Computing golden reference FFT...")
-    golden_re, golden_im = compute_fft_golden(input_re, input_im)
+    if golden == 'bittrue':
+        golden_re, golden_im = compute_fft_bittrue(input_re, input_im)
+    else:
+        golden_re, golden_im = compute_fft_golden(input_re, input_im)
     print(f"  Golden range: Real=[{golden_re.min()}, {golden_re.max()}], Imag=[{golden_im.min()}, {golden_im.max()}]")
     
     # Compare results
     print("\n[4/5] Comparing RTL output with golden reference...")
-    passed, max_error = compare_results(golden_re, golden_im, rtl_re, rtl_im, tolerance=2)
+    passed, max_error = compare_results(golden_re, golden_im, rtl_re, rtl_im, tolerance=tolerance)
     
-    # Plot results
-    print("\n[5/5] Generating comparison plots...")
-    plot_comparison(input_re, input_im, golden_re, golden_im, rtl_re, rtl_im)
+    # Plot results (opt-in, rendered in the background)
+    if plot == 'all' or (plot and not passed):
+        print("\n[5/5] Generating comparison plots in the background...")
+        plotting.submit(plot_comparison, input_re, input_im, golden_re, golden_im,
+                        rtl_re, rtl_im, plot_path(output_pth))
+    else:
+        print("\n[5/5] Plots skipped" + ("" if plot else " (use --plot)"))
     
     # Summary
     print("\n" + "="*80)
@@ -286,19 +310,74 @@ def main(input_pth='input2.txt', output_pth='output2.txt'):
     print("="*80)
     if passed:
         print("✓ FFT implementation verification PASSED")
-        print(f"  Maximum error: {max_error} Q1.15 units ({q15_to_float(max_error):.6f} in float)")
+        print(f"  Maximum error: {max_error} Q1.15 units ({qformat.to_float(max_error):.6f} in float)")
     else:
         print("✗ FFT implementation verification FAILED")
-        print(f"  Maximum error: {max_error} Q1.15 units ({q15_to_float(max_error):.6f} in float)")
+        print(f"  Maximum error: {max_error} Q1.15 units ({qformat.to_float(max_error):.6f} in float)")
     print("="*80)
     
     return passed
 
+def verify_batch(input_pths, output_pths, golden='bittrue', tolerance=None, plot=None):
+    """
+    Verify several input/output vector pairs as one (frames, 512) batch
+    plot: None, 'fail' (plot failing frames) or 'all'
+    """
+    if tolerance is None:
+        tolerance = 0 if golden == 'bittrue' else 2
+    print("="*80)
+    print(f"512-Point FFT Batch Verification ({len(input_pths)} files, golden={golden})")
+    print("="*80)
+    input_frames = [read_frames(pth) for pth in input_pths]
+    rtl_frames = [read_frames(pth) for pth in output_pths]
+    input_re = np.concatenate([re for re, _ in input_frames])
+    input_im = np.concatenate([im for _, im in input_frames])
+    rtl_re = np.concatenate([re for re, _ in rtl_frames])
+    rtl_im = np.concatenate([im for _, im in rtl_frames])
+    names = [pth if len(re) == 1 else f"{pth}[{k}]"
+             for pth, (re, _) in zip(output_pths, rtl_frames) for k in range(len(re))]
+
+    if golden == 'bittrue':
+        golden_re, golden_im = compute_fft_bittrue(input_re, input_im)
+    else:
+        golden_re, golden_im = compute_fft_golden(input_re, input_im)
+
+    passed, result = compare_batch(golden_re, golden_im, rtl_re, rtl_im,
+                                   tolerance=tolerance, names=names)
+    if plot:
+        frames = range(len(names)) if plot == 'all' else plotting.failing_frames(result)
+        for f in frames:
+            plotting.submit(plot_comparison, input_re[f], input_im[f], golden_re[f], golden_im[f],
+                            rtl_re[f], rtl_im[f], plot_path(names[f].replace("[", "_").rstrip("]")))
+    print("\n" + "="*80)
+    print("✓ Batch verification PASSED" if passed else "✗ Batch verification FAILED")
+    print("="*80)
+    return passed
+
 if __name__ == "__main__":
     parser = ArgumentParser(description="Verify 512-point FFT implementation")
     parser.add_argument('--input-pth', type=str, default='input2.txt', help=
                         "Path to input data file (default: input2.txt)")
     parser.add_argument('--output-pth', type=str, default='output2.txt', help=
                         "Path to RTL output data file (default: output2.txt)")
+    parser.add_argument('--batch-inputs', type=str, nargs='+', default=None, help=
+                        "Input files (.txt or binary .bin) verified together as one batch (with --batch-outputs)")
+    parser.add_argument('--batch-outputs', type=str, nargs='+', default=None, help=
+                        "RTL output files matching --batch-inputs")
+    parser.add_argument('--golden', choices=['bittrue', 'float'], default='bittrue', help=
+                        "Golden model: bit-accurate SDF model or float NumPy FFT (default: bittrue)")
+    parser.add_argument('--tolerance', type=int, default=None, help=
+                        "Allowed error in Q1.15 units (default: 0 for bittrue, 2 for float)")
+    parser.add_argument('--plot', nargs='?', const='fail', choices=['fail', 'all'], default=None, help=
+                        "Render comparison plots in the background: failing frames (default) or all")
     args = parser.parse_args()
-    main(input_pth=args.input_pth, output_pth=args.output_pth)
+    if args.batch_inputs:
+        if not args.batch_outputs or len(args.batch_inputs) != len(args.batch_outputs):
+            parser.error("--batch-inputs and --batch-outputs must have the same length")
+        passed = verify_batch(args.batch_inputs, args.batch_outputs,
+                              golden=args.golden, tolerance=args.tolerance, plot=args.plot)
+        plotting.wait()
+        sys.exit(0 if passed else 1)
+    main(input_pth=args.input_pth, output_pth=args.output_pth,
+         golden=args.golden, tolerance=args.tolerance, plot=args.plot)
+    plotting.wait()
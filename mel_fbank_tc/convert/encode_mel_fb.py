@@ -1,34 +1,49 @@
 #!/usr/bin/env python3
 """
-Encode mel filterbank non-zero index file into a 257x2 toggle-bit encoding.
-
-Algorithm:
-- Maintain two slots (left=0, right=1). Start bits [0,1] and prev_cols [0,1].
-- For each row (top to bottom) parse up to two tuples (filter,col) in file order.
-- If two tuples: choose the assignment to left/right that maximizes matches to prev_cols (keeps continuity).
-- If one tuple: assign it to the slot whose prev_col is nearest (preferring exact match).
-- Toggle a slot's bit only when its assigned column changes from prev_cols[slot].
-
-Output: writes `encoded_mel_fb.txt` with 257 rows, each row `bit_left,bit_right`.
+Encode a mel filterbank matrix into a 257xN toggle-bit encoding.
+
+The non-zero (filter,col) tuples of each row come straight from np.nonzero;
+mel_fb_idx.txt (x / (i,j) tab strings) is only written with --write-idx and
+can still be encoded with encode_rows().
+
+Algorithm (N = --num-macs lanes, 2 for Mel_fbank.v):
+- Maintain N slots (left=0 ... right=N-1). Start bits [0,1,0,1,...] and prev_cols [0..N-1].
+- For each row (top to bottom) parse up to N tuples (filter,col) in file order.
+- A slot whose prev_col appears in the row keeps it (no toggle); a column -> slot
+  lookup makes this linear in the number of tuples.
+- Remaining columns fill the free slots in order when they fill all of them,
+  otherwise each goes to the free slot whose prev_col is nearest.
+- Toggle a slot's bit only when its assigned column changes from prev_cols[slot],
+  and once more when the slot runs out of data.
+
+Output: `mac_bits.txt` (N bits per row, slot 0 first), `mac_pos.txt` (slot mapping)
+and `mac_q15_hex.txt` (N x 16-bit Q1.15 weight words, slot 0 in the upper bits).
 """
+import argparse
 import os
 import re
 import sys
 import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'tool'))
+from qformat import QArray
 
-def get_nz_idx(mat, out_path):
+def nz_rows(mat):
+    """Non-zero (row, col) tuples of each matrix row, in column order"""
+    rows, cols = np.nonzero(mat)
+    counts = np.bincount(rows, minlength=mat.shape[0])
+    pairs = list(zip(rows.tolist(), cols.tolist()))
+    bounds = np.concatenate([[0], np.cumsum(counts)]).tolist()
+    return [pairs[bounds[i]:bounds[i + 1]] for i in range(mat.shape[0])]
 
-    num_filters, num_bins = mat.shape
-    with open(out_path, 'w') as f:
-        for i in range(num_filters):
-            for j in range(num_bins):
-                if mat[i, j] == 0.0:
-                    f.write("x\t")
-                else:
-                    f.write(f"({i},{j})\t")
-            f.write("\n")
 
-    f.close()
+def get_nz_idx(mat, out_path):
+    """Debug artifact: write the non-zero structure as x / (i,j) tab strings"""
+    cells = np.full(mat.shape, "x", dtype=object)
+    for tuples in nz_rows(mat):
+        for i, j in tuples:
+            cells[i, j] = f"({i},{j})"
+    with open(out_path, 'w') as f:
+        f.writelines("\t".join(row) + "\t\n" for row in cells)
 
 def parse_line(line):
     # split on tabs (file uses tabs), filter empty
@@ -50,197 +65,181 @@ def parse_line(line):
     return tuples
 
 
-def encode_rows(lines, nrows=257):
-    prev_cols = [0, 1]
-    bits = [0, 1]
+def _nearest_lane(c, free, prev_cols):
+    """Free lane whose previous column is closest to c (lowest lane on ties)"""
+    return min(free, key=lambda lane: (abs(c - prev_cols[lane]), lane))
+
+
+def encode_rows(lines, nrows=257, num_macs=2):
+    """Encode the lines of a mel_fb_idx.txt style index file"""
+    return encode_nz([parse_line(line) for line in lines], nrows, num_macs)
+
+
+def encode_matrix(mat, num_macs=2):
+    """Encode a (bins, filters) matrix directly from its non-zero structure"""
+    return encode_nz(nz_rows(mat), mat.shape[0], num_macs)
+
+
+def encode_nz(row_tuples, nrows=257, num_macs=2):
+    """
+    Encode rows for num_macs MAC lanes
+    row_tuples: per row the list of non-zero (filter, col) tuples
+    Returns (out, mapping): per row a tuple of lane bits and a tuple of the
+    (filter, col) pair each lane accumulates (None when idle).
+    """
+    prev_cols = list(range(num_macs))
+    bits = [lane & 1 for lane in range(num_macs)]  # MEL_FBANK *_d1 reset values
     out = []
     mapping = []  # Track (filter, col) pairs for each slot at each row
 
-    for i in range(min(nrows, len(lines))):
-        line = lines[i]
-        tuples = parse_line(line)
-        cols = [c for (_, c) in tuples]
-
-        assigned = [None, None]
-
-        if len(cols) == 0:
-            # no change
-            pass
-        elif len(cols) == 1:
-            c = cols[0]
-            # prefer exact match, otherwise nearest prev_col
-            if c == prev_cols[0] and c != prev_cols[1]:
-                slot = 0
-            elif c == prev_cols[1] and c != prev_cols[0]:
-                slot = 1
+    for i in range(min(nrows, len(row_tuples))):
+        tuples = row_tuples[i]
+        # Only the first num_macs tuples of a row can be accumulated
+        cols = [c for (_, c) in tuples[:num_macs]]
+
+        # Lanes already on one of this row's columns keep it (no toggle)
+        lane_of = {}
+        for lane in range(num_macs):
+            lane_of.setdefault(prev_cols[lane], lane)
+        assigned = [None] * num_macs
+        pending = []
+        for c in cols:
+            lane = lane_of.get(c)
+            if lane is not None and assigned[lane] is None:
+                assigned[lane] = c
             else:
-                # choose slot with minimal distance to maintain continuity
-                d0 = abs(c - prev_cols[0])
-                d1 = abs(c - prev_cols[1])
-                slot = 0 if d0 <= d1 else 1
-            assigned[slot] = c
+                pending.append(c)
+
+        # Remaining columns go to the free lanes: in lane order when they fill
+        # all of them, otherwise to the lane with the nearest previous column
+        free = [lane for lane in range(num_macs) if assigned[lane] is None]
+        if len(pending) == len(free):
+            for lane, c in zip(free, pending):
+                assigned[lane] = c
         else:
-            # 2 or more tuples: take first two in appearance order
-            c1, c2 = cols[0], cols[1]
-            # permutation 1: first->slot0, second->slot1
-            m1 = (1 if c1 == prev_cols[0] else 0) + (1 if c2 == prev_cols[1] else 0)
-            # permutation 2: first->slot1, second->slot0
-            m2 = (1 if c1 == prev_cols[1] else 0) + (1 if c2 == prev_cols[0] else 0)
-            if m1 > m2:
-                assigned = [c1, c2]
-            elif m2 > m1:
-                assigned = [c2, c1]
-            else:
-                # tie: keep appearance order -> assign first to left, second to right
-                assigned = [c1, c2]
+            for c in pending:
+                lane = _nearest_lane(c, free, prev_cols)
+                free.remove(lane)
+                assigned[lane] = c
 
         # apply assignments and toggle bits if column changed
-        # Special handling: if a slot becomes None (no more data), invert its bit
-        for s in (0, 1):
+        for s in range(num_macs):
             if assigned[s] is not None:
                 if assigned[s] != prev_cols[s]:
                     bits[s] ^= 1
-                    prev_cols[s] = assigned[s]
-                else:
-                    # remains the same
-                    prev_cols[s] = assigned[s]
+                prev_cols[s] = assigned[s]
 
         # Find the (filter, col) pairs for current slots
-        filter_col_left = None
-        filter_col_right = None
-        for filt, col in tuples:
-            if col == prev_cols[0]:
-                filter_col_left = (filt, col)
-            if col == prev_cols[1]:
-                filter_col_right = (filt, col)
-        
+        by_col = {col: (filt, col) for filt, col in tuples}
+        current = tuple(by_col.get(prev_cols[s]) for s in range(num_macs))
+
         # If a slot transitions to None (end of data for that MAC), toggle its bit
-        if filter_col_left is None and i > 0 and mapping[i-1][0] is not None:
-            bits[0] ^= 1
-        if filter_col_right is None and i > 0 and mapping[i-1][1] is not None:
-            bits[1] ^= 1
-        
-        out.append((bits[0], bits[1]))
-        mapping.append((filter_col_left, filter_col_right))
+        for s in range(num_macs):
+            if current[s] is None and i > 0 and mapping[i-1][s] is not None:
+                bits[s] ^= 1
+
+        out.append(tuple(bits))
+        mapping.append(current)
 
     # If fewer than nrows processed, extend remaining rows with current bits
     while len(out) < nrows:
-        out.append((bits[0], bits[1]))
-        mapping.append((None, None))
+        out.append(tuple(bits))
+        mapping.append((None,) * num_macs)
 
     return out, mapping
 
 
-def float_to_q15(value):
-    """Convert float to Q1.15 fixed-point format (16-bit signed)"""
-    # Q1.15 format: 1 sign bit, 15 fractional bits
-    # Range: [-1, 1) with resolution of 1/32768
-    q15_value = int(round(value * 32768.0))
-    
-    # Clamp to 16-bit signed range
-    if q15_value > 32767:
-        q15_value = 32767
-    elif q15_value < -32768:
-        q15_value = -32768
-    
-    # Convert to unsigned 16-bit representation (two's complement)
-    if q15_value < 0:
-        q15_value = q15_value & 0xFFFF
-    
-    return q15_value
-
-
 def generate_q15_hex_values(mat, mapping):
     """
     Generate Q1.15 hex values for the mapped indices.
-    Concatenate left (16-bit) and right (16-bit) into one 32-bit hex value.
-    Format: [left_16bit][right_16bit]
+    Concatenate the lanes (16 bits each) into one N*16-bit value, lane 0 in
+    the upper bits. Format for two lanes: [left_16bit][right_16bit]
+    Weights are quantized in one pass (round half to even, saturated).
     """
+    vals = np.zeros((len(mapping), len(mapping[0]) if mapping else 0))
+    for r, lanes in enumerate(mapping):
+        for k, idx in enumerate(lanes):
+            if idx is not None and idx[0] < mat.shape[0] and idx[1] < mat.shape[1]:
+                vals[r, k] = mat[idx]
+    codes = QArray.from_float(vals, 16, 15).unsigned().tolist()
+
     hex_values = []
-    
-    for left_idx, right_idx in mapping:
-        # Get left value
-        if left_idx is not None:
-            filt_l, col_l = left_idx
-            if filt_l < mat.shape[0] and col_l < mat.shape[1]:
-                left_val = mat[filt_l, col_l]
-            else:
-                left_val = 0.0
-        else:
-            left_val = 0.0
-        
-        # Get right value
-        if right_idx is not None:
-            filt_r, col_r = right_idx
-            if filt_r < mat.shape[0] and col_r < mat.shape[1]:
-                right_val = mat[filt_r, col_r]
-            else:
-                right_val = 0.0
-        else:
-            right_val = 0.0
-        
-        # Convert to Q1.15
-        left_q15 = float_to_q15(left_val)
-        right_q15 = float_to_q15(right_val)
-        
-        # Concatenate: left in upper 16 bits, right in lower 16 bits
-        combined_32bit = (left_q15 << 16) | right_q15
-        
-        hex_values.append(combined_32bit)
-    
+    for lanes in codes:
+        word = 0
+        for code in lanes:
+            word = (word << 16) | code
+        hex_values.append(word)
+
     return hex_values
 
 
+def _pos_str(idx):
+    return f"({idx[0]},{idx[1]})" if idx is not None else "None"
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Encode a mel filterbank for MEL_FBANK")
+    parser.add_argument('--input', default=None,
+                        help="Float matrix, one row per FFT bin (default: mel_fb_float.txt)")
+    parser.add_argument('--transpose', action='store_true',
+                        help="Input has one row per filter (encode_mel_fb_c.py test matrices)")
+    parser.add_argument('--num-macs', type=int, default=2,
+                        help="Number of MAC lanes (default: 2, as in Mel_fbank.v)")
+    parser.add_argument('--out-dir', default=None,
+                        help="Output directory (default: this directory)")
+    parser.add_argument('--write-idx', action='store_true',
+                        help="Also write the mel_fb_idx.txt debug index file")
+    args = parser.parse_args()
+
     base = os.path.dirname(os.path.abspath(__file__))
-    in_path = os.path.join(base, 'mel_fb_float.txt')
-    mac_bits_out_path = os.path.join(base, 'mac_bits.txt')
-    nz_idx_out_path = os.path.join(base, 'mel_fb_idx.txt')
-    mapping_out_path = os.path.join(base, 'mac_pos.txt')
-    q15_hex_out_path = os.path.join(base, 'mac_q15_hex.txt')
+    out_dir = args.out_dir or base
+    in_path = args.input or os.path.join(base, 'mel_fb_float.txt')
+    mac_bits_out_path = os.path.join(out_dir, 'mac_bits.txt')
+    nz_idx_out_path = os.path.join(out_dir, 'mel_fb_idx.txt')
+    mapping_out_path = os.path.join(out_dir, 'mac_pos.txt')
+    q15_hex_out_path = os.path.join(out_dir, 'mac_q15_hex.txt')
 
     mat = np.loadtxt(in_path, dtype=float)
-    get_nz_idx(mat, nz_idx_out_path)
-
-    if not os.path.exists(nz_idx_out_path):
-        print(f'Index file not found: {nz_idx_out_path}', file=sys.stderr)
-        sys.exit(2)
+    if args.transpose:
+        mat = mat.T
+    if args.write_idx:
+        get_nz_idx(mat, nz_idx_out_path)
+        print('Wrote', nz_idx_out_path)
 
-    # Read from the generated index file instead
-    with open(nz_idx_out_path, 'r', encoding='utf-8') as f:
-        lines = [l.rstrip('\n') for l in f if l.strip() != '']
+    max_nz = int(np.count_nonzero(mat, axis=1).max())
+    if max_nz > args.num_macs:
+        print(f'Warning: up to {max_nz} non-zeros per bin, only {args.num_macs} MAC lanes; '
+              f'extra weights are dropped', file=sys.stderr)
 
-    encoded, mapping = encode_rows(lines, nrows=257)
+    encoded, mapping = encode_matrix(mat, num_macs=args.num_macs)
 
     with open(mac_bits_out_path, 'w', encoding='utf-8') as f:
-        for a, b in encoded:
-            f.write(f"{a}{b}\n")
+        for lane_bits in encoded:
+            f.write(''.join(str(b) for b in lane_bits) + "\n")
 
     # Save the mapping: mac_bit => non-zero index
     with open(mapping_out_path, 'w', encoding='utf-8') as f:
-        for left_idx, right_idx in mapping:
-            left_str = f"({left_idx[0]},{left_idx[1]})" if left_idx is not None else "None"
-            right_str = f"({right_idx[0]},{right_idx[1]})" if right_idx is not None else "None"
-            f.write(f"{left_str}\t{right_str}\n")
+        for lanes in mapping:
+            f.write('\t'.join(_pos_str(idx) for idx in lanes) + "\n")
 
     # Generate Q1.15 hex values
     hex_values = generate_q15_hex_values(mat, mapping)
     
+    ndigits = 4 * args.num_macs
     with open(q15_hex_out_path, 'w', encoding='utf-8') as f:
         for hex_val in hex_values:
-            f.write(f"{hex_val:08X}\n")
+            f.write(f"{hex_val:0{ndigits}X}\n")
 
     # print first 32 rows as a quick check
     print('Wrote', mac_bits_out_path)
     print('Wrote', mapping_out_path)
     print('Wrote', q15_hex_out_path)
     print('\nFirst 32 encoded rows:')
-    for i, (a, b) in enumerate(encoded[:32]):
-        left_idx, right_idx = mapping[i]
-        left_str = f"({left_idx[0]},{left_idx[1]})" if left_idx is not None else "None"
-        right_str = f"({right_idx[0]},{right_idx[1]})" if right_idx is not None else "None"
+    for i, lane_bits in enumerate(encoded[:32]):
+        bits_str = ','.join(str(b) for b in lane_bits)
+        pos_str = ' '.join(f'{_pos_str(idx):12s}' for idx in mapping[i])
         hex_val = hex_values[i]
-        print(f'{i:3d}: {a},{b}  =>  {left_str:12s} {right_str:12s}  =>  0x{hex_val:08X}')
+        print(f'{i:3d}: {bits_str}  =>  {pos_str}  =>  0x{hex_val:0{ndigits}X}')
 
 
 if __name__ == '__main__':
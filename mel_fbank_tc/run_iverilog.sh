@@ -28,7 +28,7 @@ rm -f mel_output.txt
 rm -f tb_Mel_fbank.vcd
 
 echo "[Step 3] Compiling Verilog files..."
-iverilog -o tb_mel.vvp -g2005-sv \
+python3 ../tool/vvpcache.py -o tb_mel.vvp -g2005-sv \
     ../Mel_fbank.v ../Mel_mac.v ../Multiply_qx.v tb_Mel_fbank.v
 
 if [ $? -ne 0 ]; then
@@ -59,4 +59,7 @@ else
     echo "  [FAIL] mel_output.txt not found"
 fi
 
+echo "[Step 6] Verifying against the bit-true MEL_FBANK model..."
+python3 verify_mel.py
+
 echo "===================================="
@@ -11,7 +11,7 @@ python3 verify.py generate
 
 # Compile the Verilog files
 echo "--- Compiling Verilog files ---"
-iverilog -o tb_brr_pp.vvp ../pp_buffer.v tb_pp_buffer.v ../buffer.v
+python3 ../tool/vvpcache.py -o tb_brr_pp.vvp ../PP_buffer.v tb_pp_buffer.v ../buffer.v
 
 # Run the simulation
 echo "--- Running simulation ---"
@@ -20,3 +20,7 @@ vvp tb_brr_pp.vvp
 # # Verify the output
 # echo "--- Verifying output ---"
 # python3 verify.py verify
+
+# Check every PP_BUFFER output cycle by cycle against reorder_model.pp_buffer()
+echo "--- Checking tb_pp_buffer.vcd against the cycle-level model ---"
+python3 verify.py dump
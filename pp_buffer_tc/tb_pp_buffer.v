@@ -109,6 +109,12 @@ module tb_PP_BUFFER;
         $finish;
     end
 
+    // Waveform for the cycle-level check against reorder_model.pp_buffer()
+    initial begin
+        $dumpfile("tb_pp_buffer.vcd");
+        $dumpvars(0, tb_PP_BUFFER);
+    end
+
     // 3. Monitor Block
     // This will display the values of the signals whenever they change.
     initial begin
@@ -8,7 +8,7 @@ else
 fi
 
 echo 'Compiling Verilog files ...'
-iverilog -o tb_stft_512.vvp -g2005-sv \
+python3 ../tool/vvpcache.py -o tb_stft_512.vvp -g2005-sv \
     ../STFT.v \
     ../Window_lut.v \
     ../cir_buffer.v \
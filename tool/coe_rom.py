@@ -0,0 +1,268 @@
+"""
+Coefficient ROM Generator
+-------------------------
+Vectorized generation of the constant tables used by the RTL:
+- twiddle(N, NB): Twiddle512.v / Twiddle128.v contents (tool/twiddle.py),
+  exp(-j*2*pi*n/N) rounded half up with +1.0 clamped, entries never read by
+  the radix-2^2 SDF stages marked don't care
+- hann(win_len, n_fft, NB): HannWin480.v contents (tool/win_coe_gen.py),
+  0.5*(1 - cos(2*pi*n/(win_len-1))) * (2^(NB-1)-1), zero padded to n_fft
+- mel(n_mel, n_fft, ...): MEL_FBANK SRAM images (mac_bits / mac_q15_hex)
+  encoded with mel_fbank_tc/convert/encode_mel_fb.py. Configurations with a
+  committed torchaudio matrix (mel_fb_float.txt: 40 bands, mel_fb_float_64.txt:
+  64 bands; 512-point FFT, 16 kHz, 0 - 8 kHz) encode that matrix, so the
+  default images are identical to mac_bits.txt / mac_q15_hex.txt. Other
+  configurations rebuild the HTK bank in float (mel_filterbank.py), which
+  differs from torchaudio's float32 weights in the last bits: for the
+  default configuration 6 of the 257 weight rows would be 1 LSB off.
+
+Each table can be emitted as a $readmemh image, a Verilog assign table or a
+raw little-endian binary blob. Tables are memoized per parameter set within
+a process (there is no on-disk cache: even a 128-band, 2048-point mel image
+takes a few milliseconds), and files are only rewritten when their content
+changes, so a sweep does not touch the ROM files of unchanged points.
+
+Usage:
+    python tool/coe_rom.py twiddle --n 512 --nb 16 --format assign
+    python tool/coe_rom.py hann --win-len 480 --n-fft 512 --output win.mem
+    python tool/coe_rom.py mel --n-mel 64 --n-fft 1024 --num-macs 4 --output mel
+"""
+
+import argparse
+import functools
+import os
+import sys
+
+import numpy as np
+
+import hexio
+import qformat
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+CONVERT_DIR = os.path.join(ROOT, 'mel_fbank_tc', 'convert')
+
+# Committed torchaudio filterbanks (n_bins x n_mel) by number of bands, for
+# n_fft = 512, sample_rate = 16000, f_min = 0, f_max = 8000
+MEL_FB_FLOAT = {40: os.path.join(CONVERT_DIR, 'mel_fb_float.txt'),
+                64: os.path.join(CONVERT_DIR, 'mel_fb_float_64.txt')}
+
+
+def quantize(values, nb=16, scale=None, rounding='half_up'):
+    """
+    Signed NB-bit fixed point of float values
+    scale defaults to 2^(NB-1); 'half_up' is floor(x + 0.5) as in
+    twiddle.py, 'even' is NumPy rounding as in win_coe_gen.py. Results are
+    clamped to the NB-bit range.
+    """
+    return qformat.quantize(values, nb, nb - 1, rounding, 'saturate', scale)
+
+
+def _frozen(*arrays):
+    for a in arrays:
+        a.flags.writeable = False
+    return arrays if len(arrays) > 1 else arrays[0]
+
+
+@functools.lru_cache(maxsize=None)
+def twiddle(n, nb=16):
+    """(wn_re, wn_im, dontcare) of the N-point twiddle ROM"""
+    k = np.arange(n)
+    angle = -2 * np.pi * k / n
+    wn_re = quantize(np.cos(angle), nb)
+    wn_im = quantize(np.sin(angle), nb)
+    wn_re[0] = 0
+    used = (k < n // 4) | ((k < 2 * n // 4) & (k % 2 == 0)) | ((k < 3 * n // 4) & (k % 3 == 0))
+    return _frozen(wn_re, wn_im, ~used)
+
+
+@functools.lru_cache(maxsize=None)
+def hann(win_len=480, n_fft=None, nb=16):
+    """HANN_WIN ROM: win_len coefficients, zero padded to n_fft entries"""
+    n = np.arange(win_len)
+    coe = 0.5 * (1 - np.cos(2 * np.pi * n / (win_len - 1)))
+    rom = np.zeros(max(n_fft or win_len, win_len), dtype=np.int64)
+    rom[:win_len] = quantize(coe, nb, scale=2 ** (nb - 1) - 1, rounding='even')
+    return _frozen(rom)
+
+
+@functools.lru_cache(maxsize=None)
+def mel(n_mel=40, n_fft=512, sample_rate=16000, f_min=0.0, f_max=None, num_macs=2,
+        nb=16):
+    """
+    MEL_FBANK SRAM images for an HTK mel filterbank
+    Returns (mac_bits, weights): (n_bins, num_macs) lane bits and signed
+    NB-bit weights, lane 0 first.
+    """
+    import mel_filterbank
+    if CONVERT_DIR not in sys.path:
+        sys.path.insert(0, CONVERT_DIR)
+    import encode_mel_fb
+
+    committed = (n_fft == 512 and sample_rate == 16000 and f_min == 0
+                 and f_max in (None, sample_rate / 2) and n_mel in MEL_FB_FLOAT
+                 and os.path.exists(MEL_FB_FLOAT[n_mel]))
+    if committed:
+        mat = np.loadtxt(MEL_FB_FLOAT[n_mel], dtype=float)
+    else:
+        bands = mel_filterbank.mel_filterbank(n_mel, n_fft, sample_rate, f_min, f_max)
+        mat = mel_filterbank.to_dense(bands).T
+    encoded, mapping = encode_mel_fb.encode_matrix(mat, num_macs)
+    bits = np.array(encoded, dtype=np.int64)
+    rows = [(i, lane, idx) for i, lanes in enumerate(mapping)
+            for lane, idx in enumerate(lanes) if idx is not None]
+    values = np.zeros(bits.shape)
+    if rows:
+        i, lane, idx = zip(*rows)
+        values[i, lane] = mat[tuple(np.array(idx).T)]
+    return _frozen(bits, quantize(values, nb, rounding='even'))
+
+
+def pack_words(columns, nb=16):
+    """Concatenate columns into one unsigned word per row, first column in the upper bits"""
+    word = np.zeros(len(columns[0]), dtype=object if nb * len(columns) > 63 else np.int64)
+    for col in columns:
+        word = (word << nb) | hexio.to_unsigned(np.asarray(col, dtype=np.int64), nb)
+    return word
+
+
+def format_readmemh(columns, nb=16):
+    """$readmemh image, one row per entry, columns separated by two spaces"""
+    return hexio.format_hex_columns(columns, width=nb)
+
+
+def format_assign(tables, nb=16, dontcare=None, comments=None, indent=''):
+    """
+    Verilog assign table
+    tables: list of (name, values); each row holds one assign per table,
+    e.g. 'assign  wn_re[ 1] = 16'h7FFE;   assign  wn_im[ 1] = 16'hFE6E;   // ...'
+    dontcare: boolean mask of entries written as x
+    comments: optional per-row comment strings
+    """
+    n = len(tables[0][1])
+    nx = (nb + 3) // 4
+    xx = 'x' * nx
+    if dontcare is None:
+        dontcare = np.zeros(n, dtype=bool)
+    hexes = [[xx if dc else f"{v:0{nx}X}" for v, dc in
+              zip(hexio.to_unsigned(np.asarray(values, dtype=np.int64), nb).tolist(),
+                  dontcare.tolist())] for _, values in tables]
+    lines = []
+    for k in range(n):
+        parts = [f"assign  {name}[{k:2d}] = {nb}'h{hexes[t][k]};   "
+                 for t, (name, _) in enumerate(tables)]
+        line = indent + ''.join(parts)
+        lines.append(line + f"// {comments[k]}" if comments is not None else line.rstrip())
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def twiddle_assign(n, nb=16, indent=''):
+    """Twiddle ROM body in the tool/twiddle.py layout (header comment included)"""
+    wn_re, wn_im, dontcare = twiddle(n, nb)
+    k = np.arange(n)
+    wr = np.cos(-2 * np.pi * k / n)
+    wi = np.sin(-2 * np.pi * k / n)
+    comments = [f"{i:2d} {r:7.3f} {m:7.3f}" for i, r, m in zip(k, wr, wi)]
+    header = f"{indent}//      wn_re = cos(-2pi*n/{n:2d})          wn_im = sin(-2pi*n/{n:2d})\n"
+    return header.encode() + format_assign([('wn_re', wn_re), ('wn_im', wn_im)], nb,
+                                           dontcare, comments, indent)
+
+
+def hann_assign(win_len=480, n_fft=None, nb=16, indent=''):
+    """HANN_WIN ROM body as 'assign win_coe [  n] = 16'hxxxx;' lines"""
+    rom = hann(win_len, n_fft, nb)
+    nx = (nb + 3) // 4
+    width = len(str(len(rom) - 1))
+    values = hexio.to_unsigned(rom, nb).tolist()
+    lines = [f"{indent}assign win_coe [{k:{max(width, 3)}d}] = {nb}'h{v:0{nx}x};"
+             for k, v in enumerate(values)]
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def format_blob(columns, nb=16):
+    """Raw little-endian blob, columns interleaved per entry (int16/int32/int64)"""
+    dtype = '<i2' if nb <= 16 else '<i4' if nb <= 32 else '<i8'
+    return np.stack([np.asarray(c) for c in columns], axis=1).astype(dtype).tobytes()
+
+
+def write_if_changed(path, data):
+    """Write bytes to path unless it already holds them; returns True if written"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+
+def _render(args):
+    """(suffix, bytes) outputs for the parsed command line"""
+    if args.table == 'twiddle':
+        wn_re, wn_im, dontcare = twiddle(args.n, args.nb)
+        if args.format == 'assign':
+            return [('', twiddle_assign(args.n, args.nb, args.indent))]
+        if args.format == 'readmemh':
+            return [('', format_readmemh([wn_re, wn_im], args.nb))]
+        return [('', format_blob([wn_re, wn_im], args.nb))]
+    if args.table == 'hann':
+        rom = hann(args.win_len, args.n_fft, args.nb)
+        if args.format == 'assign':
+            return [('', hann_assign(args.win_len, args.n_fft, args.nb, args.indent))]
+        if args.format == 'readmemh':
+            return [('', format_readmemh([rom], args.nb))]
+        return [('', format_blob([rom], args.nb))]
+
+    bits, weights = mel(args.n_mel, args.n_fft, args.sample_rate, args.f_min, args.f_max,
+                        args.num_macs, args.nb)
+    if args.format == 'bin':
+        return [('_bits.bin', bits.astype(np.uint8).tobytes()),
+                ('_weights.bin', format_blob(weights.T, args.nb))]
+    if args.format == 'assign':
+        words = pack_words(weights.T, args.nb)
+        return [('_bits.txt', format_assign([('mac_bits', pack_words(bits.T, 1))], args.num_macs)),
+                ('_weights.txt', format_assign([('mel_w', words)], args.nb * args.num_macs))]
+    # $readmemb bits (lane 0 first) and $readmemh packed weight words
+    bit_lines = ''.join(''.join(map(str, row)) + '\n' for row in bits.tolist())
+    nx = (args.nb * args.num_macs + 3) // 4
+    weight_lines = ''.join(f"{w:0{nx}X}\n" for w in pack_words(weights.T, args.nb).tolist())
+    return [('_bits.txt', bit_lines.encode()), ('_weights.txt', weight_lines.encode())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate coefficient ROM images")
+    parser.add_argument('table', choices=['twiddle', 'hann', 'mel'])
+    parser.add_argument('--format', choices=['assign', 'readmemh', 'bin'], default=None,
+                        help="Default: assign for twiddle/hann, readmemh for mel")
+    parser.add_argument('--output', default=None,
+                        help="Output file (mel: prefix for _bits/_weights); default stdout")
+    parser.add_argument('--nb', type=int, default=16, help="Coefficient bits (default: 16)")
+    parser.add_argument('--n', type=int, default=512, help="Twiddle FFT size (default: 512)")
+    parser.add_argument('--win-len', type=int, default=480, help="Window length (default: 480)")
+    parser.add_argument('--n-fft', type=int, default=512, help="FFT size (default: 512)")
+    parser.add_argument('--n-mel', type=int, default=40, help="Mel bands (default: 40)")
+    parser.add_argument('--num-macs', type=int, default=2, help="MAC lanes (default: 2)")
+    parser.add_argument('--sample-rate', type=int, default=16000)
+    parser.add_argument('--f-min', type=float, default=0.0)
+    parser.add_argument('--f-max', type=float, default=None)
+    parser.add_argument('--indent', default='', help="Prefix of every assign line")
+    args = parser.parse_args()
+    args.format = args.format or ('readmemh' if args.table == 'mel' else 'assign')
+
+    outputs = _render(args)
+    if args.output is None:
+        if args.format == 'bin':
+            parser.error("--output is required for binary blobs")
+        for _, data in outputs:
+            sys.stdout.write(data.decode())
+        return
+    for suffix, data in outputs:
+        path = args.output + suffix
+        print(f"{'Wrote' if write_if_changed(path, data) else 'Unchanged'} {path}")
+
+
+if __name__ == "__main__":
+    main()
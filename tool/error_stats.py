@@ -0,0 +1,214 @@
+"""
+Streaming Error Statistics
+--------------------------
+Constant-memory accumulation of golden vs RTL error statistics over any
+number of (frames, n_bins) batches:
+- mean / standard deviation of the error (Welford, merged per batch with
+  the Chan et al. update so batches of millions of samples stay exact)
+- RMS and maximum absolute error, with the position of the maximum
+- histogram of the integer error in [-hist_range, hist_range] plus one
+  underflow and one overflow bucket
+- per-bin signal and error power, giving total and per-bin SQNR
+
+Complex batches (golden_re + 1j * golden_im) keep the moments and the
+histogram per component (row 0 real, row 1 imaginary); SQNR always uses
+|golden|^2 / |error|^2. State is a few arrays of length n_bins, so
+long-run regressions can feed arbitrarily many frames.
+
+    stats = ErrorStats(n_bins=512)
+    for golden, rtl in batches:
+        stats.update(golden, rtl)
+    stats.report("FFT512")
+
+batch_compare.compare_frames() feeds an ErrorStats passed as stats, and
+update_stream() takes flat sample streams such as the WIN_LUT output.
+"""
+
+import math
+
+import numpy as np
+
+
+def _db(signal, noise):
+    """10*log10(signal / noise) elementwise; inf where noise is 0"""
+    signal = np.asarray(signal, dtype=float)
+    noise = np.asarray(noise, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        db = 10 * np.log10(signal / noise)
+    return np.where(noise == 0, np.inf, db)
+
+
+class ErrorStats:
+    """Running error statistics of golden vs test batches"""
+
+    def __init__(self, n_bins=None, hist_range=8, tolerance=0):
+        self.n_bins = n_bins
+        self.hist_range = hist_range
+        self.tolerance = tolerance
+        self.components = None
+        self.count = 0
+        self.mismatches = 0
+
+    def _init(self, components, n_bins):
+        self.components = components
+        self.n_bins = self.n_bins or n_bins
+        self.mean = np.zeros(components)
+        self.m2 = np.zeros(components)
+        self.max_abs = np.zeros(components)
+        self.max_pos = np.zeros(components, dtype=np.int64)
+        self.hist = np.zeros((components, 2 * self.hist_range + 3), dtype=np.int64)
+        self.bin_signal = np.zeros(self.n_bins)
+        self.bin_noise = np.zeros(self.n_bins)
+        self.bin_count = np.zeros(self.n_bins, dtype=np.int64)
+
+    def update(self, golden, test):
+        """
+        Add one batch
+        golden, test: (frames, n) or 1-D (one frame) arrays, real or complex;
+        a frame may be shorter than n_bins (a partial frame at the end).
+        """
+        golden = np.atleast_2d(np.asarray(golden))
+        test = np.atleast_2d(np.asarray(test))
+        if golden.shape != test.shape:
+            raise ValueError(f"shape mismatch: golden {golden.shape}, test {test.shape}")
+        if golden.size == 0:
+            return self
+        is_complex = np.iscomplexobj(golden) or np.iscomplexobj(test)
+        if self.components is None:
+            self._init(2 if is_complex else 1, golden.shape[1])
+        if golden.shape[1] > self.n_bins:
+            raise ValueError(f"frames of {golden.shape[1]} bins, expected at most {self.n_bins}")
+
+        err = test.astype(complex if is_complex else float) - golden
+        parts = np.stack([err.real, err.imag]) if self.components == 2 else err.real[None]
+        n = golden.size
+        flat = parts.reshape(self.components, -1)
+
+        # Welford moments, batch merged with the parallel-variance formula
+        batch_mean = flat.mean(axis=1)
+        batch_m2 = ((flat - batch_mean[:, None]) ** 2).sum(axis=1)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * n / total
+
+        abs_err = np.abs(flat)
+        arg = abs_err.argmax(axis=1)
+        batch_max = abs_err[np.arange(self.components), arg]
+        new_max = batch_max > self.max_abs
+        self.max_abs = np.where(new_max, batch_max, self.max_abs)
+        self.max_pos = np.where(new_max, self.count + arg, self.max_pos)
+
+        r = self.hist_range
+        idx = np.clip(np.rint(flat).astype(np.int64), -r - 1, r + 1) + r + 1
+        for c in range(self.components):
+            self.hist[c] += np.bincount(idx[c], minlength=self.hist.shape[1])
+
+        width = golden.shape[1]
+        self.bin_signal[:width] += (np.abs(golden) ** 2).sum(axis=0)
+        self.bin_noise[:width] += (np.abs(err) ** 2).sum(axis=0)
+        self.bin_count[:width] += len(golden)
+        self.mismatches += int((abs_err > self.tolerance).any(axis=0).sum())
+        self.count = total
+        return self
+
+    def update_stream(self, golden, test, batch_frames=256):
+        """
+        Add 1-D sample streams laid out frame after frame (n_bins per frame)
+        in batches of batch_frames frames; a trailing partial frame is kept
+        """
+        if self.n_bins is None:
+            raise ValueError("update_stream needs n_bins")
+        n = min(len(golden), len(test))
+        step = batch_frames * self.n_bins
+        for start in range(0, n - n % self.n_bins, step):
+            stop = min(start + step, n - n % self.n_bins)
+            self.update(np.reshape(golden[start:stop], (-1, self.n_bins)),
+                        np.reshape(test[start:stop], (-1, self.n_bins)))
+        if n % self.n_bins:
+            self.update(golden[n - n % self.n_bins:n], test[n - n % self.n_bins:n])
+        return self
+
+    def merge(self, other):
+        """Combine with another ErrorStats (e.g. from a worker process)"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update({k: (v.copy() if isinstance(v, np.ndarray) else v)
+                                  for k, v in other.__dict__.items()})
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / total
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / total
+        new_max = other.max_abs > self.max_abs
+        self.max_abs = np.where(new_max, other.max_abs, self.max_abs)
+        self.max_pos = np.where(new_max, self.count + other.max_pos, self.max_pos)
+        self.hist = self.hist + other.hist
+        self.bin_signal = self.bin_signal + other.bin_signal
+        self.bin_noise = self.bin_noise + other.bin_noise
+        self.bin_count = self.bin_count + other.bin_count
+        self.mismatches += other.mismatches
+        self.count = total
+        return self
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / self.count) if self.count else np.zeros(self.components or 1)
+
+    @property
+    def rms(self):
+        """Root mean square error per component"""
+        if not self.count:
+            return np.zeros(self.components or 1)
+        return np.sqrt(self.m2 / self.count + self.mean ** 2)
+
+    def sqnr_db(self):
+        """Overall SQNR in dB (inf for a bit-exact match)"""
+        if not self.count:
+            return math.inf
+        return float(_db(self.bin_signal.sum(), self.bin_noise.sum()))
+
+    def bin_sqnr_db(self):
+        """SQNR in dB of every bin over all frames seen"""
+        if not self.count:
+            return np.full(self.n_bins or 0, np.inf)
+        return _db(self.bin_signal, self.bin_noise)
+
+    def summary(self):
+        """Plain dict of the scalar statistics (per component lists)"""
+        return {
+            'count': self.count,
+            'mismatches': self.mismatches,
+            'mean': self.mean.tolist() if self.count else [],
+            'std': self.std.tolist(),
+            'rms': self.rms.tolist(),
+            'max_abs': self.max_abs.tolist() if self.count else [],
+            'sqnr_db': self.sqnr_db(),
+        }
+
+    def report(self, label="Error", unit="Q1.15 LSB", worst_bins=5):
+        """Print the statistics, the error histogram and the worst bins"""
+        print(f"\n{label} statistics ({self.count} samples, {unit}):")
+        if not self.count:
+            print("  No samples compared.")
+            return
+        names = ['Real', 'Imag'] if self.components == 2 else ['Error']
+        for c, name in enumerate(names):
+            print(f"  {name + ':':<6} mean={self.mean[c]:.4f}, std={self.std[c]:.4f}, "
+                  f"rms={self.rms[c]:.4f}, max={self.max_abs[c]:.0f} "
+                  f"(sample {int(self.max_pos[c])})")
+        print(f"  Mismatches (tolerance={self.tolerance}): {self.mismatches}")
+        print(f"  SQNR: {self.sqnr_db():.2f} dB")
+
+        r = self.hist_range
+        labels = [f"<{-r}"] + [str(v) for v in range(-r, r + 1)] + [f">{r}"]
+        used = np.flatnonzero(self.hist.sum(axis=0))
+        print("  Histogram: " + ", ".join(
+            f"{labels[i]}: " + "/".join(str(h) for h in self.hist[:, i]) for i in used))
+
+        bin_db = self.bin_sqnr_db()
+        noisy = np.flatnonzero(self.bin_noise > 0)
+        if len(noisy):
+            worst = noisy[np.argsort(bin_db[noisy])[:worst_bins]]
+            print("  Worst bins: " + ", ".join(f"{b}: {bin_db[b]:.1f} dB" for b in worst))
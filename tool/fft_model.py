@@ -0,0 +1,223 @@
+"""
+Bit-Accurate Radix-2^2 SDF FFT Model
+------------------------------------
+NumPy fixed-point model of the FFT pipeline built from FFT512.v, SdfUnit.v,
+SdfUnit2.v, Butterfly.v and Multiply.v. Every stage is reproduced with the
+same integer arithmetic as the RTL, so the model output can be compared with
+the simulation output exactly (tolerance 0).
+
+Pipeline for N = 2^k (FFT512: M = 512, 128, 32, 8, then SdfUnit2):
+- SdfUnit BF1: butterfly over distance M/2, RH=0, -j rotation on the last
+  quarter of each M-block
+- SdfUnit BF2: butterfly over distance M/4, RH=1
+- Twiddle multiply with convergent rounding (bypassed for address 0)
+- SdfUnit2: radix-2 butterfly on consecutive pairs, RH=0
+
+Twiddles default to the Twiddle512.v ROM contents (tool/rom_tables.py)
+for N = 512, and to twiddle_table(N) for other sizes (see rom_twiddles).
+All functions operate on (batch, N) integer arrays.
+A 1-D frame is treated as a batch of one.
+"""
+
+import functools
+import os
+
+import numpy as np
+
+from qformat import QArray, shift_right, wrap
+import rom_tables
+
+WIDTH = 16
+
+
+@functools.lru_cache(maxsize=None)
+def bit_reverse_indices(N, bits=None):
+    """
+    Bit-reversed index permutation for an N-point FFT (cached, read-only)
+    bits: address width to reverse over (default log2(N)); a wider address,
+    as in PP_BUFFER with DEPTH = N_FFT/2+1, maps some indices past N
+    """
+    bits = bits or (int(N) - 1).bit_length()
+    n = np.arange(N)
+    rev = np.zeros(N, dtype=np.int64)
+    for i in range(bits):
+        rev |= ((n >> i) & 1) << (bits - 1 - i)
+    rev.flags.writeable = False
+    return rev
+
+
+def twiddle_table(N, NB=WIDTH):
+    """
+    Twiddle ROM contents as generated by tool/twiddle.py
+    wn = exp(-j*2*pi*n/N), rounded half up, +1.0 clamped to 2^(NB-1)-1
+    """
+    n = np.arange(N)
+    angle = -2 * np.pi * n / N
+    scale = 2 ** (NB - 1)
+    tw_re = np.floor(np.cos(angle) * scale + 0.5).astype(np.int64)
+    tw_im = np.floor(np.sin(angle) * scale + 0.5).astype(np.int64)
+    tw_re[tw_re == scale] = scale - 1
+    tw_im[tw_im == scale] = scale - 1
+    tw_re[0] = 0
+    return tw_re, tw_im
+
+
+def rom_twiddles(N, width=WIDTH):
+    """
+    Twiddles as synthesized: the Twiddle512.v ROM contents for N = 512
+    (don't-care entries read 0), otherwise twiddle_table(N, width)
+    Both SdfUnit.v and SdfUnit_TC.v instantiate Twiddle512, also in FFT128;
+    Twiddle128.v (module Twiddle) is not part of any datapath, so N = 128
+    uses the generated table. The committed fft_128_tc outputs differ from
+    the model by up to 1 LSB with either table.
+    """
+    if N == 512 and width == 16 and os.path.exists(rom_tables.TWIDDLE_ROM.format(n=N)):
+        tw_re, tw_im, _ = rom_tables.twiddle(N)
+        return tw_re, tw_im
+    return twiddle_table(N, width)
+
+
+def butterfly(x0_re, x0_im, x1_re, x1_im, rh=0, width=WIDTH):
+    """Butterfly.v: [WIDTH:0] add/sub, (x + RH) >>> 1, truncated to WIDTH bits"""
+    rounding = 'half_up' if rh else 'truncate'
+    y0_re = wrap(shift_right(x0_re + x1_re, 1, rounding), width)
+    y0_im = wrap(shift_right(x0_im + x1_im, 1, rounding), width)
+    y1_re = wrap(shift_right(x0_re - x1_re, 1, rounding), width)
+    y1_im = wrap(shift_right(x0_im - x1_im, 1, rounding), width)
+    return y0_re, y0_im, y1_re, y1_im
+
+
+def round_shift_sat(x, width=WIDTH):
+    """
+    Multiply.v round_shift_sat_q15: keep bits [30:15], round to nearest
+    with ties to even, saturate only the positive rounding carry
+    """
+    shift = width - 1
+    keep = wrap(x >> shift, width)
+    guard = (x >> (shift - 1)) & 1
+    sticky = (x & ((1 << (shift - 1)) - 1)) != 0
+    round_up = guard & (sticky | (keep & 1))
+    return np.minimum(keep + round_up, (1 << (width - 1)) - 1)
+
+
+def multiply(a_re, a_im, b_re, b_im, width=WIDTH):
+    """Multiply.v: complex Q1.15 multiply with convergent rounding"""
+    re_full = a_re * b_re - a_im * b_im
+    im_full = a_re * b_im + a_im * b_re
+    return round_shift_sat(re_full, width), round_shift_sat(im_full, width)
+
+
+def multiply_qx(a_re, a_im, b_re, b_im, width_a=WIDTH, q_a=WIDTH - 1, width_b=WIDTH,
+                q_b=WIDTH - 1, width_c=WIDTH, q_c=WIDTH - 1):
+    """
+    Multiply_qx.v: each product >>> (Q_A + Q_B - Q_C) in WIDTH_A+WIDTH_B
+    bits, then sub/add and plain truncation to WIDTH_C bits
+    Takes and returns QArrays (or integer codes in the given formats).
+    """
+    a_re, a_im = (x if isinstance(x, QArray) else QArray(x, width_a, q_a) for x in (a_re, a_im))
+    b_re, b_im = (x if isinstance(x, QArray) else QArray(x, width_b, q_b) for x in (b_re, b_im))
+    prod_width = a_re.width + b_re.width
+    arbr, arbi, aibr, aibi = ((a * b).cast(prod_width, q_c, 'truncate', 'wrap')
+                              for a, b in ((a_re, b_re), (a_re, b_im), (a_im, b_re), (a_im, b_im)))
+    c_re = (arbr - aibi).cast(width_c, q_c, overflow='wrap')
+    c_im = (arbi + aibr).cast(width_c, q_c, overflow='wrap')
+    return c_re, c_im
+
+
+def sdf_twiddle_addr(N, M):
+    """
+    Twiddle address per sample of an M-block (SdfUnit tw_sel/tw_num/tw_addr)
+    tw_sel = {count[LOG_M-2], count[LOG_M-1]}, tw_num = (count % (M/4)) * N/M
+    """
+    log_m = int(np.log2(M))
+    p = np.arange(M)
+    tw_sel = (((p >> (log_m - 2)) & 1) << 1) | ((p >> (log_m - 1)) & 1)
+    tw_num = (p % (M // 4)) * (N // M)
+    return (tw_num * tw_sel) % N
+
+
+def sdf_unit(re, im, N, M, tw_re, tw_im, bf1_rh=0, bf2_rh=1, width=WIDTH):
+    """SdfUnit.v: radix-2^2 stage with twiddle resolution M"""
+    batch = re.shape[0]
+    re = re.reshape(batch, N // M, M)
+    im = im.reshape(batch, N // M, M)
+    h = M // 2
+    q = M // 4
+
+    # 1st butterfly over distance M/2, -j applied to the last quarter
+    y0_re, y0_im, y1_re, y1_im = butterfly(re[..., :h], im[..., :h],
+                                           re[..., h:], im[..., h:],
+                                           bf1_rh, width)
+    mj_re = y1_im[..., q:]
+    mj_im = wrap(-y1_re[..., q:], width)
+    y1_re = np.concatenate([y1_re[..., :q], mj_re], axis=-1)
+    y1_im = np.concatenate([y1_im[..., :q], mj_im], axis=-1)
+    re = np.concatenate([y0_re, y1_re], axis=-1).reshape(batch, N // M, 2, h)
+    im = np.concatenate([y0_im, y1_im], axis=-1).reshape(batch, N // M, 2, h)
+
+    # 2nd butterfly over distance M/4
+    y0_re, y0_im, y1_re, y1_im = butterfly(re[..., :q], im[..., :q],
+                                           re[..., q:], im[..., q:],
+                                           bf2_rh, width)
+    re = np.concatenate([y0_re, y1_re], axis=-1).reshape(batch, N // M, M)
+    im = np.concatenate([y0_im, y1_im], axis=-1).reshape(batch, N // M, M)
+
+    # Final stage (LOG_M == 2) has no multiplier
+    if M == 4:
+        return re.reshape(batch, N), im.reshape(batch, N)
+
+    # Twiddle multiply, bypassed when twiddle address is 0
+    addr = sdf_twiddle_addr(N, M)
+    mu_re, mu_im = multiply(re, im, tw_re[addr], tw_im[addr], width)
+    bypass = addr == 0
+    re = np.where(bypass, re, mu_re)
+    im = np.where(bypass, im, mu_im)
+    return re.reshape(batch, N), im.reshape(batch, N)
+
+
+def sdf_unit2(re, im, rh=0, width=WIDTH):
+    """SdfUnit2.v: radix-2 butterfly on consecutive sample pairs"""
+    y0_re, y0_im, y1_re, y1_im = butterfly(re[:, 0::2], im[:, 0::2],
+                                           re[:, 1::2], im[:, 1::2],
+                                           rh, width)
+    out_re = np.empty_like(re)
+    out_im = np.empty_like(im)
+    out_re[:, 0::2], out_re[:, 1::2] = y0_re, y1_re
+    out_im[:, 0::2], out_im[:, 1::2] = y0_im, y1_im
+    return out_re, out_im
+
+
+def fft_fixed(input_re, input_im, tw_re=None, tw_im=None, natural_order=True,
+              width=WIDTH):
+    """
+    Bit-accurate FFT of one frame or a (batch, N) stack of frames.
+
+    natural_order=True returns bins in natural order, matching the output
+    files written by SaveOutputData in TB512.v/TB128.v. With False the
+    pipeline (bit-reversed) order of do_re/do_im is returned.
+    """
+    re = np.asarray(input_re, dtype=np.int64)
+    im = np.asarray(input_im, dtype=np.int64)
+    squeeze = re.ndim == 1
+    re = np.atleast_2d(re)
+    im = np.atleast_2d(im)
+    N = re.shape[-1]
+    if tw_re is None or tw_im is None:
+        tw_re, tw_im = rom_twiddles(N, width)
+    tw_re = np.asarray(tw_re, dtype=np.int64)
+    tw_im = np.asarray(tw_im, dtype=np.int64)
+
+    M = N
+    while M >= 4:
+        re, im = sdf_unit(re, im, N, M, tw_re, tw_im, width=width)
+        M //= 4
+    if M == 2:
+        re, im = sdf_unit2(re, im, width=width)
+
+    if natural_order:
+        rev = bit_reverse_indices(N)
+        re = re[:, rev]
+        im = im[:, rev]
+    if squeeze:
+        return re[0], im[0]
+    return re, im
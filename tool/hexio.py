@@ -0,0 +1,217 @@
+"""
+Vectorized Hex Vector I/O
+-------------------------
+Shared reader/writer for the text vector files exchanged with the testbenches
+($readmemh inputs, $fdisplay/$fwrite outputs). Files are tokenized in bulk
+and converted with NumPy; no per-value int(x, 16) calls.
+
+Supported layout: whitespace separated columns, optional '//' comments and
+'@addr' markers (ignored). Unknown digits ('x', 'z') read as 0 and can be
+reported through a mask. Lines holding any other word (headers, simulator
+messages) are skipped as a whole rather than read as data.
+"""
+
+import numpy as np
+
+# ASCII -> digit value, -1 for separators / invalid characters
+_DIGIT_LUT = np.full(256, -1, dtype=np.int8)
+for _i, _c in enumerate(b'0123456789abcdef'):
+    _DIGIT_LUT[_c] = _i
+    _DIGIT_LUT[ord(chr(_c).upper())] = _i
+_UNKNOWN_LUT = np.zeros(256, dtype=bool)
+for _c in b'xXzZ?':
+    _DIGIT_LUT[_c] = 0
+    _UNKNOWN_LUT[_c] = True
+
+_HEX_CHARS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+_DEC_CHARS = np.frombuffer(b'0123456789', dtype=np.uint8)
+_SPACE_CHARS = np.frombuffer(b' \t\r\n\v\f', dtype=np.uint8)
+
+
+def to_signed(values, width=16):
+    """Vectorized two's complement conversion of unsigned width-bit values"""
+    values = np.asarray(values, dtype=np.int64)
+    return values - (((values >> (width - 1)) & 1) << width)
+
+
+def to_unsigned(values, width=16):
+    """Vectorized conversion of signed values to width-bit unsigned"""
+    return np.asarray(values, dtype=np.int64) & ((1 << width) - 1)
+
+
+def _mask_spans(n, starts, stops):
+    """Boolean mask of non-overlapping [start, stop) spans"""
+    delta = np.zeros(n + 1, dtype=np.int8)
+    delta[starts] = 1
+    delta[stops] -= 1
+    return np.cumsum(delta[:-1], dtype=np.int8) > 0
+
+
+def _comment_mask(data, chars, newlines):
+    """Mark characters that belong to '//' comments or '@addr' markers"""
+    n = len(chars)
+    mask = None
+    if b'//' in data:
+        slash = chars == ord('/')
+        starts = np.flatnonzero(slash[:-1] & slash[1:])
+        # Only the first comment of each line matters
+        line = np.searchsorted(newlines, starts)
+        first = np.concatenate(([True], line[1:] != line[:-1]))
+        starts, line = starts[first], line[first]
+        stops = np.append(newlines, n)[line]
+        mask = _mask_spans(n, starts, stops)
+    if b'@' in data:
+        # An address marker runs up to the next whitespace
+        at = np.flatnonzero(chars == ord('@'))
+        space = np.flatnonzero(np.isin(chars, _SPACE_CHARS))
+        stops = np.append(space, n)[np.searchsorted(space, at)]
+        at_mask = _mask_spans(n, at, stops)
+        mask = at_mask if mask is None else mask | at_mask
+    return mask
+
+
+def _text_lines(chars, digits, comment, newlines):
+    """Mark every line with a non-digit, non-whitespace character outside comments"""
+    other = (digits < 0) & ~np.isin(chars, _SPACE_CHARS)
+    if comment is not None:
+        other &= ~comment
+    bad = np.flatnonzero(other)
+    if len(bad) == 0:
+        return None
+    line = np.unique(np.searchsorted(newlines, bad))
+    starts = np.concatenate(([0], newlines + 1))[line]
+    stops = np.append(newlines, len(chars))[line]
+    return _mask_spans(len(chars), starts, stops)
+
+
+def parse_buffer(data, base=16):
+    """
+    Tokenize and convert a whole file buffer in one vectorized pass
+    Returns (values, unknown, ncols): token values, a mask of tokens with
+    x/z digits and the number of tokens on the first data line.
+    """
+    chars = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(chars == ord('\n'))
+    digits = _DIGIT_LUT[chars]
+    comment = _comment_mask(data, chars, newlines)
+    if comment is not None:
+        digits[comment] = -1
+    text = _text_lines(chars, digits, comment, newlines)
+    if text is not None:
+        digits[text] = -1
+    pos = np.flatnonzero(digits >= 0)
+    if len(pos) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool), 0
+    d = digits[pos].astype(np.int64)
+    if base != 16 and (d >= base).any():
+        raise ValueError(f"Invalid digit for base {base}")
+
+    # Token boundaries are gaps between consecutive digit positions
+    brk = np.flatnonzero(np.diff(pos) != 1)
+    starts = np.concatenate(([0], brk + 1))
+    ends = np.concatenate((brk, [len(pos) - 1]))
+    lengths = ends - starts + 1
+    if (lengths == lengths[0]).all():
+        # Fixed-width tokens (the usual %h dump): Horner over a 2-D view
+        values = np.zeros(len(starts), dtype=np.int64)
+        for col in d.reshape(len(starts), lengths[0]).T:
+            values = values * base + col
+    else:
+        place = np.repeat(ends, lengths) - np.arange(len(pos))
+        values = np.add.reduceat(d * np.power(base, place, dtype=np.int64), starts)
+    unknown = np.logical_or.reduceat(_UNKNOWN_LUT[chars[pos]], starts)
+
+    token_pos = pos[starts]
+    line_end = np.append(newlines, len(chars))[np.searchsorted(newlines, token_pos[0])]
+    ncols = int(np.searchsorted(token_pos, line_end))
+    return values, unknown, ncols
+
+
+def read_hex_columns(path, ncols=None, width=16, signed=True, base=16,
+                     return_unknown=False):
+    """
+    Read a vector file into a (rows, ncols) int64 array
+
+    ncols: number of columns per line (inferred from the first data line)
+    width: bit width used for the two's complement conversion
+    signed: convert values to signed width-bit integers
+    base: 16 for %h dumps, 10 for %d dumps
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    values, unknown, inferred = parse_buffer(data, base)
+    ncols = ncols or inferred or 1
+    usable = len(values) - len(values) % ncols
+    values = values[:usable]
+    unknown = unknown[:usable]
+    if signed:
+        values = to_signed(values, width)
+    values = values.reshape(-1, ncols)
+    unknown = unknown.reshape(-1, ncols)
+    if return_unknown:
+        return values, unknown
+    return values
+
+
+def read_hex_pairs(path, width=16, signed=True, base=16):
+    """Read a two-column (real, imag) vector file into two 1-D arrays"""
+    values = read_hex_columns(path, ncols=2, width=width, signed=signed, base=base)
+    return values[:, 0], values[:, 1]
+
+
+def read_hex_values(path, width=16, signed=True, base=16):
+    """Read a single-column vector file into a 1-D array"""
+    return read_hex_columns(path, ncols=1, width=width, signed=signed, base=base)[:, 0]
+
+
+def _format_fixed(values, chars, base, ndigits):
+    """Format non-negative integers as a (n, ndigits) uint8 character matrix"""
+    values = np.asarray(values, dtype=np.int64)
+    shifts = base ** np.arange(ndigits - 1, -1, -1, dtype=np.int64)
+    return chars[(values[:, None] // shifts) % base]
+
+
+def format_hex_columns(columns, width=16, index=False, comments=None):
+    """
+    Format equal-length integer columns as one bytes object
+    Each line: '<hex> <hex> ...[  // <index>]'
+    """
+    columns = [to_unsigned(np.ravel(c), width) for c in columns]
+    n = len(columns[0])
+    ndigits = (width + 3) // 4
+    sep = np.frombuffer(b'  ', dtype=np.uint8)
+    parts = []
+    for k, col in enumerate(columns):
+        if k:
+            parts.append(np.broadcast_to(sep, (n, len(sep))))
+        parts.append(_format_fixed(col, _HEX_CHARS, 16, ndigits))
+    if index:
+        idx_digits = max(1, len(str(max(n - 1, 0))))
+        idx = _format_fixed(np.arange(n), _DEC_CHARS, 10, idx_digits)
+        # Blank leading zeros like Verilog %d
+        lead = np.cumsum(idx != ord('0'), axis=1) == 0
+        lead[:, -1] = False
+        idx = np.where(lead, ord(' '), idx).astype(np.uint8)
+        marker = np.frombuffer(b'  // ', dtype=np.uint8)
+        parts.append(np.broadcast_to(marker, (n, len(marker))))
+        parts.append(idx)
+    parts.append(np.full((n, 1), ord('\n'), dtype=np.uint8))
+    body = np.concatenate(parts, axis=1).astype(np.uint8).tobytes()
+    header = b''
+    if comments:
+        header = b''.join(f"// {c}\n".encode() for c in comments)
+    return header + body
+
+
+def write_hex_columns(path, columns, width=16, index=False, comments=None):
+    """Write integer columns to a $readmemh compatible file in one buffered write"""
+    data = format_hex_columns(columns, width=width, index=index, comments=comments)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def write_hex_pairs(path, data_re, data_im, width=16, index=True, description=""):
+    """Write a (real, imag) vector file in the FFT testbench input format"""
+    comments = [description] if description else None
+    write_hex_columns(path, [data_re, data_im], width=width, index=index,
+                      comments=comments)
@@ -0,0 +1,128 @@
+"""
+Sparse Mel Filterbank
+---------------------
+Band/CSR storage of a mel filterbank for the reference path. Each triangular
+filter only covers a contiguous run of FFT bins, and neighbouring filters
+overlap by one slope, so a 40 x 257 matrix holds about 2 x 257 non-zeros
+(the NZ_MEL_SRAM_DEPTH = 257 encoding of MEL_FBANK relies on the same fact).
+
+A filterbank is a MelBands tuple of plain NumPy arrays:
+    start   (n_mel,)   first bin of each filter
+    length  (n_mel,)   number of bins of each filter
+    indptr  (n_mel+1,) CSR row pointers into indices/weights
+    indices (nnz,)     bin of each stored weight
+    weights (nnz,)     float weights, or Q1.15 integers after quantize()
+    n_bins             N_FFT/2 + 1
+
+apply_filterbank() gathers the needed bins once and does a segmented sum per
+filter, so the cost grows with nnz rather than n_mel x n_bins. Integer
+weights use the MEL_MAC arithmetic (Multiply_qx floor shift, 16-bit product,
+low 16 bits of the accumulator).
+"""
+
+import collections
+
+import numpy as np
+
+from fft_model import WIDTH, wrap
+import qformat
+
+MelBands = collections.namedtuple('MelBands',
+                                  ['start', 'length', 'indptr', 'indices', 'weights', 'n_bins'])
+
+
+def _from_spans(start, length, weights, n_bins):
+    length = np.asarray(length, dtype=np.int64)
+    indptr = np.concatenate([[0], np.cumsum(length)])
+    # Bin of every stored weight: start of its filter plus the offset inside it
+    row = np.repeat(np.arange(len(length)), length)
+    indices = np.asarray(start, dtype=np.int64)[row] + np.arange(indptr[-1]) - indptr[row]
+    return MelBands(np.asarray(start, dtype=np.int64), length, indptr, indices,
+                    np.asarray(weights), n_bins)
+
+
+def from_dense(mat):
+    """Band structure of a dense (n_mel, n_bins) matrix (interior zeros are kept)"""
+    mat = np.asarray(mat)
+    n_mel, n_bins = mat.shape
+    nz = mat != 0
+    has = nz.any(axis=1)
+    first = np.where(has, nz.argmax(axis=1), 0)
+    last = np.where(has, n_bins - 1 - nz[:, ::-1].argmax(axis=1), -1)
+    length = np.maximum(last - first + 1, 0)
+    bands = _from_spans(first, length, np.zeros(length.sum()), n_bins)
+    return bands._replace(weights=mat[np.repeat(np.arange(n_mel), length), bands.indices])
+
+
+def to_dense(bands):
+    """Dense (n_mel, n_bins) matrix of a band structure"""
+    mat = np.zeros((len(bands.start), bands.n_bins), dtype=bands.weights.dtype)
+    mat[np.repeat(np.arange(len(bands.start)), bands.length), bands.indices] = bands.weights
+    return mat
+
+
+def load_filterbank(path):
+    """Read an (n_bins, n_mel) float matrix file (encode_mel_gen.py layout)"""
+    return from_dense(np.loadtxt(path, dtype=float).T)
+
+
+def hz_to_mel(freq):
+    """HTK mel scale"""
+    return 2595.0 * np.log10(1.0 + np.asarray(freq, dtype=float) / 700.0)
+
+
+def mel_to_hz(mel):
+    return 700.0 * (10.0 ** (np.asarray(mel, dtype=float) / 2595.0) - 1.0)
+
+
+def mel_filterbank(n_mel=40, n_fft=512, sample_rate=16000, f_min=0.0, f_max=None):
+    """
+    Triangular HTK filterbank (torchaudio melscale_fbanks, norm=None) built
+    directly in band form, without the dense n_mel x n_bins matrix
+    """
+    f_max = sample_rate / 2 if f_max is None else f_max
+    n_bins = n_fft // 2 + 1
+    all_freqs = np.linspace(0, sample_rate // 2, n_bins)
+    f_pts = mel_to_hz(np.linspace(hz_to_mel(f_min), hz_to_mel(f_max), n_mel + 2))
+    # Exact band edges: the mel round trip can overshoot f_max by an ulp
+    f_pts[0], f_pts[-1] = f_min, f_max
+    f_diff = np.diff(f_pts)
+
+    # Filter m is non-zero strictly between f_pts[m] and f_pts[m + 2]
+    start = np.searchsorted(all_freqs, f_pts[:-2], side='right')
+    stop = np.searchsorted(all_freqs, f_pts[2:], side='left')
+    length = np.maximum(stop - start, 0)
+    bands = _from_spans(start, length, np.zeros(length.sum()), n_bins)
+
+    row = np.repeat(np.arange(n_mel), length)
+    freq = all_freqs[bands.indices]
+    up = (freq - f_pts[row]) / f_diff[row]
+    down = (f_pts[row + 2] - freq) / f_diff[row + 1]
+    return bands._replace(weights=np.maximum(0.0, np.minimum(up, down)))
+
+
+def quantize(bands, width=WIDTH):
+    """Q1.15 integer weights (round to nearest, clamped like encode_mel_fb.py)"""
+    return bands._replace(weights=qformat.quantize(bands.weights, width, width - 1))
+
+
+def apply_filterbank(power, bands, width=WIDTH):
+    """
+    Mel energies of a (frames, n_bins) batch as (frames, n_mel)
+    Float weights give the plain weighted sum; integer weights follow the
+    MEL_MAC fixed-point arithmetic with power read as signed WIDTH-bit.
+    """
+    power = np.atleast_2d(power)
+    gathered = power[:, bands.indices]
+    if np.issubdtype(bands.weights.dtype, np.integer):
+        products = wrap((gathered.astype(np.int64) * bands.weights) >> (width - 1), width)
+    else:
+        products = gathered * bands.weights
+    # Segmented reduction over the CSR rows (empty filters give 0)
+    mel = np.zeros((len(power), len(bands.start)), dtype=products.dtype)
+    used = bands.length > 0
+    if used.any():
+        mel[:, used] = np.add.reduceat(products, bands.indptr[:-1][used], axis=1)
+    if np.issubdtype(bands.weights.dtype, np.integer):
+        return wrap(mel, width)
+    return mel
@@ -0,0 +1,125 @@
+"""
+Bit-Accurate MEL_FBANK Model
+----------------------------
+NumPy integer model of Mel_fbank.v, Mel_mac.v and Multiply_qx.v driven by the
+mac_bits toggle encoding written by encode_mel_fb.py:
+- mac_bits.txt row i holds {mac_bits[1], mac_bits[0]} for FFT bin i,
+  mac_q15_hex.txt holds the 32-bit mel_fbank_weight word for the same bin
+- MEL_MAC_1 follows mac_bits[1] with weight[15:0], MEL_MAC_2 follows
+  mac_bits[0] with weight[31:16]; the *_d1 registers reset to 0 and 1
+- A MAC pulses when its bit differs from the previous cycle. The pulse
+  outputs the accumulator (mel_spec = c[15:0]) and restarts it with the
+  current product (clear & en) or with 0 (clear without en)
+- Both MACs pulsing in one cycle drives mel_spec = 0, mel_spec_vld = 0
+- product = (a * b) >>> 15 truncated to 16 bits (Multiply_qx), summed
+  sign-extended in the 32-bit accumulator
+
+Frames are (frames, N_FFT/2 + 1) power-spectrum batches. Accumulators and
+the delayed mac bits carry across frames and batches through the state
+returned by mel_fbank_cycles(). With flush=True every frame is followed by
+one idle cycle at bin 0, which is what BIN_CNT presents after wrapping in
+MEL_SPEC; the mel_fbank_tc testbench leaves the index at the last bin.
+"""
+
+import os
+
+import numpy as np
+
+from fft_model import WIDTH, multiply_qx, wrap
+import hexio
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+CONVERT_DIR = os.path.join(ROOT, 'mel_fbank_tc', 'convert')
+MAC_BITS = os.path.join(CONVERT_DIR, 'mac_bits.txt')
+MAC_WEIGHTS = os.path.join(CONVERT_DIR, 'mac_q15_hex.txt')
+
+ACC_WIDTH = 32
+
+
+def load_encoding(bits_path=MAC_BITS, weights_path=MAC_WEIGHTS, width=WIDTH):
+    """
+    Read the encoder outputs
+    Returns (bits, weights), both (n_bins, 2) int64 arrays ordered
+    [MEL_MAC_1, MEL_MAC_2]: bits = (mac_bits[1], mac_bits[0]) and
+    weights = signed (weight[15:0], weight[31:16]).
+    """
+    code = hexio.read_hex_values(bits_path, width=2, signed=False, base=2)
+    word = hexio.read_hex_values(weights_path, width=2 * width, signed=False)
+    bits = np.stack([(code >> 1) & 1, code & 1], axis=1)
+    weights = np.stack([hexio.to_signed(word & 0xFFFF, width),
+                        hexio.to_signed(word >> width, width)], axis=1)
+    return bits, weights
+
+
+def mac_products(power, weights, width=WIDTH):
+    """Multiply_qx products of a (frames, n_bins) batch for both MACs"""
+    a = np.asarray(power, dtype=np.int64)[..., None]
+    b = np.asarray(weights, dtype=np.int64)
+    c_re, _ = multiply_qx(a, np.zeros_like(a), b, np.zeros_like(b),
+                          width, width - 1, width, width - 1, width, width - 1)
+    return c_re.raw
+
+
+def mel_fbank_cycles(power, bits, weights, state=None, flush=True, width=WIDTH):
+    """
+    Cycle-accurate MEL_FBANK outputs for a batch of frames
+
+    power: (frames, n_bins) stft_bin values (read as signed WIDTH-bit)
+    bits, weights: from load_encoding()
+    state: carried from the previous batch; None starts from reset
+        followed by idle cycles at bin 0
+    Returns (mel_spec, mel_spec_vld, state); mel_spec and mel_spec_vld have
+    one column per clock cycle of a frame (n_bins, plus one with flush).
+    """
+    power = np.atleast_2d(np.asarray(power, dtype=np.int64))
+    frames, n_bins = power.shape
+    products = mac_products(power, weights[:n_bins], width)
+    seq = bits[:n_bins]
+    if flush:
+        # Idle cycle after BIN_CNT wraps: index 0, en low, product unused
+        products = np.concatenate([products, np.zeros((frames, 1, 2), np.int64)], axis=1)
+        seq = np.concatenate([seq, bits[:1]])
+    cycles = seq.shape[0]
+
+    if state is None:
+        prev0, acc0 = seq[0], np.zeros(2, dtype=np.int64)
+    else:
+        prev0, acc0 = state
+    prev = np.broadcast_to(seq[-1], (frames, 2)).copy()
+    prev[0] = prev0
+    delayed = np.concatenate([prev[:, None, :], np.broadcast_to(seq[:-1], (frames, cycles - 1, 2))],
+                             axis=1)
+    pulse = (seq[None] != delayed).reshape(-1, 2)
+    products = products.reshape(-1, 2)
+
+    # Accumulator before cycle t = S[t] - S[last pulse before t]
+    n = len(products)
+    spec = np.zeros((n, 2), dtype=np.int64)
+    acc = np.zeros(2, dtype=np.int64)
+    for k in range(2):
+        s = np.concatenate([[acc0[k]], acc0[k] + np.cumsum(products[:, k])])
+        q = np.flatnonzero(pulse[:, k])
+        base = np.concatenate([[0], s[q[:-1]]]) if len(q) else np.zeros(0, np.int64)
+        spec[q, k] = s[q] - base
+        acc[k] = s[n] - (s[q[-1]] if len(q) else 0)
+
+    vld = pulse[:, 0] ^ pulse[:, 1]
+    mel_spec = np.where(vld, np.where(pulse[:, 0], spec[:, 0], spec[:, 1]), 0)
+    mel_spec = wrap(mel_spec, width).reshape(frames, cycles)
+    vld = vld.reshape(frames, cycles)
+    return mel_spec, vld, (seq[-1].copy(), wrap(acc, ACC_WIDTH))
+
+
+def mel_fbank(power, bits=None, weights=None, flush=True, width=WIDTH):
+    """
+    Valid mel_spec values per frame, in output order
+    Returns (frames, outputs) when every frame yields the same number of
+    outputs (always the case with flush=True), otherwise a flat array.
+    """
+    if bits is None or weights is None:
+        bits, weights = load_encoding(width=width)
+    mel_spec, vld, _ = mel_fbank_cycles(power, bits, weights, flush=flush, width=width)
+    counts = vld.sum(axis=1)
+    if (counts == counts[0]).all():
+        return mel_spec[vld].reshape(len(vld), counts[0])
+    return mel_spec[vld]
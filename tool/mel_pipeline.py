@@ -0,0 +1,268 @@
+"""
+MEL_SPEC Reference Pipeline
+---------------------------
+Streaming golden model of Mel_spec.v, one generator stage per RTL block:
+
+    window_stage    WIN_LUT (Window_lut.v, cir_buffer.v, HannWin480.v)
+    fft_stage       STFT_PW2 ping-pong FFT512 pair (FFT1 has priority, so
+                    frames leave in input order), do_re/do_im bit-reversed
+    packed_fft_stage
+                    packed mode: two real frames per FFT512 pass plus the
+                    conjugate-symmetry split (tool/pack_model.py), bins
+                    0 .. N_FFT/2 in natural order, so PP_BUFFER is bypassed
+    power_stage     STFT_PW2 |X|^2: Multiply(re, re) + Multiply(im, im)
+    pp_buffer_stage PP_BUFFER: bit-reversed write, natural order read of
+                    the N_FFT/2 + 1 non-negative bins
+    bin_cnt_stage   BIN_CNT: 0 .. N_FFT/2 bin index per power sample
+    mel_fbank_stage MEL_FBANK: bit-true two-MAC model driven by the
+                    mac_bits encoding (tool/mel_model.py), or a sparse
+                    Q1.15 filterbank (tool/mel_filterbank.py) with the
+                    same MAC arithmetic
+
+Every stage consumes and yields int16 (frames, n) batches (int32 for
+WIDTH > 16), so audio of any length is processed in bounded memory:
+
+    mel = mel_pipeline(iter_chunks(samples, 16000))
+    for batch in mel: ...
+
+The stages model the intended frame behaviour; handshake latency and the
+stall cases of the RTL are not modelled. mel_data/mel_avail dumps from a
+simulation are checked with compare_mel_dump().
+
+Usage:
+    python tool/mel_pipeline.py signal.txt --dump mel_data.txt
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from fft_model import WIDTH, fft_fixed, round_shift_sat, wrap
+from batch_compare import compare_frames, report_failures
+from error_stats import ErrorStats
+import hexio
+import mel_filterbank
+import pack_model
+import mel_model
+import reorder_model
+import win_model
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+N_FFT = win_model.N_FFT
+N_MEL = 40
+MEL_FB_FLOAT = os.path.join(ROOT, 'mel_fbank_tc', 'convert', 'mel_fb_float.txt')
+
+
+def sample_dtype(width=WIDTH):
+    """Smallest integer dtype holding a WIDTH-bit sample"""
+    return np.int16 if width <= 16 else np.int32
+
+
+def iter_chunks(samples, chunk=16000):
+    """Split a sample array (or memmap) into chunks without copying"""
+    for start in range(0, len(samples), chunk):
+        yield samples[start:start + chunk]
+
+
+def load_mel_weights(path=MEL_FB_FLOAT):
+    """
+    Q1.15 filterbank in band form (mel_filterbank.MelBands) from the
+    (n_bins, n_mel) float matrix used by encode_mel_fb.py
+    """
+    return mel_filterbank.quantize(mel_filterbank.load_filterbank(path))
+
+
+def window_stage(chunks, n_fft=N_FFT, win_len=win_model.WIN_LEN,
+                 hop_len=win_model.HOP_LEN, rom=None, width=WIDTH):
+    """WIN_LUT: sample chunks -> (frames_re, frames_im) batches"""
+    if rom is None:
+        rom = win_model.hann_rom()
+    tail = np.zeros(0, dtype=np.int64)
+    for chunk in chunks:
+        buf = np.concatenate([tail, np.asarray(chunk, dtype=np.int64)])
+        frames_re, frames_im = win_model.window_frames(buf, n_fft, win_len, hop_len,
+                                                       rom, width)
+        if len(frames_re):
+            dtype = sample_dtype(width)
+            yield frames_re.astype(dtype), frames_im.astype(dtype)
+        tail = buf[len(frames_re) * hop_len:]
+
+
+def fft_stage(batches, width=WIDTH):
+    """STFT_PW2 ping-pong FFT512: frames in input order, bins in do_re order"""
+    for frames_re, frames_im in batches:
+        re, im = fft_fixed(frames_re, frames_im, natural_order=False, width=width)
+        yield re.astype(sample_dtype(width)), im.astype(sample_dtype(width))
+
+
+def packed_fft_stage(batches, rh=1, width=WIDTH):
+    """
+    Packed FFT512: frame pairs (2i, 2i+1) share one pass, split back into
+    natural-order half spectra; an odd frame waits for its partner in the
+    next batch and is paired with a zero frame at the end of the stream
+    """
+    carry = None
+    for frames_re, _ in batches:
+        frames = np.asarray(frames_re, dtype=np.int64)
+        if carry is not None:
+            frames = np.concatenate([carry, frames])
+        odd = len(frames) % 2
+        carry = frames[-1:] if odd else None
+        frames = frames[:len(frames) - odd]
+        if len(frames):
+            re, im = pack_model.packed_fft(frames, rh=rh, width=width)
+            yield re.astype(sample_dtype(width)), im.astype(sample_dtype(width))
+    if carry is not None:
+        re, im = pack_model.packed_fft(carry, rh=rh, width=width)
+        yield re.astype(sample_dtype(width)), im.astype(sample_dtype(width))
+
+
+def power_stage(batches, width=WIDTH):
+    """
+    STFT_PW2 power: Multiply(re, re).m_re + Multiply(im, im).m_re
+    Each square saturates at 32767, so the sum fits the unsigned 16-bit
+    stft_pw2_data and the all-ones clamp never fires. Yielded as the int16
+    bit pattern, which is how MEL_MAC reads its signed 'a' input.
+    """
+    for re, im in batches:
+        re = re.astype(np.int64)
+        im = im.astype(np.int64)
+        power = round_shift_sat(re * re, width) + round_shift_sat(im * im, width)
+        yield wrap(power, width).astype(sample_dtype(width))
+
+
+def pp_buffer_stage(batches, depth=None):
+    """
+    PP_BUFFER: bit-reversed writes, natural order reads of the first depth
+    bins, i.e. reorder_model.reorder() of each whole N_FFT frame (the RTL
+    bank of DEPTH = N_FFT/2+1 words is the intended behaviour, see
+    reorder_model.pp_buffer() for the cycle-level model)
+    """
+    for power in batches:
+        out, _ = reorder_model.reorder(power, power.shape[-1])
+        yield out[:, :depth or power.shape[-1] // 2 + 1]
+
+
+def bin_cnt_stage(batches):
+    """BIN_CNT: attach the stft_bin_idx counter (0 .. depth-1, wraps per frame)"""
+    for power in batches:
+        idx = np.broadcast_to(np.arange(power.shape[-1], dtype=np.int16), power.shape)
+        yield power, idx
+
+
+def mel_fbank_stage(batches, encoding=None, weights=None, width=WIDTH):
+    """
+    MEL_FBANK: (power, bin_idx) batches -> (frames, outputs) mel_spec batches
+    encoding: (bits, weights) from mel_model.load_encoding(), used by default
+    weights: Q1.15 MelBands filterbank (one output per filter) instead of
+        the MAC encoding
+    """
+    if weights is not None:
+        for power, _ in batches:
+            yield mel_filterbank.apply_filterbank(power, weights, width).astype(sample_dtype(width))
+        return
+    bits, mac_weights = encoding or mel_model.load_encoding(width=width)
+    state = None
+    for power, idx in batches:
+        rows = idx[0].astype(np.intp)
+        mel_spec, vld, state = mel_model.mel_fbank_cycles(
+            power, bits[rows], mac_weights[rows], state, flush=True, width=width)
+        # Same output pattern in every frame with the idle cycle after BIN_CNT wraps
+        yield mel_spec[vld].reshape(len(vld), -1).astype(sample_dtype(width))
+
+
+def mel_pipeline(chunks, encoding=None, weights=None, n_fft=N_FFT,
+                 win_len=win_model.WIN_LEN, hop_len=win_model.HOP_LEN, width=WIDTH,
+                 rom=None, packed=False):
+    """
+    Compose all MEL_SPEC stages: sample chunks -> (frames, n_mel) mel batches
+    packed: two real frames per FFT pass (packed_fft_stage) instead of FFT512
+    with a zero imaginary input
+    """
+    stage = window_stage(chunks, n_fft, win_len, hop_len, rom, width)
+    if packed:
+        stage = power_stage(packed_fft_stage(stage, width=width), width)
+    else:
+        stage = pp_buffer_stage(power_stage(fft_stage(stage, width), width))
+    stage = bin_cnt_stage(stage)
+    return mel_fbank_stage(stage, encoding, weights, width)
+
+
+def read_mel_dump(path, width=WIDTH):
+    """
+    mel_data values from a simulation dump
+    One column: mel_data logged on mel_avail cycles. Two columns: one line per
+    cycle with mel_avail and mel_data; only the valid cycles are kept.
+    """
+    data = hexio.read_hex_columns(path, width=width)
+    if data.shape[1] >= 2:
+        return data[data[:, 0] != 0, 1]
+    return data[:, 0]
+
+
+def compare_mel_dump(golden, path, tolerance=0, max_errors=10):
+    """Compare (frames, n_mel) golden mel batches with a mel_data dump"""
+    golden = np.concatenate(list(golden)) if not isinstance(golden, np.ndarray) else golden
+    n_mel = golden.shape[-1]
+    rtl = read_mel_dump(path)
+    frames = min(len(rtl) // n_mel, len(golden))
+    if len(rtl) != golden.size:
+        print(f"  Warning: dump has {len(rtl)} values, golden {golden.size}; "
+              f"comparing {frames} frames")
+    golden = golden[:frames].astype(np.int64)
+    rtl = rtl[:frames * n_mel].reshape(frames, n_mel)
+    zeros = np.zeros_like(golden)
+    result = compare_frames(golden, zeros, rtl, zeros, tolerance)
+    report_failures(result, golden, zeros, rtl, zeros, max_errors=max_errors)
+    ErrorStats(n_bins=n_mel, tolerance=tolerance).update(golden, rtl).report("Mel error")
+    return bool(result['passed'].all()) and frames > 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MEL_SPEC golden model")
+    parser.add_argument('signal', help="Input sample file (hex, first column = signal_re)")
+    parser.add_argument('--dump', help="mel_data dump to compare against")
+    parser.add_argument('--output', help="Write golden mel_data values (hex)")
+    parser.add_argument('--chunk', type=int, default=16000,
+                        help="Samples per input chunk (default: 16000)")
+    parser.add_argument('--weights', default=None,
+                        help="Float filterbank matrix (n_bins x n_mel) instead of the "
+                             "mac_bits encoding, e.g. " + os.path.relpath(MEL_FB_FLOAT, ROOT))
+    parser.add_argument('--tolerance', type=int, default=0)
+    parser.add_argument('--packed', action='store_true',
+                        help="Two real frames per FFT pass (pack_model.py)")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("MEL_SPEC Reference Pipeline")
+    print("=" * 80)
+
+    samples = hexio.read_hex_columns(args.signal)[:, 0]
+    start = time.perf_counter()
+    weights = load_mel_weights(args.weights) if args.weights else None
+    mel = list(mel_pipeline(iter_chunks(samples, args.chunk), weights=weights,
+                            packed=args.packed))
+    seconds = time.perf_counter() - start
+    mel = np.concatenate(mel) if mel else np.zeros((0, N_MEL), dtype=np.int16)
+    print(f"Samples: {len(samples)}, frames: {len(mel)}, "
+          f"{len(samples) / max(seconds, 1e-9) / 1e6:.2f} Msamples/s")
+
+    if args.output:
+        hexio.write_hex_columns(args.output, [mel.reshape(-1)])
+        print(f"Golden mel_data written to {args.output}")
+
+    if args.dump:
+        passed = compare_mel_dump(mel, args.dump, args.tolerance)
+        print("=" * 80)
+        print("✓ MEL_SPEC MATCHES" if passed else "✗ MEL_SPEC MISMATCH")
+        print("=" * 80)
+        return passed
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,186 @@
+"""
+Packed Real-Input FFT Model
+---------------------------
+ICB_MSP drives only signal_re, so every complex FFT512 pass in STFT_PW2
+transforms one real frame against an all-zero imaginary input. In packed
+mode two consecutive real frames x (even) and y (odd) share one pass:
+
+    z = x + j*y  ->  Z = FFT(z)  ->  X[k] = (Z[k] + conj(Z[N-k])) / 2
+                                     Y[k] = (Z[k] - conj(Z[N-k])) / 2j
+
+The split is one Butterfly.v per bin k = 0 .. N/2, fed with Z[k] and
+Z[N-k] from a natural-order buffer (two read ports, or PP_BUFFER style
+reads at k and N-k):
+
+    Butterfly(x0 = Re Z[N-k] + j Im Z[k], x1 = Re Z[k] + j Im Z[N-k])
+        y0 = Re X[k] + j Re Y[k],  y1 = Im Y[k] + j Im X[k]
+
+with the [WIDTH:0] sum, (x + RH) >>> 1 and WIDTH-bit truncation of
+Butterfly.v, so X and Y keep the 1/N scale of the direct FFT and never
+overflow. Bins 0 and N/2 come out purely real, as for the direct path.
+The split defaults to RH=1 (as BF2): with RH=0 the halving floors every
+bin and costs about 1.5 dB SQNR. Packed spectra differ from the direct FFT
+of each frame only by the rounding of the shared pipeline and the split.
+
+    re, im = pack_frames(frames)                 # (2m, N) real -> (m, N) complex
+    x_re, x_im = packed_fft(frames)              # (2m, N/2+1) half spectra
+
+Usage:
+    python tool/pack_model.py --test-seconds 2
+    python tool/pack_model.py --input packed.txt --fft-output output.txt
+"""
+
+import argparse
+import functools
+import sys
+
+import numpy as np
+
+from fft_model import WIDTH, butterfly, fft_fixed
+import hexio
+
+
+@functools.lru_cache(maxsize=None)
+def mirror_indices(N):
+    """(N - k) mod N for k = 0 .. N/2 (cached, read-only)"""
+    mirror = (N - np.arange(N // 2 + 1)) % N
+    mirror.flags.writeable = False
+    return mirror
+
+
+def pack_frames(frames):
+    """
+    (re, im) complex frames from real frames: frame 2i goes to re and frame
+    2i+1 to im of pass i; an odd count is padded with an all-zero frame
+    """
+    frames = np.atleast_2d(np.asarray(frames, dtype=np.int64))
+    if len(frames) % 2:
+        frames = np.concatenate([frames, np.zeros_like(frames[:1])])
+    return frames[0::2], frames[1::2]
+
+
+def unpack_frames(re, im, count=None):
+    """Real frames back from packed (re, im) pairs, in the original order"""
+    re = np.atleast_2d(re)
+    frames = np.empty((2 * len(re),) + re.shape[1:], dtype=re.dtype)
+    frames[0::2] = re
+    frames[1::2] = np.atleast_2d(im)
+    return frames[:count]
+
+
+def split_spectra(z_re, z_im, rh=1, width=WIDTH):
+    """
+    Bit-true conjugate-symmetry split of natural-order packed spectra
+    z_re, z_im: (passes, N) FFT output of pack_frames()
+    Returns (x_re, x_im, y_re, y_im), each (passes, N/2 + 1)
+    """
+    z_re = np.atleast_2d(np.asarray(z_re, dtype=np.int64))
+    z_im = np.atleast_2d(np.asarray(z_im, dtype=np.int64))
+    N = z_re.shape[-1]
+    k = np.arange(N // 2 + 1)
+    m = mirror_indices(N)
+    x_re, y_re, y_im, x_im = butterfly(z_re[:, m], z_im[:, k], z_re[:, k], z_im[:, m],
+                                       rh, width)
+    return x_re, x_im, y_re, y_im
+
+
+def interleave_spectra(x_re, x_im, y_re, y_im, count=None):
+    """(re, im) half spectra of every real frame, in frame order"""
+    return unpack_frames(x_re, y_re, count), unpack_frames(x_im, y_im, count)
+
+
+def packed_fft(frames, tw_re=None, tw_im=None, rh=1, width=WIDTH):
+    """
+    Half spectra (bins 0 .. N/2, natural order) of real frames computed two
+    per FFT pass; returns (re, im) of shape (frames, N/2 + 1)
+    """
+    frames = np.atleast_2d(frames)
+    re, im = pack_frames(frames)
+    z_re, z_im = fft_fixed(re, im, tw_re, tw_im, natural_order=True, width=width)
+    return interleave_spectra(*split_spectra(z_re, z_im, rh, width), count=len(frames))
+
+
+def direct_fft(frames, tw_re=None, tw_im=None, width=WIDTH):
+    """Half spectra of real frames with one FFT pass each (zero imaginary input)"""
+    frames = np.atleast_2d(np.asarray(frames, dtype=np.int64))
+    re, im = fft_fixed(frames, np.zeros_like(frames), tw_re, tw_im, width=width)
+    n_bins = frames.shape[-1] // 2 + 1
+    return re[:, :n_bins], im[:, :n_bins]
+
+
+def float_spectra(frames):
+    """Float reference: rfft of the integer frames with the FFT512 1/N scaling"""
+    frames = np.atleast_2d(frames)
+    return np.fft.rfft(frames, axis=-1) / frames.shape[-1]
+
+
+def evaluate(frames, rh=1, width=WIDTH):
+    """Packed vs direct accuracy of real frames; returns a dict of metrics"""
+    import sweep
+    ref = float_spectra(frames)
+    p_re, p_im = packed_fft(frames, rh=rh, width=width)
+    d_re, d_im = direct_fft(frames, width=width)
+    diff = np.maximum(np.abs(p_re - d_re), np.abs(p_im - d_im))
+    return {
+        'frames': len(ref),
+        'passes_direct': len(ref),
+        'passes_packed': -(-len(ref) // 2),
+        'sqnr_direct': sweep.sqnr_db(ref, d_re + 1j * d_im),
+        'sqnr_packed': sweep.sqnr_db(ref, p_re + 1j * p_im),
+        'max_diff': int(diff.max(initial=0)),
+        'mean_diff': float(diff.mean()) if diff.size else 0.0,
+    }
+
+
+def check_fft_output(input_path, output_path, rh=1, width=WIDTH):
+    """
+    Split an FFT512 output file (natural order, as TB512.v writes) of a
+    packed input file and compare both with the bit-true model
+    """
+    from batch_compare import compare_frames, report_failures
+    packed = hexio.read_hex_columns(input_path, ncols=2, width=width)
+    rtl = hexio.read_hex_columns(output_path, ncols=2, width=width)
+    N = len(packed)
+    z_re, z_im = fft_fixed(packed[:, 0], packed[:, 1], width=width)
+    g_re, g_im = interleave_spectra(*split_spectra(z_re, z_im, rh, width))
+    t_re, t_im = interleave_spectra(*split_spectra(rtl[:N, 0], rtl[:N, 1], rh, width))
+    result = compare_frames(g_re, g_im, t_re, t_im)
+    return report_failures(result, g_re, g_im, t_re, t_im)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Packed real-input FFT model")
+    parser.add_argument('--test-seconds', type=float, default=1.0,
+                        help="Length of the sweep.py test signal (default: 1.0)")
+    parser.add_argument('--input', help="Packed FFT input (hex re im, one frame)")
+    parser.add_argument('--fft-output', help="FFT output of --input to split and check")
+    parser.add_argument('--rh', type=int, default=1, choices=[0, 1],
+                        help="Split butterfly rounding (Butterfly.v RH)")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("Packed Real-Input FFT: two real frames per complex FFT pass")
+    print("=" * 80)
+
+    if args.input and args.fft_output:
+        passed = check_fft_output(args.input, args.fft_output, args.rh)
+        print("✓ Split spectra match the model" if passed else
+              "✗ Split spectra differ from the model")
+        return passed
+
+    import sweep
+    import win_model
+    x = sweep.test_signal(args.test_seconds)
+    samples = np.clip(np.floor(x * 32768 + 0.5), -32768, 32767).astype(np.int64)
+    frames, _ = win_model.window_frames(samples)
+    m = evaluate(frames, args.rh)
+    print(f"Frames: {m['frames']}, FFT passes: {m['passes_direct']} direct, "
+          f"{m['passes_packed']} packed")
+    print(f"SQNR vs float: direct {m['sqnr_direct']:.2f} dB, "
+          f"packed {m['sqnr_packed']:.2f} dB")
+    print(f"Packed vs direct: max {m['max_diff']} LSB, mean {m['mean_diff']:.3f} LSB")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,79 @@
+"""
+Background Verification Plots
+-----------------------------
+Helpers that keep plotting off the critical path of the verifiers:
+- pyplot() imports matplotlib (Agg backend) on first use only, so a
+  verifier that does not plot never pays for the import
+- submit() renders a figure in a background process pool; the verifier
+  prints its verdict right away and wait() collects the plots at the end
+- failing_frames() selects the frames worth plotting from a
+  batch_compare.compare_frames() result
+
+Plot functions must be module-level (picklable) and take plain arrays.
+Without matplotlib, submit() prints one notice and skips the plots.
+
+    plotting.submit(plot_frame, golden[f], rtl[f], path)
+    ...
+    plotting.wait()
+"""
+
+import atexit
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+_pool = None
+_futures = []
+
+
+def available():
+    """True when matplotlib can be imported"""
+    return importlib.util.find_spec('matplotlib') is not None
+
+
+def pyplot():
+    """matplotlib.pyplot with the non-interactive Agg backend (deferred import)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def failing_frames(result, limit=None):
+    """Indices of the failing frames of a compare_frames() result (first limit)"""
+    failed = np.flatnonzero(~np.asarray(result['passed']))
+    return failed[:limit] if limit is not None else failed
+
+
+def submit(func, *args, **kwargs):
+    """Render func(*args, **kwargs) in the background pool; None if not plotting"""
+    global _pool
+    if not available():
+        if _pool is not False:
+            print("matplotlib not installed - skipping plots")
+        _pool = False
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=2)
+        atexit.register(wait)
+    future = _pool.submit(func, *args, **kwargs)
+    _futures.append(future)
+    return future
+
+
+def wait():
+    """Wait for all submitted plots, print their paths and shut the pool down"""
+    global _pool
+    for future in _futures:
+        try:
+            path = future.result()
+        except Exception as e:
+            print(f"Plot failed: {type(e).__name__}: {e}")
+        else:
+            if path:
+                print(f"Plot saved: {path}")
+    _futures.clear()
+    if _pool:
+        _pool.shutdown()
+        _pool = None
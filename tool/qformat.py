@@ -0,0 +1,201 @@
+"""
+Fixed-Point Q-Format Arrays
+---------------------------
+Vectorized two's complement fixed point with the RTL semantics spelled out:
+- width / q: total bits and fraction bits (Q1.15 is width=16, q=15)
+- overflow: 'wrap' (Verilog truncation, as in `assign c_re = sum_re`) or
+  'saturate' (clamp to the width-bit range)
+- rounding when bits are dropped: 'truncate' (arithmetic shift >>>, i.e.
+  floor), 'half_up' (add half an LSB first, the Butterfly RH=1 path and
+  floor(x + 0.5) of twiddle.py) or 'even' (round half to even, the
+  convergent rounding of Multiply.v and np.round)
+
+The module functions work on plain int64 arrays and are what the models in
+fft_model / mel_model use; QArray carries the format along with the values:
+
+    a = QArray.from_float(x, width=16, q=15)        # saturating, half even
+    p = a * b                                        # exact: width 32, Q30
+    c = p.cast(16, 15, rounding='truncate')          # Multiply_qx: >>> 15, wrap
+    y = (((x0 + x1) + 1) >> 1).cast(16)              # Butterfly RH=1
+
+Arithmetic is exact and grows the width like the RTL wires do ([WIDTH:0]
+sums, WIDTH_A+WIDTH_B products); cast() applies the rounding and overflow
+modes; >> and << are the plain Verilog shifts. Plain integers in
+arithmetic are raw LSBs, as constants are in RTL.
+"""
+
+import numpy as np
+
+ROUNDING = ('truncate', 'half_up', 'even')
+OVERFLOW = ('wrap', 'saturate')
+
+
+def wrap(x, width=16):
+    """Wrap integers to a signed two's complement width (Verilog truncation)"""
+    half = 1 << (width - 1)
+    return ((x + half) & ((1 << width) - 1)) - half
+
+
+def saturate(x, width=16):
+    """Clamp integers to the signed width-bit range"""
+    return np.clip(x, -(1 << (width - 1)), (1 << (width - 1)) - 1)
+
+
+def fit(x, width=16, overflow='wrap'):
+    """Bring integers into width bits with the given overflow mode"""
+    if overflow == 'wrap':
+        return wrap(x, width)
+    if overflow == 'saturate':
+        return saturate(x, width)
+    raise ValueError(f"Unknown overflow mode: {overflow}")
+
+
+def shift_right(x, n, rounding='truncate'):
+    """Arithmetic right shift by n bits with the given rounding (n <= 0 shifts left)"""
+    x = np.asarray(x, dtype=np.int64)
+    if n <= 0:
+        return x << -n
+    if rounding == 'truncate':
+        return x >> n
+    if rounding == 'half_up':
+        return (x + (1 << (n - 1))) >> n
+    if rounding == 'even':
+        keep = x >> n
+        rest = x & ((1 << n) - 1)
+        half = 1 << (n - 1)
+        return keep + ((rest > half) | ((rest == half) & ((keep & 1) == 1)))
+    raise ValueError(f"Unknown rounding mode: {rounding}")
+
+
+def quantize(values, width=16, q=15, rounding='even', overflow='saturate', scale=None):
+    """
+    Integer codes of float values
+    scale defaults to 2^q (e.g. 2^(NB-1)-1 for the Hann ROM)
+    """
+    x = np.asarray(values, dtype=np.float64) * (2.0 ** q if scale is None else scale)
+    if rounding == 'truncate':
+        x = np.floor(x)
+    elif rounding == 'half_up':
+        x = np.floor(x + 0.5)
+    elif rounding == 'even':
+        x = np.round(x)
+    else:
+        raise ValueError(f"Unknown rounding mode: {rounding}")
+    return fit(x.astype(np.int64), width, overflow)
+
+
+def to_float(codes, q=15):
+    """Real values of integer codes with q fraction bits"""
+    return np.asarray(codes) / float(1 << q)
+
+
+class QArray:
+    """Signed fixed-point array: int64 codes with width bits, q of them fractional"""
+
+    __slots__ = ('raw', 'width', 'q', 'overflow', 'rounding')
+
+    def __init__(self, raw, width=16, q=15, overflow='wrap', rounding='truncate'):
+        if overflow not in OVERFLOW:
+            raise ValueError(f"Unknown overflow mode: {overflow}")
+        if rounding not in ROUNDING:
+            raise ValueError(f"Unknown rounding mode: {rounding}")
+        self.width = width
+        self.q = q
+        self.overflow = overflow
+        self.rounding = rounding
+        self.raw = fit(np.asarray(raw, dtype=np.int64), width, overflow)
+
+    @classmethod
+    def from_float(cls, values, width=16, q=15, overflow='saturate', rounding='even'):
+        """Quantize floats; rounding and overflow apply to the conversion"""
+        return cls(quantize(values, width, q, rounding, overflow), width, q,
+                   overflow, rounding)
+
+    @classmethod
+    def from_unsigned(cls, codes, width=16, q=15, **modes):
+        """Codes read as unsigned width-bit patterns (e.g. hex dumps)"""
+        return cls(wrap(np.asarray(codes, dtype=np.int64), width), width, q, **modes)
+
+    def _like(self, raw, width, q):
+        return QArray(raw, width, q, self.overflow, self.rounding)
+
+    def to_float(self):
+        return to_float(self.raw, self.q)
+
+    def unsigned(self):
+        """Two's complement bit patterns, as written with %h"""
+        return self.raw & ((1 << self.width) - 1)
+
+    def cast(self, width=None, q=None, rounding=None, overflow=None):
+        """
+        Convert to another format: drop (or add) fraction bits with the
+        rounding mode, then fit the integer part with the overflow mode
+        """
+        width = self.width if width is None else width
+        q = self.q if q is None else q
+        raw = shift_right(self.raw, self.q - q, rounding or self.rounding)
+        return QArray(fit(raw, width, overflow or self.overflow), width, q,
+                      overflow or self.overflow, rounding or self.rounding)
+
+    def _align(self, other):
+        """(raw_a, raw_b, width, q) of both operands at the larger q"""
+        if not isinstance(other, QArray):
+            raw = np.asarray(other)
+            if raw.dtype.kind == 'f':
+                raise TypeError("QArray arithmetic takes integers (raw LSBs) or QArrays")
+            return self.raw, raw.astype(np.int64), self.width, self.q
+        q = max(self.q, other.q)
+        a = self.raw << (q - self.q)
+        b = other.raw << (q - other.q)
+        width = max(self.width - self.q, other.width - other.q) + q
+        return a, b, width, q
+
+    def __add__(self, other):
+        a, b, width, q = self._align(other)
+        return self._like(a + b, width + 1, q)
+
+    def __sub__(self, other):
+        a, b, width, q = self._align(other)
+        return self._like(a - b, width + 1, q)
+
+    def __radd__(self, other):
+        return self + other
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __neg__(self):
+        return self._like(-self.raw, self.width + 1, self.q)
+
+    def __mul__(self, other):
+        if not isinstance(other, QArray):
+            other = QArray(np.asarray(other, dtype=np.int64),
+                           max(1, int(np.abs(other).max(initial=0)).bit_length() + 1), 0)
+        return self._like(self.raw * other.raw, self.width + other.width, self.q + other.q)
+
+    __rmul__ = __mul__
+
+    def __rshift__(self, n):
+        """Verilog >>>: drop n LSBs (floor), format unchanged"""
+        return self._like(self.raw >> n, self.width, self.q)
+
+    def __lshift__(self, n):
+        """Verilog <<<: shift the bits up n places, wrapping or saturating in width"""
+        return self._like(self.raw << n, self.width, self.q)
+
+    def __getitem__(self, idx):
+        return self._like(self.raw[idx], self.width, self.q)
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.raw if dtype is None else self.raw.astype(dtype)
+
+    @property
+    def shape(self):
+        return self.raw.shape
+
+    def __repr__(self):
+        return (f"QArray({self.raw!r}, width={self.width}, q={self.q}, "
+                f"overflow={self.overflow!r}, rounding={self.rounding!r})")
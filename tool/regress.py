@@ -0,0 +1,200 @@
+"""
+Parallel Regression Runner
+--------------------------
+Finds simulation output / golden pairs in the testbench directories and runs
+the existing verifiers for all of them in a process pool, then prints one
+pass/fail matrix with per-vector timings.
+
+Verifiers are called in-process (no new interpreter per vector) from the
+testbench directory they expect as working directory. Their console output
+is captured and only shown for vectors that do not pass.
+
+Usage:
+    python tool/regress.py                      # all testbenches
+    python tool/regress.py --tc fft_512_tc -j 8
+"""
+
+import argparse
+import contextlib
+import glob
+import importlib.util
+import io
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+PASS, FAIL, MISSING, ERROR = 'PASS', 'FAIL', 'MISSING', 'ERROR'
+
+
+def _numbered(pattern, tc_dir):
+    """Files matching pattern (with one {} for the number), sorted numerically"""
+    paths = glob.glob(os.path.join(tc_dir, pattern.format('*')))
+    regex = re.compile(re.escape(pattern).replace(r'\{\}', r'(\d+)') + '$')
+    found = []
+    for pth in paths:
+        m = regex.search(os.path.relpath(pth, tc_dir).replace(os.sep, '/'))
+        if m:
+            found.append((int(m.group(1)), os.path.relpath(pth, tc_dir)))
+    return [pth for _, pth in sorted(found)]
+
+
+def _fft_jobs(tc, in_pattern, out_pattern, **kwargs):
+    """One job per input vector; the matching output may be missing"""
+    tc_dir = os.path.join(ROOT, tc)
+    jobs = []
+    for in_pth in _numbered(in_pattern, tc_dir):
+        num = re.search(r'(\d+)\.txt$', in_pth).group(1)
+        out_pth = out_pattern.format(num)
+        name = f"{os.path.basename(in_pth)} -> {os.path.basename(out_pth)}"
+        jobs.append((tc, name, 'verify_fft.py', 'verify_batch',
+                     ([in_pth], [out_pth]), kwargs, [in_pth, out_pth]))
+    return jobs
+
+
+def _fft_512_jobs():
+    jobs = _fft_jobs('fft_512_tc', 'input_iverilog/input{}.txt',
+                     'output_iverilog/output{}.txt')
+    bin_pair = ['input_iverilog/input.bin', 'output_iverilog/output.bin']
+    if os.path.exists(os.path.join(ROOT, 'fft_512_tc', bin_pair[1])):
+        # BIN_VECTORS run: per-test text outputs are not written
+        jobs = [job for job in jobs
+                if os.path.exists(os.path.join(ROOT, 'fft_512_tc', job[6][1]))]
+        jobs.append(('fft_512_tc', 'input.bin -> output.bin', 'verify_fft.py',
+                     'verify_batch', ([bin_pair[0]], [bin_pair[1]]), {}, bin_pair))
+    return jobs
+
+
+def _fft_128_jobs():
+    return _fft_jobs('fft_128_tc', 'input{}.txt', 'output{}.txt', tolerance=2)
+
+
+def _win_lut_jobs():
+    return [('win_lut_tc', 'windowed frames', 'verify.py', 'main', (), {},
+             ['input.txt', 'output_vivado.txt'])]
+
+
+def _mel_fbank_jobs():
+    return [('mel_fbank_tc', 'mel_output.txt vs bit-true model', 'verify_mel.py', 'main',
+             (), {}, ['mel_output.txt', 'random_fft_bins_q15.txt'])]
+
+
+def _compare_jobs(tc):
+    return [(tc, 'output.txt vs golden', 'verify.py', 'verify_output', (), {},
+             ['output.txt', 'golden_output.txt'])]
+
+
+TESTBENCHES = {
+    'fft_128_tc': _fft_128_jobs,
+    'fft_512_tc': _fft_512_jobs,
+    'win_lut_tc': _win_lut_jobs,
+    'mel_fbank_tc': _mel_fbank_jobs,
+    'brr_pp_tc': lambda: _compare_jobs('brr_pp_tc'),
+    'pp_buffer_tc': lambda: _compare_jobs('pp_buffer_tc'),
+    'fake_mem_tc': lambda: _compare_jobs('fake_mem_tc'),
+}
+
+
+def _load_verifier(tc, script):
+    """Import a testbench script under a unique name (several share a name)"""
+    tc_dir = os.path.join(ROOT, tc)
+    name = f"{tc}_{os.path.splitext(script)[0]}"
+    if name in sys.modules:
+        return sys.modules[name]
+    sys.path.insert(0, tc_dir)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(tc_dir, script))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def run_job(tc, script, func, args, kwargs, required):
+    """Worker: run one verifier call, return (status, seconds, captured log)"""
+    start = time.perf_counter()
+    tc_dir = os.path.join(ROOT, tc)
+    missing = [pth for pth in required if not os.path.exists(os.path.join(tc_dir, pth))]
+    if missing:
+        return MISSING, 0.0, f"Missing: {', '.join(missing)}\n"
+
+    log = io.StringIO()
+    cwd = os.getcwd()
+    try:
+        os.chdir(tc_dir)
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            module = _load_verifier(tc, script)
+            passed = getattr(module, func)(*args, **kwargs)
+        status = PASS if passed else FAIL
+    except SystemExit as e:
+        status = PASS if not e.code else FAIL
+    except Exception as e:
+        log.write(f"{type(e).__name__}: {e}\n")
+        status = ERROR
+    finally:
+        os.chdir(cwd)
+    return status, time.perf_counter() - start, log.getvalue()
+
+
+def run_regression(testbenches=None, jobs=None, log_lines=20):
+    """Run all discovered vectors in parallel; returns True when all pass"""
+    testbenches = testbenches or list(TESTBENCHES)
+    work = [job for tc in testbenches for job in TESTBENCHES[tc]()]
+
+    print("=" * 80)
+    print(f"Regression: {len(work)} vectors in {len(testbenches)} testbenches")
+    print("=" * 80)
+
+    results = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(run_job, tc, script, func, args, kwargs, required): k
+                   for k, (tc, _, script, func, args, kwargs, required) in enumerate(work)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    wall = time.perf_counter() - start
+
+    # Logs of vectors that did not pass
+    for k, (tc, name, *_rest) in enumerate(work):
+        status, _, log = results[k]
+        if status != PASS:
+            lines = log.rstrip().splitlines()[-log_lines:]
+            print(f"\n--- {tc}: {name} [{status}] ---")
+            print("\n".join(lines))
+
+    print("\n" + "=" * 80)
+    print(f"{'Testbench':<14} {'Vector':<40} {'Status':<10} {'Time (s)':>8}")
+    print("-" * 80)
+    for k, (tc, name, *_rest) in enumerate(work):
+        status, seconds, _ = results[k]
+        mark = "✓" if status == PASS else "✗"
+        print(f"{tc:<14} {name:<40} {mark} {status:<8} {seconds:>8.2f}")
+    print("-" * 80)
+
+    counts = {s: sum(r[0] == s for r in results.values()) for s in (PASS, FAIL, MISSING, ERROR)}
+    cpu = sum(r[1] for r in results.values())
+    print(", ".join(f"{s}: {n}" for s, n in counts.items()))
+    print(f"Wall time: {wall:.2f} s (sum of vector times: {cpu:.2f} s)")
+    all_passed = counts[PASS] == len(work)
+    print("=" * 80)
+    print("✓ ALL VECTORS PASSED" if all_passed else "✗ REGRESSION FAILED")
+    print("=" * 80)
+    return all_passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run all testbench verifiers in parallel")
+    parser.add_argument('--tc', nargs='+', choices=list(TESTBENCHES), default=None,
+                        help="Testbench directories to verify (default: all)")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Worker processes (default: number of CPUs)")
+    parser.add_argument('--log-lines', type=int, default=20,
+                        help="Log lines shown per failing vector (default: 20)")
+    args = parser.parse_args()
+    sys.exit(0 if run_regression(args.tc, args.jobs, args.log_lines) else 1)
@@ -0,0 +1,276 @@
+"""
+Bit-Reverse Reorder Models
+--------------------------
+Bit-true NumPy models of the ping-pong buffers that put the bit-reversed
+FFT output back into natural order:
+- BRR_PP (BitRevReorder.v): two 2^ADDR_WIDTH banks, written at
+  bit_reverse(write_counter) and read at read_counter
+- PP_BUFFER (PP_buffer.v): two DEPTH-word banks (DEPTH = N_FFT/2+1 in
+  MEL_SPEC), written at bit_reverse(write_ptr) over ADDR_WIDTH =
+  clog2(DEPTH) bits and read in natural order from the inactive bank
+
+With DEPTH not a power of two some bit-reversed write addresses fall past
+the bank, so those words are never written and read back as x. The
+permutation tables come from fft_model.bit_reverse_indices (cached per
+(DEPTH, ADDR_WIDTH)) and are applied to whole (frames, DEPTH) batches.
+
+    out, known = reorder(frames)                      # frame level
+    cyc = pp_buffer(data_in, data_valid, depth=257)   # cycle level
+
+The brr_pp_tc and pp_buffer_tc verify.py scripts are thin wrappers around
+testcase_main(): 'generate' writes the golden file, 'verify' compares the
+simulation output with it, and 'dump' checks a PP_BUFFER waveform cycle by
+cycle against pp_buffer() (check_pp_buffer_dump).
+"""
+
+import functools
+import os
+
+import numpy as np
+
+import batch_compare
+from fft_model import bit_reverse_indices
+import hexio
+
+
+def addr_width(depth):
+    """$clog2(DEPTH)"""
+    return max(1, (int(depth) - 1).bit_length())
+
+
+@functools.lru_cache(maxsize=None)
+def permutation(depth, width=None):
+    """
+    (src, known) read-side permutation of one bank (cached, read-only)
+    Read address a holds the word written at write index src[a]; known is
+    False where no write index maps to a (the word stays x).
+    """
+    width = width or addr_width(depth)
+    # Bit reversal is its own inverse: write index p lands on rev[p]
+    rev = bit_reverse_indices(1 << width, width)[:depth]
+    known = rev < depth
+    src = np.where(known, rev, 0)
+    src.flags.writeable = False
+    known.flags.writeable = False
+    return src, known
+
+
+def reorder(frames, depth=None, width=None):
+    """
+    Read order of complete frames written in pipeline order
+    frames: (frames, depth) or 1-D words in write order; every frame goes to
+    the other bank, so frame k is read while frame k+1 is written
+    Returns (out, known); x words read as 0 with known False.
+    """
+    frames = np.asarray(frames)
+    squeeze = frames.ndim == 1
+    frames = np.atleast_2d(frames)
+    src, known = permutation(depth or frames.shape[-1], width)
+    out = np.where(known, frames[:, src], 0)
+    known = np.broadcast_to(known, out.shape)
+    if squeeze:
+        return out[0], known[0]
+    return out, known
+
+
+def _hold(event, value, init):
+    """Register that loads value[t] on every edge where event[t] holds"""
+    last = np.maximum.accumulate(np.where(event, np.arange(len(event)), -1))
+    return np.where(last >= 0, np.asarray(value)[np.maximum(last, 0)], init)
+
+
+def _before(after, init):
+    """Register value before each edge given its value after each edge"""
+    return np.concatenate([[init], after[:-1]])
+
+
+def pp_buffer(data_in, data_valid, depth=128, width=8):
+    """
+    Cycle-level PP_BUFFER model from reset
+    data_in, data_valid: per-cycle inputs sampled at each rising edge
+    Returns a dict of per-cycle register values after each edge:
+    data_out, data_ready, known (data_out holds no x bits), active_buffer,
+    full and empty.
+    """
+    data_in = np.asarray(data_in, dtype=np.int64) & ((1 << width) - 1)
+    valid = np.asarray(data_valid) != 0
+    n = len(valid)
+    t = np.arange(n)
+    aw = addr_width(depth)
+
+    # Write side: write_ptr counts valid cycles, the bank flips on DEPTH-1
+    writes = np.cumsum(valid) - valid
+    write_ptr = writes % depth
+    active = (writes // depth) % 2
+    wrap = valid & (write_ptr == depth - 1)
+    rev = bit_reverse_indices(1 << aw, aw)
+    addr = rev[write_ptr]
+    stored = valid & (addr < depth)
+
+    # Read side: read_ptr runs freely, with one idle cycle at DEPTH when
+    # DEPTH is not a power of two
+    period = depth if depth == 1 << aw else depth + 1
+    read_ptr = t % period
+    reading = read_ptr < depth
+    rd_bank = 1 - active
+
+    # Last write to (bank, address) strictly before each read
+    w_t = t[stored]
+    w_key = active[stored] * depth + addr[stored]
+    order = np.lexsort((w_t, w_key))
+    w_t, w_key, w_data = w_t[order], w_key[order], data_in[stored][order]
+    r_key = rd_bank * depth + np.minimum(read_ptr, depth - 1)
+    j = np.searchsorted(w_key * (n + 1) + w_t, r_key * (n + 1) + t, side='left') - 1
+    hit = (j >= 0) & (w_key[np.maximum(j, 0)] == r_key) if len(w_t) else np.zeros(n, bool)
+    word = np.where(hit, w_data[np.maximum(j, 0)] if len(w_t) else 0, 0)
+
+    # Empty flags: set when the last read of a bank was its final word
+    last_word = read_ptr == depth - 1
+    bank_empty = [_hold(reading & (rd_bank == b), last_word, True) for b in (0, 1)]
+    both_empty = bank_empty[0] & bank_empty[1]
+    # first_frame clears on a bank switch; both banks empty sets it again
+    both_before = _before(both_empty, True)
+    first_frame = _hold(both_before | wrap, both_before, True)
+    empty = both_empty | first_frame
+
+    return {
+        'data_out': _hold(reading, word, 0),
+        'known': _hold(reading, hit, False).astype(bool),
+        'data_ready': reading & ~_before(empty, True),
+        'active_buffer': (np.cumsum(valid) // depth) % 2,
+        'full': np.cumsum(wrap) >= 2,
+        'empty': empty,
+    }
+
+
+# PP_BUFFER registers compared with pp_buffer(), as dumped under the DUT scope
+PP_BUFFER_OUTPUTS = ('data_out', 'data_ready', 'active_buffer', 'full', 'empty')
+
+
+def check_pp_buffer_dump(path, depth=128, width=None, scope='dut', max_errors=10):
+    """
+    Compare a PP_BUFFER VCD dump with pp_buffer() driven by the dumped
+    data_in / data_valid. The model starts at the first edge out of reset
+    (the one after which read_ptr reads 1); every following edge is
+    compared on the registers after it, data_out only where the model
+    knows the word. width defaults to the dumped data_in width.
+    Returns True if all cycles match.
+    """
+    import vcd
+    signals = ['data_in', 'data_valid', 'read_ptr'] + list(PP_BUFFER_OUTPUTS)
+    chg = vcd.read_changes(path, ['clk'] + [f"{scope}.{name}" for name in signals])
+    t = vcd.edges(chg['clk'])
+    # Registers after edge k are what edge k+1 samples
+    after = {name: vcd.value_at(chg[f"{scope}.{name}"], t[1:], before=True)
+             for name in ['read_ptr'] + list(PP_BUFFER_OUTPUTS)}
+    started = np.flatnonzero(after['read_ptr'][1] & (after['read_ptr'][0] == 1))
+    print(f"{path}: {len(t)} clock cycles")
+    if not len(started):
+        print("  ✗ PP_BUFFER never leaves reset (read_ptr never reads 1)")
+        return False
+    edge = started[0]
+    cycles = t[edge:len(t) - 1]
+    model = pp_buffer(vcd.sample(chg[f"{scope}.data_in"], cycles).astype(np.int64),
+                      vcd.sample(chg[f"{scope}.data_valid"], cycles), depth,
+                      width or chg[f"{scope}.data_in"].width)
+
+    passed = True
+    for name in PP_BUFFER_OUTPUTS:
+        rtl, rtl_known = (a[edge:] for a in after[name])
+        expected = np.asarray(model[name]).astype(np.int64)
+        bad = ~rtl_known | (rtl.astype(np.int64) != expected)
+        if name == 'data_out':
+            bad &= model['known']
+        idx = np.flatnonzero(bad)
+        passed &= not len(idx)
+        print(f"  {'✓' if not len(idx) else '✗'} {name}: {len(cycles) - len(idx)}/{len(cycles)} "
+              f"cycles match")
+        for i in idx[:max_errors]:
+            got = int(rtl[i]) if rtl_known[i] else 'x'
+            print(f"      cycle {i} (t={int(cycles[i])}): rtl {got}, model {int(expected[i])}")
+    return passed
+
+
+def generate_golden(n, bits, frames=2, golden_file="golden_output.txt",
+                    input_file="frame_input.txt"):
+    """
+    Golden files of the reorder testcases
+
+    The testbench sends sequential data:
+    - Frame 0: di_re = [0, 1, 2, ..., n-1], di_im = 0
+    - Frame 1: di_re = [n, n+1, ..., 2n-1], di_im = 0
+
+    The golden output is each frame read back through reorder(), one
+    "re im" line per word.
+    """
+    print(f"Generating {frames} frames of golden data...")
+
+    frame_in = np.arange(frames * n).reshape(frames, n)
+    golden, _ = reorder(frame_in, n, bits)
+    zeros = np.zeros(frames * n, dtype=np.int64)
+    np.savetxt(input_file, np.column_stack([frame_in.ravel(), zeros]), fmt="%d")
+    np.savetxt(golden_file, np.column_stack([golden.ravel(), zeros]), fmt="%d")
+    print(f"Generated '{golden_file}' for verification.")
+    print(f"Expected output: each frame in bit-reversed order")
+
+
+def verify_output(n, output_file="output.txt", golden_file="golden_output.txt"):
+    """
+    Compares the simulation output with the golden output as integers.
+    Words holding x count as mismatches.
+    """
+    print("--- Verifying output ---")
+    try:
+        sim, unknown = hexio.read_hex_columns(output_file, ncols=2, signed=False,
+                                              base=10, return_unknown=True)
+        golden = hexio.read_hex_columns(golden_file, ncols=2, signed=False, base=10)
+    except FileNotFoundError as e:
+        print(f"❌ Error: {e}")
+        return False
+
+    if len(sim) != len(golden):
+        print(f"❌ Verification FAILED: Mismatch in number of lines.")
+        print(f"   Got {len(sim)} lines, expected {len(golden)}.")
+        return False
+
+    sim = np.where(unknown, -1, sim)
+    frames = -(-len(golden) // n)
+    pad = frames * n - len(golden)
+    golden_re, golden_im, sim_re, sim_im = (
+        np.pad(col, (0, pad)).reshape(frames, n)
+        for col in (golden[:, 0], golden[:, 1], sim[:, 0], sim[:, 1]))
+    result = batch_compare.compare_frames(golden_re, golden_im, sim_re, sim_im)
+    passed = batch_compare.report_failures(result, golden_re, golden_im, sim_re, sim_im)
+
+    if passed:
+        print("✅ Verification PASSED: Output matches golden file.")
+    else:
+        print(f"❌ Verification FAILED: Found {int(result['mismatches'].sum())} mismatched words "
+              f"({int(unknown.any(axis=1).sum())} holding x).")
+    return passed
+
+
+def testcase_main(argv, n, bits, dump=None):
+    """
+    Command line of the reorder testcases: generate | verify | dump [vcd]
+    dump: default VCD of the testcase's PP_BUFFER (None: no waveform check)
+    Returns True on success.
+    """
+    commands = "generate|verify" + ("|dump [vcd]" if dump else "")
+    if not argv:
+        print(f"Usage: python verify.py [{commands}]")
+        return True
+    if argv[0] == "generate":
+        generate_golden(n, bits)
+        return True
+    if argv[0] == "verify":
+        return verify_output(n)
+    if argv[0] == "dump" and dump:
+        path = argv[1] if len(argv) > 1 else dump
+        if not os.path.exists(path):
+            print(f"❌ Error: {path} not found")
+            return False
+        return check_pp_buffer_dump(path, n)
+    print(f"Unknown command: {argv[0]}")
+    print(f"Usage: python verify.py [{commands}]")
+    return True
@@ -0,0 +1,159 @@
+"""
+RTL ROM Table Reader
+--------------------
+Reads the constant tables straight out of the Verilog sources, so the
+bit-accurate models use exactly what the RTL synthesizes:
+- Twiddle512.v / Twiddle128.v: assign wn_re[n] = 16'hXXXX; (and wn_im)
+- HannWin480.v: assign win_coe[i] = 16'hXXXX;
+
+Entries written as 16'hxxxx (twiddles the SDF stages never address) are
+don't care: they read as 0 and are cleared in the known mask.
+
+All assignments of one table are matched by a single regular expression and
+converted in one pass with hexio.parse_buffer. Parsed tables are stored as
+.npy files in $ROM_CACHE_DIR or <repo>/.rom_cache, named after the source
+and table, and reparsed when the source mtime or size changes. Returned
+arrays are int16 and read-only.
+
+Usage:
+    python tool/rom_tables.py Twiddle512.v wn_re wn_im
+    python tool/rom_tables.py HannWin480.v win_coe --check
+"""
+
+import argparse
+import functools
+import hashlib
+import os
+import re
+import sys
+
+import numpy as np
+
+import hexio
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+CACHE_DIR = os.environ.get('ROM_CACHE_DIR', os.path.join(ROOT, '.rom_cache'))
+
+TWIDDLE_ROM = os.path.join(ROOT, 'Twiddle{n}.v')
+HANN_ROM = os.path.join(ROOT, 'HannWin480.v')
+
+
+def parse_table(text, name):
+    """
+    (values, known) of every `assign name[i] = W'hXXXX` in a Verilog source
+    values are signed W-bit integers (int64), unassigned entries read as 0
+    """
+    if isinstance(text, str):
+        text = text.encode()
+    pattern = re.compile(rb'\b' + re.escape(name.encode()) +
+                         rb"\s*\[\s*(\d+)\s*\]\s*=\s*(\d+)'[hH]([0-9a-fA-FxXzZ_]+)")
+    entries = pattern.findall(text)
+    if not entries:
+        raise ValueError(f"no assignments to {name}[] found")
+    index = np.array([int(i) for i, _, _ in entries])
+    width = int(entries[0][1])
+    digits, unknown, _ = hexio.parse_buffer(b'\n'.join(h.replace(b'_', b'') for _, _, h in entries))
+    values = np.zeros(index.max() + 1, dtype=np.int64)
+    known = np.zeros(index.max() + 1, dtype=bool)
+    values[index] = np.where(unknown, 0, hexio.to_signed(digits, width))
+    known[index] = ~unknown
+    return values, known
+
+
+def _cache_path(path, name):
+    tag = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+    return os.path.join(CACHE_DIR, f"{os.path.basename(path)}.{name}.{tag}.npy")
+
+
+def _load_cached(path, name, stamp):
+    try:
+        cached = np.load(_cache_path(path, name))
+    except (OSError, ValueError):
+        return None
+    if cached.shape[0] != 3 or tuple(cached[2, :2]) != stamp:
+        return None
+    return cached[0, :cached[2, 2]], cached[1, :cached[2, 2]].astype(bool)
+
+
+def _store(path, name, stamp, values, known):
+    """Write the cache entry atomically; a read-only tree just skips caching"""
+    n = len(values)
+    cached = np.zeros((3, max(n, 3)), dtype=np.int64)
+    cached[0, :n] = values
+    cached[1, :n] = known
+    cached[2, :3] = stamp + (n,)
+    target = _cache_path(path, name)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(tmp, 'wb') as f:
+            np.save(f, cached)
+        os.replace(tmp, target)
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=None)
+def _read(path, name, mtime_ns, size):
+    stamp = (mtime_ns, size)
+    hit = _load_cached(path, name, stamp)
+    if hit is None:
+        with open(path, 'rb') as f:
+            hit = parse_table(f.read(), name)
+        _store(path, name, stamp, *hit)
+    values = hit[0].astype(np.int16)
+    known = hit[1]
+    values.flags.writeable = False
+    known.flags.writeable = False
+    return values, known
+
+
+def read_table(path, name):
+    """(values, known) of table name in a Verilog ROM source, cached"""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    return _read(path, name, st.st_mtime_ns, st.st_size)
+
+
+def twiddle(n, path=None):
+    """(wn_re, wn_im, known) of Twiddle<n>.v"""
+    path = path or TWIDDLE_ROM.format(n=n)
+    wn_re, known_re = read_table(path, 'wn_re')
+    wn_im, known_im = read_table(path, 'wn_im')
+    return wn_re, wn_im, known_re & known_im
+
+
+def hann(path=HANN_ROM):
+    """(win_coe, known) of HannWin480.v"""
+    return read_table(path, 'win_coe')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read ROM tables from Verilog sources")
+    parser.add_argument('source', help="Verilog ROM source, e.g. Twiddle512.v")
+    parser.add_argument('tables', nargs='+', help="Table names, e.g. wn_re wn_im")
+    parser.add_argument('--check', action='store_true',
+                        help="Compare with the tables generated by coe_rom.py")
+    args = parser.parse_args()
+
+    passed = True
+    for name in args.tables:
+        values, known = read_table(args.source, name)
+        print(f"{name}: {len(values)} entries, {int((~known).sum())} don't care, "
+              f"range [{values.min()}, {values.max()}]")
+        if args.check:
+            import coe_rom
+            if name == 'win_coe':
+                expected = coe_rom.hann(480, len(values))
+            else:
+                wn_re, wn_im, _ = coe_rom.twiddle(len(values))
+                expected = wn_re if name == 'wn_re' else wn_im
+            bad = np.flatnonzero(known & (values != expected))
+            passed &= len(bad) == 0
+            print(f"  {'✓' if not len(bad) else '✗'} {len(bad)} entries differ from coe_rom"
+                  + (f" (first at {bad[0]})" if len(bad) else ""))
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
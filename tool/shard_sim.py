@@ -0,0 +1,248 @@
+"""
+Sharded Long-Stream STFT Simulation
+-----------------------------------
+Runs a long input stream through a compiled STFT testbench (e.g.
+stft_512_tc/tb_stft_512.vvp) as K independent vvp processes and stitches
+the frame outputs back into one stream:
+- the frames of the stream are split into K contiguous ranges; shard k gets
+  the samples of its frames, so neighbouring shards overlap by
+  WIN_LEN - HOP_LEN samples
+- with --warmup W every shard but the first also starts W frames early and
+  its first W output frames are dropped (for designs whose first frames
+  after reset differ, e.g. while the ping-pong FFTs fill)
+- shards run in a process pool, each in its own working directory holding
+  the input file the testbench reads (input.txt, "%h %h" per sample) and
+  the output file it writes (output.txt, FRAME_LEN "%h %h" lines per frame)
+
+--check repeats a small case (the first --check-frames frames) as a single
+run and compares it with the stitched shards frame by frame. --model runs
+the bit-accurate Python model (win_model + fft_model, pipeline order)
+instead of vvp, which checks the sharding itself without a simulator.
+
+Usage:
+    python tool/shard_sim.py input.txt --vvp stft_512_tc/tb_stft_512.vvp -k 8 --output out.txt
+    python tool/shard_sim.py --test-seconds 5 --model -k 4 --check
+"""
+
+import argparse
+import collections
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import batch_compare
+import fft_model
+import hexio
+import win_model
+
+Shard = collections.namedtuple('Shard', ['index', 'first_frame', 'frames', 'warmup',
+                                         'start', 'stop'])
+
+
+def plan_shards(num_samples, shards, win_len=win_model.WIN_LEN, hop_len=win_model.HOP_LEN,
+                warmup=0):
+    """
+    Split the frames of a num_samples stream into at most `shards` shards
+    Shard k covers output frames [first_frame, first_frame + frames) and
+    input samples [start, stop), including `warmup` extra leading frames.
+    """
+    total = win_model.num_frames(num_samples, win_len, hop_len)
+    bounds = np.linspace(0, total, min(shards, total) + 1).round().astype(int)
+    plan = []
+    for f0, f1 in zip(bounds[:-1], bounds[1:]):
+        w = min(warmup, f0)
+        plan.append(Shard(len(plan), int(f0), int(f1 - f0), int(w),
+                          int((f0 - w) * hop_len), int((f1 - 1) * hop_len + win_len)))
+    return plan
+
+
+def run_vvp(image, samples_re, samples_im, frame_len=win_model.N_FFT, width=16,
+            input_name='input.txt', output_name='output.txt', workdir=None, timeout=None):
+    """
+    Simulate one stream with vvp in a scratch directory
+    Returns (frames_re, frames_im) as (frames, frame_len) arrays
+    """
+    with tempfile.TemporaryDirectory(prefix='shard_', dir=workdir) as tmp:
+        hexio.write_hex_columns(os.path.join(tmp, input_name), [samples_re, samples_im], width)
+        proc = subprocess.run(['vvp', os.path.abspath(image)], cwd=tmp, timeout=timeout,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        out_pth = os.path.join(tmp, output_name)
+        if proc.returncode != 0 or not os.path.exists(out_pth):
+            tail = '\n'.join(proc.stdout.splitlines()[-20:])
+            raise RuntimeError(f"vvp failed (exit {proc.returncode}):\n{tail}")
+        out = hexio.read_hex_columns(out_pth, ncols=2, width=width)
+    frames = len(out) // frame_len
+    out = out[:frames * frame_len].reshape(frames, frame_len, 2)
+    return out[..., 0], out[..., 1]
+
+
+def run_model(samples_re, samples_im, n_fft=win_model.N_FFT, win_len=win_model.WIN_LEN,
+              hop_len=win_model.HOP_LEN, width=16):
+    """STFT_PW2 reference: windowed frames through the FFT, pipeline (bit-reversed) order"""
+    frames_re, frames_im = win_model.window_frames(samples_re, n_fft, win_len, hop_len,
+                                                   width=width)
+    if not len(frames_re):
+        return frames_re, frames_im
+    return fft_model.fft_fixed(frames_re, frames_im, natural_order=False, width=width)
+
+
+def run_shard(shard, samples_re, samples_im, runner, options):
+    """
+    Simulate one shard; returns (shard, frames_re, frames_im, seconds)
+    samples_re/samples_im: the shard's own samples [shard.start, shard.stop),
+    so only they are pickled to the worker process
+    """
+    start = time.perf_counter()
+    if runner == 'model':
+        frames_re, frames_im = run_model(samples_re, samples_im, **options)
+    else:
+        frames_re, frames_im = run_vvp(runner, samples_re, samples_im, **options)
+    return shard, frames_re, frames_im, time.perf_counter() - start
+
+
+def stitch(results):
+    """Concatenate the shard outputs in frame order, dropping warm-up frames"""
+    parts = sorted(results, key=lambda r: r[0].index)
+    for shard, frames_re, _, _ in parts:
+        if len(frames_re) < shard.warmup + shard.frames:
+            raise ValueError(f"shard {shard.index}: {len(frames_re)} frames, "
+                             f"expected {shard.warmup + shard.frames}")
+    keep = [slice(s.warmup, s.warmup + s.frames) for s, _, _, _ in parts]
+    return (np.concatenate([r[1][k] for r, k in zip(parts, keep)]),
+            np.concatenate([r[2][k] for r, k in zip(parts, keep)]))
+
+
+def run_sharded(samples_re, samples_im, shards, runner, options, warmup=0, jobs=None,
+                win_len=win_model.WIN_LEN, hop_len=win_model.HOP_LEN):
+    """Plan, run in parallel and stitch; returns (frames_re, frames_im, results)"""
+    plan = plan_shards(len(samples_re), shards, win_len, hop_len, warmup)
+    with ProcessPoolExecutor(max_workers=jobs or len(plan) or None) as pool:
+        futures = [pool.submit(run_shard, s, samples_re[s.start:s.stop],
+                               samples_im[s.start:s.stop], runner, options)
+                   for s in plan]
+        results = [f.result() for f in futures]
+    frames_re, frames_im = stitch(results)
+    return frames_re, frames_im, results
+
+
+def print_shards(results):
+    print(f"  {'shard':>5} {'frames':>12} {'samples':>17} {'warmup':>6} {'seconds':>8}")
+    for shard, _, _, seconds in sorted(results, key=lambda r: r[0].index):
+        frames = f"{shard.first_frame}-{shard.first_frame + shard.frames - 1}"
+        samples = f"{shard.start}-{shard.stop - 1}"
+        print(f"  {shard.index:>5} {frames:>12} {samples:>17} {shard.warmup:>6} {seconds:>8.2f}")
+
+
+def check_stitching(samples_re, samples_im, shards, runner, options, warmup=0, frames=12,
+                    win_len=win_model.WIN_LEN, hop_len=win_model.HOP_LEN):
+    """Stitched shards vs one single run over the first `frames` frames"""
+    n = (frames - 1) * hop_len + win_len
+    re, im = samples_re[:n], samples_im[:n]
+    whole = plan_shards(len(re), 1, win_len, hop_len)[0]
+    single = run_shard(whole, re[whole.start:whole.stop], im[whole.start:whole.stop],
+                       runner, options)
+    stitched_re, stitched_im, _ = run_sharded(re, im, shards, runner, options, warmup,
+                                              win_len=win_len, hop_len=hop_len)
+    ref_re, ref_im = single[1], single[2]
+    if ref_re.shape != stitched_re.shape:
+        print(f"✗ Single run gave {len(ref_re)} frames, stitched shards {len(stitched_re)}")
+        return False
+    result = batch_compare.compare_frames(ref_re, ref_im, stitched_re, stitched_im)
+    return batch_compare.report_failures(result, ref_re, ref_im, stitched_re, stitched_im)
+
+
+def load_samples(path, width=16):
+    """(re, im) of a hex input file; a single column is real only"""
+    values = hexio.read_hex_columns(path, width=width)
+    im = values[:, 1] if values.shape[1] > 1 else np.zeros(len(values), dtype=np.int64)
+    return values[:, 0], im
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded long-stream STFT simulation")
+    parser.add_argument('input', nargs='?', help="Input samples (hex, re [im] per line)")
+    parser.add_argument('--test-seconds', type=float, default=None,
+                        help="Use the sweep.py test signal of this length instead of a file")
+    parser.add_argument('--vvp', help="Compiled testbench image")
+    parser.add_argument('--model', action='store_true',
+                        help="Run the Python STFT model instead of vvp")
+    parser.add_argument('-k', '--shards', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Worker processes (default: one per shard)")
+    parser.add_argument('--warmup', type=int, default=0,
+                        help="Extra leading frames simulated and dropped per shard")
+    parser.add_argument('--n-fft', type=int, default=win_model.N_FFT)
+    parser.add_argument('--win-len', type=int, default=win_model.WIN_LEN)
+    parser.add_argument('--hop-len', type=int, default=win_model.HOP_LEN)
+    parser.add_argument('--frame-len', type=int, default=None,
+                        help="Output lines per frame (default: N_FFT)")
+    parser.add_argument('--input-name', default='input.txt')
+    parser.add_argument('--output-name', default='output.txt')
+    parser.add_argument('--timeout', type=float, default=None, help="Seconds per shard")
+    parser.add_argument('--output', help="Write the stitched frames (hex re im per line)")
+    parser.add_argument('--check', action='store_true',
+                        help="Compare stitched shards with a single run on a small case")
+    parser.add_argument('--check-frames', type=int, default=12)
+    args = parser.parse_args()
+
+    if args.test_seconds:
+        import sweep
+        x = sweep.test_signal(args.test_seconds)
+        samples_re = np.clip(np.floor(x * 32768 + 0.5), -32768, 32767).astype(np.int64)
+        samples_im = np.zeros_like(samples_re)
+    elif args.input:
+        samples_re, samples_im = load_samples(args.input)
+    else:
+        parser.error("an input file or --test-seconds is required")
+
+    if args.model:
+        runner = 'model'
+        options = {'n_fft': args.n_fft, 'win_len': args.win_len, 'hop_len': args.hop_len}
+    elif args.vvp:
+        if shutil.which('vvp') is None:
+            print("✗ vvp not found on PATH (use --model to check the sharding alone)")
+            return False
+        runner = args.vvp
+        options = {'frame_len': args.frame_len or args.n_fft, 'input_name': args.input_name,
+                   'output_name': args.output_name, 'timeout': args.timeout}
+    else:
+        parser.error("--vvp or --model is required")
+
+    print("=" * 80)
+    print(f"Sharded STFT simulation: {len(samples_re)} samples, {args.shards} shards, "
+          f"{'Python model' if args.model else args.vvp}")
+    print("=" * 80)
+
+    passed = True
+    if args.check:
+        print(f"\nChecking stitching against a single run ({args.check_frames} frames)...")
+        passed = check_stitching(samples_re, samples_im, args.shards, runner, options,
+                                 args.warmup, args.check_frames, args.win_len, args.hop_len)
+        print("✓ Stitched shards match the single run" if passed else
+              "✗ Stitched shards differ from the single run")
+
+    start = time.perf_counter()
+    frames_re, frames_im, results = run_sharded(samples_re, samples_im, args.shards, runner,
+                                                options, args.warmup, args.jobs,
+                                                args.win_len, args.hop_len)
+    wall = time.perf_counter() - start
+    print()
+    print_shards(results)
+    busy = sum(r[3] for r in results)
+    print(f"\nFrames: {len(frames_re)}, wall time {wall:.2f} s, "
+          f"shard time {busy:.2f} s ({busy / max(wall, 1e-9):.1f}x)")
+
+    if args.output:
+        hexio.write_hex_columns(args.output, [frames_re.ravel(), frames_im.ravel()])
+        print(f"Stitched frames written to {args.output}")
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
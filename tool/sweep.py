@@ -0,0 +1,207 @@
+"""
+MEL_SPEC Design-Space Sweeper
+-----------------------------
+Runs the fixed-point reference pipeline (tool/mel_pipeline.py) over a grid of
+WIDTH, N_FFT, WIN_LEN, HOP_LEN and MEL_BANDS in a process pool and collects
+one table:
+- sqnr_fft / sqnr_mel: SQNR in dB of the FFT output and of the mel energies
+  against a float64 reference of the same chain (same 1/N FFT scaling)
+- sat_in / sat_pow / sat_mel: fraction of samples that clip at the input
+  quantizer, power values that reach the sign bit of the WIDTH-bit MEL_MAC
+  input, and mel sums that wrap the WIDTH-bit output
+- cycles / latency: estimated clock cycles per frame (one sample per clock
+  through WIN_LUT, the FFT pair and PP_BUFFER) and from the last input
+  sample of a frame to its last mel output
+
+Every run uses the same deterministic test signal (tones plus noise). The
+mel stage is the sparse Q1.15 filterbank (mel_filterbank.py), since the
+mac_bits encoding only exists for the 40-band, 512-point configuration.
+
+Usage:
+    python tool/sweep.py --width 12 14 16 --n-fft 256 512 --mel-bands 40 64
+    python tool/sweep.py --min-sqnr 30 --csv sweep.csv
+"""
+
+import argparse
+import csv
+import itertools
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from fft_model import bit_reverse_indices
+import coe_rom
+import mel_filterbank
+import mel_pipeline
+
+COLUMNS = ['width', 'n_fft', 'win_len', 'hop_len', 'mel_bands', 'frames',
+           'sqnr_fft', 'sqnr_mel', 'sat_in', 'sat_pow', 'sat_mel', 'cycles', 'latency',
+           'seconds']
+
+
+def test_signal(seconds=1.0, sample_rate=16000, level=0.5, seed=0):
+    """Float test signal in [-1, 1): three tones plus white noise, peak at level"""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    x = (np.sin(2 * np.pi * 440 * t) + 0.5 * np.sin(2 * np.pi * 1750 * t + 1.0)
+         + 0.25 * np.sin(2 * np.pi * 5300 * t + 2.0))
+    x += 0.1 * np.random.default_rng(seed).standard_normal(len(t))
+    return x * level / np.abs(x).max()
+
+
+def sqnr_db(ref, test):
+    """10*log10(signal power / error power); inf when the error is zero"""
+    ref = np.asarray(ref)
+    err = np.abs(np.asarray(test) - ref) ** 2
+    noise = err.sum()
+    return math.inf if noise == 0 else 10 * math.log10((np.abs(ref) ** 2).sum() / noise)
+
+
+def estimate_cycles(n_fft, win_len, hop_len):
+    """
+    (cycles per frame, latency) at one sample per clock
+    WIN_LUT emits n_fft samples per frame and needs hop_len new input
+    samples; the FFT pair, PP_BUFFER and MEL_FBANK each stream one frame
+    (n_fft, n_fft/2+1 and n_fft/2+1 samples) behind the previous stage.
+    """
+    n_bins = n_fft // 2 + 1
+    cycles = max(n_fft, hop_len)
+    latency = n_fft + n_fft + n_bins + n_bins
+    return cycles, latency
+
+
+def run_point(width, n_fft, win_len, hop_len, mel_bands, seconds=1.0, sample_rate=16000):
+    """Fixed-point vs float64 metrics of one design point (one table row)"""
+    start = time.perf_counter()
+    full = 2 ** (width - 1)
+    x = test_signal(seconds, sample_rate)
+    samples = np.clip(np.floor(x * full + 0.5), -full, full - 1).astype(np.int64)
+    sat_in = float(np.mean((x * full >= full) | (x * full < -full)))
+
+    # Fixed point chain, stage by stage so the FFT output can be checked
+    rom = coe_rom.hann(win_len, n_fft, width)
+    bands = mel_filterbank.mel_filterbank(mel_bands, n_fft, sample_rate)
+    q_bands = mel_filterbank.quantize(bands, width)
+    frames_re, frames_im = next(mel_pipeline.window_stage([samples], n_fft, win_len,
+                                                          hop_len, rom, width), ([], []))
+    if len(frames_re) == 0:
+        raise ValueError(f"signal shorter than one window ({win_len} samples)")
+    batch = [(frames_re, frames_im)]
+    fft_re, fft_im = next(mel_pipeline.fft_stage(batch, width))
+    power = next(mel_pipeline.power_stage([(fft_re, fft_im)], width))
+    power = next(mel_pipeline.pp_buffer_stage([power]))
+    mel = next(mel_pipeline.mel_fbank_stage(mel_pipeline.bin_cnt_stage([power]),
+                                            weights=q_bands, width=width))
+
+    # Float64 reference in the same integer units
+    n_frames = len(frames_re)
+    win = 0.5 * (1 - np.cos(2 * np.pi * np.arange(win_len) / (win_len - 1)))
+    pad = (n_fft - win_len) // 2
+    ref_frames = np.zeros((n_frames, n_fft))
+    idx = np.arange(n_frames)[:, None] * hop_len + np.arange(win_len)
+    ref_frames[:, pad:pad + win_len] = samples[idx] * win
+    ref_fft = np.fft.fft(ref_frames, axis=1) / n_fft
+    ref_power = np.abs(ref_fft[:, :n_fft // 2 + 1]) ** 2 / full
+    ref_mel = mel_filterbank.apply_filterbank(ref_power, bands)
+
+    rev = bit_reverse_indices(n_fft)
+    fix_fft = fft_re[:, rev].astype(np.int64) + 1j * fft_im[:, rev].astype(np.int64)
+    # Unsigned power and unwrapped mel sums show what the signed datapath loses
+    unsigned_power = power.astype(np.int64) & (2 * full - 1)
+    mel_exact = mel_filterbank.apply_filterbank(
+        unsigned_power, q_bands._replace(weights=q_bands.weights / full))
+    cycles, latency = estimate_cycles(n_fft, win_len, hop_len)
+
+    return {
+        'width': width, 'n_fft': n_fft, 'win_len': win_len, 'hop_len': hop_len,
+        'mel_bands': mel_bands, 'frames': n_frames,
+        'sqnr_fft': sqnr_db(ref_fft, fix_fft),
+        'sqnr_mel': sqnr_db(ref_mel, mel.astype(np.int64)),
+        'sat_in': sat_in,
+        'sat_pow': float(np.mean(unsigned_power >= full)),
+        'sat_mel': float(np.mean((mel_exact >= full) | (mel_exact < -full))),
+        'cycles': cycles, 'latency': latency,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def grid(widths, n_ffts, win_lens, hop_lens, mel_bands):
+    """Valid parameter combinations (window fits the FFT, hop fits the window)"""
+    return [p for p in itertools.product(widths, n_ffts, win_lens, hop_lens, mel_bands)
+            if p[2] <= p[1] and p[3] <= p[2] and p[4] < p[1] // 2]
+
+
+def _fmt(value):
+    if isinstance(value, float):
+        return f"{value:.4f}" if abs(value) < 1 else f"{value:.2f}"
+    return str(value)
+
+
+def print_table(rows, min_sqnr=None):
+    """One line per design point; '*' marks points meeting min_sqnr"""
+    header = ' '.join(f"{c:>9}" for c in COLUMNS)
+    print("=" * len(header))
+    print("  " + header)
+    print("-" * len(header))
+    for row in rows:
+        ok = min_sqnr is not None and row['sqnr_mel'] >= min_sqnr
+        print(("* " if ok else "  ") + ' '.join(f"{_fmt(row[c]):>9}" for c in COLUMNS))
+    print("=" * len(header))
+
+
+def smallest_passing(rows, min_sqnr):
+    """Cheapest point meeting min_sqnr: narrowest datapath, then smallest FFT and bank"""
+    passing = [r for r in rows if r['sqnr_mel'] >= min_sqnr]
+    key = lambda r: (r['width'], r['n_fft'], r['mel_bands'], r['cycles'])
+    return min(passing, key=key) if passing else None
+
+
+def run_sweep(points, jobs=None, seconds=1.0):
+    """Evaluate all points in a process pool; rows come back in grid order"""
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_point, *p, seconds=seconds) for p in points]
+        return [f.result() for f in futures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep the MEL_SPEC fixed-point datapath")
+    parser.add_argument('--width', type=int, nargs='+', default=[12, 14, 16])
+    parser.add_argument('--n-fft', type=int, nargs='+', default=[256, 512, 1024])
+    parser.add_argument('--win-len', type=int, nargs='+', default=[240, 480])
+    parser.add_argument('--hop-len', type=int, nargs='+', default=[160])
+    parser.add_argument('--mel-bands', type=int, nargs='+', default=[40])
+    parser.add_argument('--seconds', type=float, default=1.0,
+                        help="Length of the test signal (default: 1.0)")
+    parser.add_argument('--min-sqnr', type=float, default=None,
+                        help="Mel SQNR (dB) a design must reach")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Worker processes (default: number of CPUs)")
+    parser.add_argument('--csv', help="Also write the table to a CSV file")
+    args = parser.parse_args()
+
+    points = grid(args.width, args.n_fft, args.win_len, args.hop_len, args.mel_bands)
+    print(f"Sweeping {len(points)} design points")
+    start = time.perf_counter()
+    rows = run_sweep(points, args.jobs, args.seconds)
+    print_table(rows, args.min_sqnr)
+    print(f"Wall time: {time.perf_counter() - start:.2f} s")
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Table written to {args.csv}")
+
+    if args.min_sqnr is not None:
+        best = smallest_passing(rows, args.min_sqnr)
+        if best is None:
+            print(f"✗ No design point reaches {args.min_sqnr} dB mel SQNR")
+        else:
+            print(f"✓ Smallest design meeting {args.min_sqnr} dB: " +
+                  ", ".join(f"{c}={best[c]}" for c in COLUMNS[:5]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+STFT_PW2 / MEL_SPEC Throughput Profiler
+---------------------------------------
+Cycle-level throughput and latency of a MEL_SPEC (or STFT_PW2) simulation,
+from a VCD (tool/vcd.py) or a per-cycle signal log (one header line with
+the signal names, then one line per clock, as frame_log.txt):
+- per-frame latency: clock of the input sample that completes frame k
+  (WIN_LEN + k*HOP_LEN accepted signal_en samples) to the clock of its
+  last output (N_MEL mel_avail strobes per frame)
+- initiation interval: clocks between consecutive output frames
+- FFT utilisation: share of clocks fft_1_rdy / fft_2_rdy are low (busy),
+  and the length of their idle (rdy high) stretches
+- back-pressure: clocks with buf_full high, and samples offered while full
+- PP_BUFFER occupancy from its bank state: words in the bank being filled
+  (write_ptr) plus words of the last completed bank not yet delivered
+  (data_ready strobes since active_buffer flipped, at most DEPTH). The read
+  side free-runs and STFT_PW2 writes all N_FFT power samples, so writes
+  minus reads does not measure what the banks hold.
+
+The real-time verdict compares the steady-state interval with the hop
+period at the target clock, HOP_LEN * f_clk / sample_rate clocks; drive
+signal_en at the fastest rate the testbench allows so the interval is set
+by the datapath rather than by the stimulus.
+Signals that are missing from the dump are skipped.
+
+Usage:
+    python tool/throughput.py tb_mel_spec.vcd --clock-mhz 50 --csv frames.csv
+    python tool/throughput.py cycle_log.txt --output stft_data_en --per-frame 257
+"""
+
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+import hexio
+import vcd
+import win_model
+
+SIGNALS = {
+    'clk': 'clk',
+    'signal_en': 'signal_en',
+    'mel_avail': 'mel_avail',
+    'fft_1_rdy': 'fft_1_rdy',
+    'fft_2_rdy': 'fft_2_rdy',
+    'buf_full': 'buf_full',
+    'stft_data_en': 'stft_data_en',
+    'pp_ready': 'PP_BUFFER_inst.data_ready',
+    'pp_write_ptr': 'PP_BUFFER_inst.write_ptr',
+    'pp_active': 'PP_BUFFER_inst.active_buffer',
+}
+
+# PP_BUFFER bank size in MEL_SPEC
+PP_DEPTH = win_model.N_FFT // 2 + 1
+
+
+def load_vcd(path, signals=SIGNALS):
+    """Per-cycle arrays {key: values} sampled at the rising edges of clk"""
+    variables, _ = vcd.read_header(path)
+    found = {}
+    for key, name in signals.items():
+        try:
+            found[key] = vcd.resolve(variables, name)
+        except KeyError:
+            if key == 'clk':
+                raise
+    chg = vcd.read_changes(path, list(found.values()))
+    t = vcd.edges(chg[found['clk']])
+    return {key: vcd.sample(chg[name], t).astype(np.int64)
+            for key, name in found.items() if key != 'clk'}
+
+
+def load_log(path, signals=SIGNALS):
+    """Per-cycle arrays from a column log; columns are matched by name or by its last part"""
+    with open(path, 'rb') as f:
+        header = f.readline().decode().split()
+        data = f.read()
+    values, _, _ = hexio.parse_buffer(data)
+    rows = values[:len(values) - len(values) % len(header)].reshape(-1, len(header))
+    cycles = {}
+    for key, name in signals.items():
+        for col in (name, name.split('.')[-1], key):
+            if col in header:
+                cycles[key] = rows[:, header.index(col)]
+                break
+    return cycles
+
+
+def frame_marks(valid, first, step):
+    """Clock index of valid strobe number first + k*step for every complete k"""
+    idx = np.flatnonzero(np.asarray(valid) != 0)
+    return idx[first - 1::step] if len(idx) >= first else idx[:0]
+
+
+def idle_runs(rdy):
+    """Lengths of the stretches a ready signal stays high"""
+    return vcd.bursts(np.asarray(rdy) != 0)[1]
+
+
+def pp_occupancy(write_ptr, active, ready, depth=PP_DEPTH):
+    """
+    Words held by PP_BUFFER per cycle: write_ptr words of the bank being
+    filled plus the undelivered words of the completed bank, i.e. DEPTH minus
+    the data_ready strobes since active_buffer last flipped (none before the
+    first flip)
+    """
+    active = np.asarray(active) != 0
+    delivered = np.cumsum(np.asarray(ready) != 0)
+    flip = np.flatnonzero(np.diff(active.astype(np.int8)) != 0) + 1
+    last = np.full(len(active), -1)
+    last[flip] = flip
+    last = np.maximum.accumulate(last)
+    since = delivered - np.where(last > 0, delivered[np.maximum(last, 1) - 1], 0)
+    unread = np.where(last >= 0, np.maximum(depth - since, 0), 0)
+    return np.asarray(write_ptr, dtype=np.int64) + unread
+
+
+def profile(cycles, win_len=win_model.WIN_LEN, hop_len=win_model.HOP_LEN,
+            output='mel_avail', per_frame=40, pp_depth=PP_DEPTH):
+    """
+    Throughput and latency figures of one run
+    Returns (summary dict, per-frame rows, occupancy array or None)
+    """
+    n = len(next(iter(cycles.values()))) if cycles else 0
+    summary = {'cycles': n}
+
+    done_in = frame_marks(cycles.get('signal_en', np.zeros(n)), win_len, hop_len)
+    done_out = frame_marks(cycles.get(output, np.zeros(n)), per_frame, per_frame)
+    frames = min(len(done_in), len(done_out))
+    latency = done_out[:frames] - done_in[:frames]
+    interval = np.diff(done_out)
+    summary['frames_in'] = len(done_in)
+    summary['frames_out'] = len(done_out)
+    summary['latency_min'] = int(latency.min()) if frames else None
+    summary['latency_max'] = int(latency.max()) if frames else None
+    # Steady state: ignore the first interval (pipeline fill)
+    steady = interval[1:] if len(interval) > 1 else interval
+    summary['interval_mean'] = float(steady.mean()) if len(steady) else None
+    summary['interval_max'] = int(steady.max()) if len(steady) else None
+    in_interval = np.diff(done_in)
+    summary['input_interval_mean'] = float(in_interval.mean()) if len(in_interval) else None
+
+    for key in ('fft_1_rdy', 'fft_2_rdy'):
+        if key in cycles:
+            rdy = cycles[key] != 0
+            runs = idle_runs(rdy)
+            summary[key.replace('_rdy', '_util')] = float(1 - rdy.mean()) if n else 0.0
+            summary[key.replace('_rdy', '_idle_max')] = int(runs.max()) if len(runs) else 0
+
+    if 'buf_full' in cycles:
+        full = cycles['buf_full'] != 0
+        summary['buf_full_cycles'] = int(full.sum())
+        if 'signal_en' in cycles:
+            summary['samples_while_full'] = int((full & (cycles['signal_en'] != 0)).sum())
+
+    occupancy = None
+    if all(key in cycles for key in ('pp_write_ptr', 'pp_active', 'pp_ready')):
+        occupancy = pp_occupancy(cycles['pp_write_ptr'], cycles['pp_active'],
+                                 cycles['pp_ready'], pp_depth)
+        summary['pp_occupancy_max'] = int(occupancy.max()) if n else 0
+        summary['pp_occupancy_mean'] = float(occupancy.mean()) if n else 0.0
+
+    rows = [{'frame': k, 'input_done': int(done_in[k]), 'output_done': int(done_out[k]),
+             'latency': int(latency[k]),
+             'interval': int(interval[k - 1]) if k else ''} for k in range(frames)]
+    return summary, rows, occupancy
+
+
+def realtime(summary, clock_mhz, sample_rate=16000, hop_len=win_model.HOP_LEN):
+    """(hop period in clocks, margin) at the target clock; margin >= 1 keeps up"""
+    period = hop_len * clock_mhz * 1e6 / sample_rate
+    interval = summary.get('interval_max')
+    return period, (period / interval if interval else None)
+
+
+def print_summary(summary, clock_mhz=None, sample_rate=16000, hop_len=win_model.HOP_LEN):
+    """Print the figures; True unless a target clock is given and not met"""
+    passed = True
+    print("=" * 80)
+    print("MEL_SPEC Throughput Profile")
+    print("=" * 80)
+    for key, value in summary.items():
+        if value is None:
+            value = '-'
+        elif isinstance(value, float):
+            value = f"{value:.3f}" if key.endswith('util') else f"{value:.1f}"
+        print(f"  {key:<22} {value}")
+    if clock_mhz:
+        period, margin = realtime(summary, clock_mhz, sample_rate, hop_len)
+        print("-" * 80)
+        print(f"  Hop period at {clock_mhz} MHz / {sample_rate} Hz: {period:.0f} clocks")
+        if margin is None:
+            print("  ✗ Not enough output frames to measure the interval")
+        else:
+            mark = "✓ keeps up with" if margin >= 1 else "✗ falls behind"
+            print(f"  {mark} real time (margin {margin:.2f}x)")
+        passed = margin is not None and margin >= 1
+    print("=" * 80)
+    return passed
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['frame', 'input_done', 'output_done',
+                                               'latency', 'interval'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile MEL_SPEC throughput and latency")
+    parser.add_argument('dump', help="VCD file or per-cycle signal log")
+    parser.add_argument('--win-len', type=int, default=win_model.WIN_LEN)
+    parser.add_argument('--hop-len', type=int, default=win_model.HOP_LEN)
+    parser.add_argument('--output', default='mel_avail',
+                        help="Output strobe that ends a frame (default: mel_avail)")
+    parser.add_argument('--per-frame', type=int, default=40,
+                        help="Output strobes per frame (default: 40 mel bands)")
+    parser.add_argument('--signal', action='append', default=[], metavar='KEY=NAME',
+                        help="Override a signal name, e.g. pp_ready=dut.PP_BUFFER_inst.data_ready")
+    parser.add_argument('--clock-mhz', type=float, default=None,
+                        help="Target clock for the real-time check")
+    parser.add_argument('--sample-rate', type=int, default=16000)
+    parser.add_argument('--pp-depth', type=int, default=PP_DEPTH,
+                        help="PP_BUFFER DEPTH (default: N_FFT/2+1)")
+    parser.add_argument('--csv', help="Per-frame latency/interval CSV")
+    parser.add_argument('--occupancy-csv', help="PP_BUFFER occupancy per clock CSV")
+    args = parser.parse_args()
+
+    signals = dict(SIGNALS)
+    signals.update(dict(s.split('=', 1) for s in args.signal))
+    if args.output not in signals:
+        signals[args.output] = args.output
+    load = load_vcd if args.dump.endswith('.vcd') else load_log
+    cycles = load(args.dump, signals)
+    summary, rows, occupancy = profile(cycles, args.win_len, args.hop_len,
+                                       args.output, args.per_frame, args.pp_depth)
+    passed = print_summary(summary, args.clock_mhz, args.sample_rate, args.hop_len)
+
+    if args.csv:
+        write_csv(args.csv, rows)
+        print(f"Per-frame table written to {args.csv}")
+    if args.occupancy_csv and occupancy is not None:
+        np.savetxt(args.occupancy_csv, np.column_stack([np.arange(len(occupancy)), occupancy]),
+                   fmt='%d', delimiter=',', header='cycle,occupancy', comments='')
+        print(f"Occupancy written to {args.occupancy_csv}")
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
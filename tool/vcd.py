@@ -0,0 +1,277 @@
+"""
+Streaming VCD Reader
+--------------------
+Incremental reader for the value change dumps written by the testbenches
+($dumpfile / $dumpvars). The body is read in fixed-size blocks and only the
+requested signals are kept, so multi-GB dumps are checked in memory
+proportional to the number of changes of those signals.
+
+Each signal becomes a Changes tuple of NumPy arrays:
+    time   (n,)  simulation time of each change (timescale units)
+    value  (n,)  new value (uint64; x/z bits read as 0)
+    known  (n,)  False where the value holds x or z bits
+    width        bit width from the $var declaration
+
+Signals are named by their full hierarchical path or any unique suffix,
+e.g. 'tb_Window_lut.dut.frm_init' or 'dut.frm_init'.
+
+Query helpers work on clock edges (register semantics: a signal is sampled
+with the value it held just before the edge):
+    chg = read_changes(path, ['clk', 'dout_en'])
+    t = edges(chg['clk'])                     # rising clock edges
+    en = sample(chg['dout_en'], t)            # per-cycle values
+    starts, lengths = bursts(en)              # valid runs and gaps
+
+Usage:
+    python tool/vcd.py tb_brr_pp.vcd --list
+    python tool/vcd.py tb_brr_pp.vcd --bursts wr_en rd_en --expect-count 2
+"""
+
+import argparse
+import collections
+import re
+import sys
+from array import array
+
+import numpy as np
+
+Changes = collections.namedtuple('Changes', ['time', 'value', 'known', 'width'])
+Var = collections.namedtuple('Var', ['code', 'width', 'kind'])
+
+BLOCK = 1 << 22
+
+
+def _header_tokens(f):
+    """Tokens of the declaration section (up to $enddefinitions $end)"""
+    tokens = []
+    for line in f:
+        tokens.extend(line.split())
+        if b'$enddefinitions' in line:
+            break
+    return tokens
+
+
+def read_header(path):
+    """
+    Parse the declarations of a VCD file
+    Returns (variables, timescale): variables maps the hierarchical name to
+    a Var(code, width, kind); timescale is the $timescale text, e.g. '1ps'.
+    """
+    with open(path, 'rb') as f:
+        tokens = _header_tokens(f)
+    variables = {}
+    scope = []
+    timescale = ''
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok == b'$scope':
+            scope.append(tokens[i + 2].decode())
+            i += 3
+        elif tok == b'$upscope':
+            scope.pop()
+            i += 1
+        elif tok == b'$var':
+            end = tokens.index(b'$end', i)
+            kind, width, code, ref = (t.decode() for t in tokens[i + 1:i + 5])
+            variables['.'.join(scope + [ref])] = Var(code, int(width), kind)
+            i = end + 1
+        elif tok == b'$timescale':
+            end = tokens.index(b'$end', i)
+            timescale = b''.join(tokens[i + 1:end]).decode()
+            i = end + 1
+        else:
+            i += 1
+    return variables, timescale
+
+
+def resolve(variables, name):
+    """Full name of a signal given its full name or a unique suffix"""
+    if name in variables:
+        return name
+    matches = [full for full in variables if full.endswith('.' + name)]
+    if not matches:
+        raise KeyError(f"signal {name!r} not found")
+    # The same net is often declared in several scopes with one code
+    codes = {variables[full].code for full in matches}
+    if len(codes) > 1:
+        raise KeyError(f"signal {name!r} is ambiguous: {', '.join(sorted(matches))}")
+    return min(matches, key=len)
+
+
+def _blocks(f, block=BLOCK):
+    """The rest of the file in blocks that end on a line boundary"""
+    rest = b''
+    while True:
+        data = f.read(block)
+        if not data:
+            break
+        data = rest + data
+        cut = data.rfind(b'\n') + 1
+        rest = data[cut:]
+        yield data[:cut]
+    if rest:
+        yield rest
+
+
+def _vector(bits):
+    """(value, known) of a binary vector value such as b'10x1'"""
+    try:
+        return int(bits, 2), True
+    except ValueError:
+        return int(bits.translate(bytes.maketrans(b'xXzZ', b'0000')), 2), False
+
+
+def read_changes(path, signals, block=BLOCK):
+    """
+    Value changes of the selected signals as {name: Changes}
+    signals: names as accepted by resolve(); the dict uses the given names
+    The body is scanned with one regular expression per block that only
+    matches timestamps and changes of the selected codes (one change per
+    line, as written by Icarus and the commercial simulators).
+    """
+    variables, _ = read_header(path)
+    wanted = {}
+    for name in signals:
+        var = variables[resolve(variables, name)]
+        wanted.setdefault(var.code.encode(), []).append((name, var.width))
+    codes = b'|'.join(re.escape(code) for code in sorted(wanted, key=len, reverse=True))
+    pattern = re.compile(rb'^#(\d+)|^([01xXzZ])(' + codes + rb')\s*$'
+                         rb'|^([bB][01xXzZ]+|[rR]\S+)\s+(' + codes + rb')\s*$', re.M)
+    # Compact per-code buffers: array('Q') stores 8 bytes per change
+    times = {code: array('q') for code in wanted}
+    values = {code: array('Q') for code in wanted}
+    known = {code: array('b') for code in wanted}
+
+    with open(path, 'rb') as f:
+        _header_tokens(f)
+        now = 0
+        for data in _blocks(f, block):
+            for m in pattern.finditer(data):
+                stamp, scalar, code, vector, vcode = m.groups()
+                if stamp is not None:
+                    now = int(stamp)
+                    continue
+                if scalar is not None:
+                    value, ok = (1 if scalar == b'1' else 0), scalar in b'01'
+                else:
+                    code = vcode
+                    if vector[:1] in b'bB':
+                        value, ok = _vector(vector[1:])
+                    else:
+                        value, ok = int(round(float(vector[1:]))), True
+                times[code].append(now)
+                values[code].append(value & 0xFFFFFFFFFFFFFFFF)
+                known[code].append(ok)
+
+    result = {}
+    for code, names in wanted.items():
+        chg = (np.frombuffer(times[code], dtype=np.int64),
+               np.frombuffer(values[code], dtype=np.uint64),
+               np.frombuffer(known[code], dtype=np.int8).astype(bool))
+        for name, width in names:
+            result[name] = Changes(*chg, width)
+    return result
+
+
+def value_at(chg, times, before=False):
+    """
+    (values, known) of a signal at the given times
+    before=True returns the value just before each time (what a flip-flop
+    clocked at that time samples). Times before the first change read x.
+    """
+    times = np.asarray(times)
+    idx = np.searchsorted(chg.time, times, side='left' if before else 'right') - 1
+    valid = idx >= 0
+    idx = np.maximum(idx, 0)
+    if len(chg.time) == 0:
+        return np.zeros(times.shape, dtype=np.uint64), np.zeros(times.shape, dtype=bool)
+    return (np.where(valid, chg.value[idx], 0).astype(np.uint64),
+            valid & chg.known[idx])
+
+
+def sample(chg, clock_times):
+    """Per-cycle values of a signal sampled at clock edges (x reads as 0)"""
+    return value_at(chg, clock_times, before=True)[0]
+
+
+def edges(chg, kind='rise'):
+    """Times of the rise, fall or both edges of a 1-bit signal"""
+    value = (chg.value & 1).astype(np.int8) * chg.known
+    prev = np.concatenate([[0], value[:-1]])
+    prev_known = np.concatenate([[False], chg.known[:-1]])
+    rise = prev_known & chg.known & (prev == 0) & (value == 1)
+    fall = prev_known & chg.known & (prev == 1) & (value == 0)
+    mask = {'rise': rise, 'fall': fall, 'both': rise | fall}[kind]
+    return chg.time[mask]
+
+
+def bursts(mask):
+    """(start, length) of every run of True in a per-cycle mask"""
+    mask = np.asarray(mask, dtype=bool).astype(np.int8)
+    d = np.diff(np.concatenate([[0], mask, [0]]))
+    starts = np.flatnonzero(d == 1)
+    return starts, np.flatnonzero(d == -1) - starts
+
+
+def gaps(starts, lengths):
+    """Idle cycles between consecutive bursts"""
+    starts = np.asarray(starts)
+    return starts[1:] - (starts[:-1] + np.asarray(lengths)[:-1])
+
+
+def handshakes(chg, clock, valid, ready=None):
+    """
+    Cycle indices of the clock edges where valid (and ready) are high
+    chg: {name: Changes}; clock, valid, ready: names in chg
+    """
+    t = edges(chg[clock])
+    fire = sample(chg[valid], t) != 0
+    if ready is not None:
+        fire &= sample(chg[ready], t) != 0
+    return np.flatnonzero(fire)
+
+
+def check_bursts(path, signals, clock='clk', expect_len=None, expect_count=None):
+    """Print the valid bursts of each signal; True if they match the expectations"""
+    chg = read_changes(path, [clock] + list(signals))
+    t = edges(chg[clock])
+    print(f"{path}: {len(t)} clock cycles")
+    passed = True
+    for name in signals:
+        starts, lengths = bursts(sample(chg[name], t) != 0)
+        ok = ((expect_len is None or bool((lengths == expect_len).all()))
+              and (expect_count is None or len(lengths) == expect_count))
+        passed &= ok
+        gap = gaps(starts, lengths)
+        print(f"  {'✓' if ok else '✗'} {name}: {len(lengths)} bursts, "
+              f"lengths {sorted(set(lengths.tolist()))}, "
+              f"gaps {sorted(set(gap.tolist())) if len(gap) else []}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream and check VCD value changes")
+    parser.add_argument('vcd', help="VCD file")
+    parser.add_argument('--list', action='store_true', help="List the declared signals")
+    parser.add_argument('--clock', default='clk', help="Clock signal (default: clk)")
+    parser.add_argument('--bursts', nargs='+', default=[],
+                        help="1-bit valid/enable signals whose bursts are reported")
+    parser.add_argument('--expect-len', type=int, default=None,
+                        help="Required length of every burst")
+    parser.add_argument('--expect-count', type=int, default=None,
+                        help="Required number of bursts per signal")
+    args = parser.parse_args()
+
+    if args.list:
+        variables, timescale = read_header(args.vcd)
+        print(f"Timescale: {timescale}")
+        for name, var in variables.items():
+            print(f"  {name:<60} {var.kind:<10} {var.width:>3}  {var.code}")
+    if not args.bursts:
+        return True
+    return check_bursts(args.vcd, args.bursts, args.clock, args.expect_len, args.expect_count)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,83 @@
+"""
+Memory-Mapped Binary Vector Files
+---------------------------------
+Fixed-layout binary alternative to the text hex dumps, for long runs where
+ASCII size and parse time dominate. Written by tool/vecbin.vh ($fwrite %u)
+in the testbenches and by write_vectors() here; read with np.memmap without
+copying.
+
+Layout (all fields little-endian):
+- Header, 16 bytes: magic 'VECB', N (uint32), WIDTH (uint32), frames (uint32)
+- Per frame: N int16 real samples, then N int16 imaginary samples
+
+frames = 0 in the header means "unknown" (a testbench that streams until
+$finish); readers then derive the frame count from the file size.
+"""
+
+import os
+import numpy as np
+
+MAGIC = b'VECB'
+HEADER_DTYPE = np.dtype([('magic', 'S4'), ('n', '<u4'), ('width', '<u4'),
+                         ('frames', '<u4')])
+SAMPLE_DTYPE = np.dtype('<i2')
+
+
+def _frame_bytes(n):
+    return 2 * n * SAMPLE_DTYPE.itemsize
+
+
+def read_header(path):
+    """Return (n, width, frames) of a binary vector file"""
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) == 0 or header['magic'][0] != MAGIC:
+        raise ValueError(f"{path}: not a binary vector file")
+    n = int(header['n'][0])
+    width = int(header['width'][0])
+    frames = int(header['frames'][0])
+    if width != 16:
+        raise ValueError(f"{path}: unsupported sample width {width}")
+    if frames == 0:
+        frames = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // _frame_bytes(n)
+    return n, width, frames
+
+
+def open_vectors(path, mode='r'):
+    """
+    Memory-map a binary vector file as a (frames, 2, N) int16 array
+    [:, 0] holds the real plane and [:, 1] the imaginary plane of each frame.
+    """
+    n, _, frames = read_header(path)
+    return np.memmap(path, dtype=SAMPLE_DTYPE, mode=mode,
+                     offset=HEADER_DTYPE.itemsize, shape=(frames, 2, n))
+
+
+def read_vectors(path):
+    """Return zero-copy (frames, N) real and imaginary views of a vector file"""
+    data = open_vectors(path)
+    return data[:, 0], data[:, 1]
+
+
+def create_vectors(path, n, frames, width=16):
+    """Create a vector file and return it as a writable (frames, 2, N) memmap"""
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header['magic'] = MAGIC
+    header['n'] = n
+    header['width'] = width
+    header['frames'] = frames
+    with open(path, 'wb') as f:
+        header.tofile(f)
+        f.truncate(HEADER_DTYPE.itemsize + frames * _frame_bytes(n))
+    return open_vectors(path, mode='r+')
+
+
+def write_vectors(path, data_re, data_im):
+    """Write one frame or a (frames, N) stack of (real, imag) samples"""
+    data_re = np.atleast_2d(data_re)
+    data_im = np.atleast_2d(data_im)
+    frames, n = data_re.shape
+    out = create_vectors(path, n, frames)
+    out[:, 0] = data_re
+    out[:, 1] = data_im
+    out.flush()
+    del out
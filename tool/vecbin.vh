@@ -0,0 +1,66 @@
+//----------------------------------------------------------------------
+//	vecbin.vh: Binary Vector File Helpers (see tool/vecbin.py)
+//----------------------------------------------------------------------
+//	Include inside a testbench module. Files hold a 16-byte header
+//	('VECB', N, WIDTH, frames as little-endian 32-bit words) followed by
+//	N int16 real and N int16 imaginary samples per frame.
+//	$fwrite "%u" emits 32-bit words LSB first; $fread fills a reg MSB
+//	first, so words read back are byte-swapped before use.
+
+localparam	VECBIN_MAGIC = 32'h42434556;	//	"VECB" little-endian
+
+function [31:0] VecbinSwap32;
+	input	[31:0]	w;
+begin
+	VecbinSwap32 = {w[7:0], w[15:8], w[23:16], w[31:24]};
+end
+endfunction
+
+task VecbinWriteHeader;
+	input integer	fd;
+	input integer	n;
+	input integer	frames;
+begin
+	$fwrite(fd, "%u%u%u%u", VECBIN_MAGIC, n, 32'd16, frames);
+end
+endtask
+
+task VecbinReadHeader;
+	input integer	fd;
+	output integer	n;
+	output integer	frames;
+	reg		[31:0]	w;
+	integer			r;
+begin
+	r = $fread(w, fd);
+	if (r != 4 || VecbinSwap32(w) != VECBIN_MAGIC)
+		$display("[ERROR] vecbin: bad header magic");
+	r = $fread(w, fd);	n = VecbinSwap32(w);
+	r = $fread(w, fd);	//	WIDTH (always 16)
+	r = $fread(w, fd);	frames = VecbinSwap32(w);
+end
+endtask
+
+//	Two consecutive samples of a plane per 32-bit word
+task VecbinWritePair;
+	input integer	fd;
+	input	[15:0]	s0;
+	input	[15:0]	s1;
+begin
+	$fwrite(fd, "%u", {s1, s0});
+end
+endtask
+
+task VecbinReadPair;
+	input integer	fd;
+	output	[15:0]	s0;
+	output	[15:0]	s1;
+	reg		[31:0]	w;
+	integer			r;
+begin
+	r = $fread(w, fd);
+	w = VecbinSwap32(w);
+	s0 = w[15:0];
+	s1 = w[31:16];
+end
+endtask
@@ -0,0 +1,250 @@
+"""
+Content-Hash Cache for iverilog Builds
+--------------------------------------
+Drop-in wrapper for iverilog that reuses a previously compiled .vvp image
+when nothing that affects the build has changed. The cache key hashes:
+- the iverilog executable (path, size, mtime)
+- every flag and define, in order (the -o target excluded)
+- the contents of every source, command file and `include'd file, in order,
+  including the files a -c/-f command file lists (+incdir+, +libdir+,
+  +libext+, -y, -Y, -l and nested -c/-f are followed)
+- every file with a library extension in the -y / +libdir+ directories
+  (-Y / +libext+, default .v .sv)
+
+Command files using $(VAR) substitution are not followed; such builds
+bypass the cache and always compile.
+
+On a hit the cached image is copied to the -o path; on a miss iverilog runs
+normally and its output is stored. Cache directory: $VVP_CACHE_DIR or
+<repo>/.vvp_cache. Set VVP_CACHE=0 to always recompile.
+
+Usage (same arguments as iverilog):
+    python3 ../tool/vvpcache.py -o tb512.vvp -g2005-sv ../FFT512.v ... TB512.v
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+CACHE_DIR = os.environ.get('VVP_CACHE_DIR', os.path.join(ROOT, '.vvp_cache'))
+MAX_ENTRIES = 64
+
+# iverilog options that take a value (attached or as the next argument)
+VALUE_OPTS = ('-B', '-c', '-D', '-f', '-g', '-I', '-L', '-l', '-M', '-m', '-N',
+              '-o', '-p', '-s', '-T', '-t', '-W', '-y', '-Y')
+
+LIB_EXTS = ('.v', '.sv')
+
+INCLUDE_RE = re.compile(rb'^\s*`include\s+"([^"]+)"', re.MULTILINE)
+
+
+def parse_args(argv):
+    """Split an iverilog command line into (output, options, sources, include dirs)"""
+    output = 'a.out'
+    options = []
+    sources = []
+    inc_dirs = []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        opt = arg[:2]
+        if arg.startswith('-') and opt in VALUE_OPTS:
+            value = arg[2:]
+            if not value and i + 1 < len(argv):
+                i += 1
+                value = argv[i]
+            if opt == '-o':
+                output = value
+            else:
+                options.append((opt, value))
+                if opt == '-I':
+                    inc_dirs.append(value)
+                elif opt == '-l':
+                    sources.append(value)
+        elif arg.startswith('-'):
+            options.append((arg, ''))
+        else:
+            sources.append(arg)
+        i += 1
+    return output, options, sources, inc_dirs
+
+
+def parse_command_file(data):
+    """
+    (sources, command files, include dirs, library dirs, library extensions)
+    listed in an iverilog -c/-f command file, or None if it uses $(VAR)
+    substitution
+    """
+    tokens = []
+    for line in data.decode(errors='replace').splitlines():
+        tokens.extend(re.sub(r'(#|//).*', '', line).split())
+    if any('$(' in tok or '${' in tok for tok in tokens):
+        return None
+    sources, cmd_files, inc_dirs, lib_dirs, lib_exts = [], [], [], [], []
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok.startswith('+'):
+            plus, _, rest = tok[1:].partition('+')
+            values = [v for v in rest.split('+') if v]
+            if plus == 'incdir':
+                inc_dirs += values
+            elif plus in ('libdir', 'libdir-nocase'):
+                lib_dirs += values
+            elif plus == 'libext':
+                lib_exts += values
+        elif tok in ('-c', '-f', '-l', '-y', '-Y', '-I') and i + 1 < len(tokens):
+            i += 1
+            value = tokens[i]
+            if tok in ('-c', '-f'):
+                cmd_files.append(value)
+            elif tok == '-l':
+                sources.append(value)
+            elif tok == '-y':
+                lib_dirs.append(value)
+            elif tok == '-Y':
+                lib_exts.append(value)
+            else:
+                inc_dirs.append(value)
+        elif not tok.startswith('-'):
+            sources.append(tok)
+        i += 1
+    return sources, cmd_files, inc_dirs, lib_dirs, lib_exts
+
+
+def _library_files(lib_dir, lib_exts):
+    """Files a -y directory can supply, in a stable order (None if missing)"""
+    try:
+        names = sorted(os.listdir(lib_dir))
+    except OSError:
+        return None
+    return [os.path.join(lib_dir, n) for n in names
+            if n.endswith(tuple(lib_exts or LIB_EXTS))
+            and os.path.isfile(os.path.join(lib_dir, n))]
+
+
+def _resolve_include(name, parent, inc_dirs, relative=False):
+    """
+    File an `include names, in iverilog's search order: the working
+    directory, then the -I / +incdir+ directories as given (the including
+    file's directory comes first only with -grelative-include)
+    """
+    bases = ['.'] + inc_dirs
+    if relative:
+        bases.insert(0, os.path.dirname(parent))
+    for base in bases:
+        pth = os.path.join(base, name)
+        if os.path.isfile(pth):
+            return pth
+    return None
+
+
+def build_key(argv):
+    """
+    Cache key of an iverilog invocation, or None if a source is missing or
+    a command file can't be followed
+    """
+    output, options, sources, inc_dirs = parse_args(argv)
+    h = hashlib.sha256()
+    exe = shutil.which('iverilog') or 'iverilog'
+    try:
+        st = os.stat(exe)
+        h.update(f"{exe}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+    except OSError:
+        h.update(f"{exe}\n".encode())
+    for opt, value in options:
+        h.update(f"{opt}{value}\n".encode())
+
+    # Command files first, then sources in command-line order, each
+    # followed by its includes; library directories once all are known
+    lib_dirs = [value for opt, value in options if opt == '-y']
+    lib_exts = [value for opt, value in options if opt == '-Y']
+    relative = False
+    for opt, value in options:
+        if opt == '-g' and value in ('relative-include', 'no-relative-include'):
+            relative = value == 'relative-include'
+    pending = [(pth, False) for pth in reversed(sources)]
+    pending += [(value, True) for opt, value in reversed(options) if opt in ('-c', '-f')]
+    seen = set()
+    libs_done = False
+    while pending or not libs_done:
+        if not pending:
+            libs_done = True
+            for lib_dir in lib_dirs:
+                files = _library_files(lib_dir, lib_exts)
+                if files is None:
+                    return None
+                pending += [(pth, False) for pth in reversed(files)]
+            continue
+        pth, is_cmd = pending.pop()
+        norm = os.path.normpath(pth)
+        if (norm, is_cmd) in seen:
+            continue
+        seen.add((norm, is_cmd))
+        try:
+            with open(pth, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        h.update(f"{norm}\n".encode())
+        h.update(hashlib.sha256(data).digest())
+        if is_cmd:
+            listed = parse_command_file(data)
+            if listed is None:
+                return None
+            cmd_sources, cmd_files, cmd_inc, cmd_lib, cmd_ext = listed
+            inc_dirs += cmd_inc
+            lib_dirs += cmd_lib
+            lib_exts += cmd_ext
+            pending += [(p, False) for p in reversed(cmd_sources)]
+            pending += [(p, True) for p in reversed(cmd_files)]
+            continue
+        for name in reversed(INCLUDE_RE.findall(data)):
+            name = name.decode()
+            inc = _resolve_include(name, pth, inc_dirs, relative)
+            if inc is None:
+                h.update(f"unresolved:{name}\n".encode())
+            else:
+                pending.append((inc, False))
+    return h.hexdigest()
+
+
+def _prune():
+    entries = [os.path.join(CACHE_DIR, e) for e in os.listdir(CACHE_DIR)
+               if e.endswith('.vvp')]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for pth in entries[MAX_ENTRIES:]:
+        os.remove(pth)
+
+
+def compile_cached(argv):
+    """Run iverilog through the cache; returns the iverilog exit status"""
+    output = parse_args(argv)[0]
+    key = build_key(argv) if os.environ.get('VVP_CACHE', '1') != '0' else None
+    if key is None:
+        return subprocess.call(['iverilog'] + argv)
+
+    cached = os.path.join(CACHE_DIR, key + '.vvp')
+    if os.path.isfile(cached):
+        shutil.copy2(cached, output)
+        os.utime(cached)
+        print(f"[vvpcache] hit  {key[:12]} -> {output}")
+        return 0
+
+    status = subprocess.call(['iverilog'] + argv)
+    if status == 0 and os.path.isfile(output):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{cached}.{os.getpid()}.tmp"
+        shutil.copy2(output, tmp)
+        os.replace(tmp, cached)
+        _prune()
+        print(f"[vvpcache] miss {key[:12]} -> {output} (stored)")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(compile_cached(sys.argv[1:]))
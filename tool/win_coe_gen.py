@@ -1,6 +1,8 @@
 import numpy as np
 import argparse
 
+import coe_rom
+
 def generate_hann_window(window_len, bit_width=16, output_file=None):
     """
     Generate Hann window coefficients.
@@ -23,9 +25,9 @@ def generate_hann_window(window_len, bit_width=16, output_file=None):
     n = np.arange(window_len)
     hann_coeffs = 0.5 * (1 - np.cos(2 * np.pi * n / (window_len - 1)))
     
-    # Convert to fixed-point representation
+    # Convert to fixed-point representation (shared with tool/coe_rom.py)
     max_value = 2**(bit_width - 1) - 1
-    hann_fixed = np.round(hann_coeffs * max_value).astype(int)
+    hann_fixed = coe_rom.hann(window_len, nb=bit_width)
     
     # Print coefficients
     print(f"Hann Window Coefficients (Length: {window_len}, Bit Width: {bit_width})")
@@ -39,11 +41,6 @@ def generate_hann_window(window_len, bit_width=16, output_file=None):
     # for i, coeff in enumerate(hann_fixed):
     #     print(f"  [{i:3d}] = {coeff:6d}")
     
-    # print("\nHexadecimal format (for Verilog):")
-    for i, coeff in enumerate(hann_fixed):
-        hex_val = coeff & ((1 << bit_width) - 1)  # Ensure positive representation
-        # print(f"  [{i:3d}] = 16'h{hex_val:04x}")
-    
     # Save to file if specified
     if output_file:
         with open(output_file, 'w') as f:
@@ -51,10 +48,7 @@ def generate_hann_window(window_len, bit_width=16, output_file=None):
             f.write(f"// Length: {window_len}\n")
             f.write(f"// Bit Width: {bit_width}\n")
             f.write(f"// Max Value: {max_value}\n\n")
-            
-            for i, coeff in enumerate(hann_fixed):
-                hex_val = coeff & ((1 << bit_width) - 1)
-                f.write(f"assign win_coe [{i:3d}] = 16'h{hex_val:04x};\n")
+            f.write(coe_rom.hann_assign(window_len, nb=bit_width).decode())
         
         print(f"\nCoefficients saved to: {output_file}")
     
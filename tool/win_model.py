@@ -0,0 +1,101 @@
+"""
+Bit-Accurate WIN_LUT Windowing Model
+------------------------------------
+NumPy integer model of the STFT front end built from Window_lut.v,
+cir_buffer.v, HannWin480.v and Multiply.v:
+- Frame k covers input samples [k*HOP_LEN, k*HOP_LEN + WIN_LEN), the read
+  pointer jumps back by WIN_LEN - HOP_LEN after each frame (cir_buffer.v)
+- Each sample is multiplied by the HANN_WIN_480 ROM coefficient with the
+  Multiply.v convergent rounding (round half to even, positive saturation)
+- The SHFT_DEPTH = (N_FFT - WIN_LEN)/2 output delay line, cleared on
+  frm_init, places the WIN_LEN products in the middle of an N_FFT frame
+  with SHFT_DEPTH zeros on both sides
+- Window_lut.v drives the multiplier with a_im = 0, so the imaginary output
+  is always 0 and din_im does not reach the FFT
+
+The cycle alignment has not been checked against a simulation capture
+(frame_log.txt or tb_window_lut.vcd). window_frames() puts sample i of a
+frame, times rom[i], at output index SHFT_DEPTH + i. That assumes the
+following RTL timing:
+- the S2SRAM read (rd_data) and HANN_WIN_480.win_coe_out are both
+  registered, so at r_idx_ptr = p the multiplier sees x[p-1] and rom[p-1]
+- the r_idx_ptr > WIN_LEN gate (not >=) passes p = WIN_LEN, the last
+  product x[WIN_LEN-1] * rom[WIN_LEN-1]
+- after the SHFT_DEPTH delay line, dout at r_idx_ptr = c holds the product
+  of sample c - SHFT_DEPTH - 1, so output index 0 is the word at
+  r_idx_ptr = 1 and index N_FFT-1 is the zeroed word of the frm_init cycle
+  (the delay line is cleared asynchronously on frm_init)
+- r_idx_ptr advances every clock, i.e. the circular buffer never stalls it
+  with empty/full during a frame (the delay line shifts on every clock, so
+  a stall would shift the products)
+
+Frames are extracted with sliding_window_view (no copies of the input
+stream); iter_window_frames() accepts an unbounded iterable of chunks.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from fft_model import round_shift_sat
+import rom_tables
+
+WIDTH = 16
+N_FFT = 512
+WIN_LEN = 480
+HOP_LEN = 160
+
+HANN_ROM = rom_tables.HANN_ROM
+
+
+def hann_rom(path=HANN_ROM):
+    """HANN_WIN_480 coefficients as read from the ROM source (N_FFT entries)"""
+    return rom_tables.read_table(path, 'win_coe')[0]
+
+
+def window_samples(samples, coe, width=WIDTH):
+    """Multiply.v with a_im = b_im = 0: Q1.15 product with convergent rounding"""
+    return round_shift_sat(np.asarray(samples, dtype=np.int64) * coe, width)
+
+
+def num_frames(num_samples, win_len=WIN_LEN, hop_len=HOP_LEN):
+    """Number of complete frames in a stream of num_samples samples"""
+    if num_samples < win_len:
+        return 0
+    return 1 + (num_samples - win_len) // hop_len
+
+
+def window_frames(samples, n_fft=N_FFT, win_len=WIN_LEN, hop_len=HOP_LEN,
+                  rom=None, width=WIDTH):
+    """
+    Windowed frames of a real Q1.15 sample stream
+    Returns (frames_re, frames_im) as (frames, n_fft) int64 arrays; frames_im
+    is all zero like the RTL output.
+    """
+    samples = np.asarray(samples, dtype=np.int64)
+    if rom is None:
+        rom = hann_rom()
+    frames = num_frames(len(samples), win_len, hop_len)
+    pad = (n_fft - win_len) // 2
+    out_re = np.zeros((frames, n_fft), dtype=np.int64)
+    if frames:
+        view = sliding_window_view(samples, win_len)[::hop_len][:frames]
+        out_re[:, pad:pad + win_len] = window_samples(view, rom[:win_len], width)
+    return out_re, np.zeros_like(out_re)
+
+
+def iter_window_frames(chunks, n_fft=N_FFT, win_len=WIN_LEN, hop_len=HOP_LEN,
+                       rom=None, width=WIDTH):
+    """
+    Generator of (frame_re, frame_im) for an arbitrarily long stream
+    chunks: iterable of 1-D sample arrays of any length. Only the last
+    WIN_LEN - HOP_LEN (plus a partial hop) samples are kept between chunks.
+    """
+    if rom is None:
+        rom = hann_rom()
+    tail = np.zeros(0, dtype=np.int64)
+    for chunk in chunks:
+        buf = np.concatenate([tail, np.asarray(chunk, dtype=np.int64)])
+        frames_re, frames_im = window_frames(buf, n_fft, win_len, hop_len, rom, width)
+        for frame_re, frame_im in zip(frames_re, frames_im):
+            yield frame_re, frame_im
+        tail = buf[len(frames_re) * hop_len:]
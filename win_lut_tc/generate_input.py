@@ -1,5 +1,9 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tool'))
+from qformat import QArray
 
 # Parameters
 WIDTH = 16
@@ -14,29 +18,6 @@ Q_FORMAT = 15  # Q0.15 fixed-point format
 NUM_FRAMES = 3
 NUM_SAMPLES = WIN_LEN + (NUM_FRAMES - 1) * HOP_LEN
 
-def float_to_q15(val):
-    """Convert floating point to Q0.15 fixed-point format"""
-    # Q0.15: 1 sign bit, 15 fractional bits
-    # Range: -1.0 to +0.999969482421875
-    max_val = 2**15 - 1  # 32767
-    min_val = -2**15     # -32768
-    
-    fixed = int(round(val * (2**Q_FORMAT)))
-    fixed = max(min_val, min(max_val, fixed))  # Clamp to valid range
-    
-    # Convert to signed 16-bit
-    if fixed < 0:
-        fixed = (1 << 16) + fixed
-    
-    return fixed & 0xFFFF
-
-def q15_to_float(val):
-    """Convert Q0.15 fixed-point to floating point"""
-    # Handle sign extension
-    if val & 0x8000:
-        val = val - 0x10000
-    return val / (2**Q_FORMAT)
-
 def generate_test_signal(num_samples, signal_type='multi_tone', cplx = False):
     """
     Generate test signals for window function testing
@@ -119,15 +100,9 @@ def main():
     signal_type = 'multi_tone'  # Change this to test different signals
     signal_re, signal_im = generate_test_signal(NUM_SAMPLES, signal_type)
     
-    # Convert to Q15 format
-    input_data_re = []
-    input_data_im = []
-    
-    for i in range(NUM_SAMPLES):
-        re_q15 = float_to_q15(signal_re[i])
-        im_q15 = float_to_q15(signal_im[i])
-        input_data_re.append(re_q15)
-        input_data_im.append(im_q15)
+    # Convert to Q15 format (saturating, round half to even), 16-bit unsigned codes
+    input_data_re = QArray.from_float(signal_re, WIDTH, Q_FORMAT).unsigned()
+    input_data_im = QArray.from_float(signal_im, WIDTH, Q_FORMAT).unsigned()
     
     # Write input file for Verilog testbench
     with open('input.txt', 'w') as f:
@@ -39,7 +39,7 @@ for file in "${VERILOG_FILES[@]}"; do
 done
 
 # Run iverilog
-iverilog -g2012 -o tb_window_lut.vvp "${VERILOG_FILES[@]}"
+python3 ../tool/vvpcache.py -g2012 -o tb_window_lut.vvp "${VERILOG_FILES[@]}"
 
 if [ $? -ne 0 ]; then
     echo ""
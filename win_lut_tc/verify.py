@@ -1,8 +1,14 @@
 import os
+import sys
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+from argparse import ArgumentParser
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tool'))
+import hexio
+import win_model
+import plotting
+import qformat
+import vcd
+from error_stats import ErrorStats
 # Parameters
 WIDTH = 16
 N_FFT = 512
@@ -10,44 +16,22 @@ WIN_LEN = 480
 HOP_LEN = 160
 Q_FORMAT = 15
 VIVADO = True  # Set to True if RTL output is from Vivado simulator
+VCD_FILE = 'tb_window_lut.vcd'
 
-def u16_to_signed(val):
-    """Convert unsigned 16-bit value to signed integer."""
-    return val - 0x10000 if val & 0x8000 else val
-
-def q15_to_float(val):
-    """Convert Q0.15 fixed-point to floating point"""
-    # Handle negative numbers in two's complement
-    if val < 0:
-        val = (1 << 16) + val
-    if val & 0x8000:
-        val = val - 0x10000
-    return val / (2**Q_FORMAT)
-
-def float_to_q15(val):
-    """Convert floating point to Q0.15 fixed-point"""
-    max_val = 2**15 - 1
-    min_val = -2**15
-    fixed = int(round(val * (2**Q_FORMAT)))
-    fixed = max(min_val, min(max_val, fixed))
-    return fixed
-
-def load_hann_window():
-    """Generate a Hann window matching the RTL LUT."""
-    n = np.arange(WIN_LEN)
-    window = 0.5 - 0.5 * np.cos((2 * np.pi * n) / (WIN_LEN - 1))
-    return window
-
-def apply_window_golden(input_re, input_im, window):
+def apply_window_golden(input_re):
     """
     Apply windowing operation - Golden reference model
     
-    The Window_lut module:
-    1. Accumulates WIN_LEN samples in a circular buffer
-    2. Every N_FFT cycles, outputs a windowed frame:
-       - First WIN_LEN samples are multiplied by window coefficients
-       - The result is centered in an N_FFT-length output frame (zero-padded)
-    3. The read pointer moves back by (WIN_LEN - HOP_LEN) after each frame
+    Bit-accurate model of the Window_lut module (tool/win_model.py):
+    1. Frame k covers samples [k*HOP_LEN, k*HOP_LEN + WIN_LEN) (circular buffer
+       read pointer jumps back by WIN_LEN - HOP_LEN after each frame)
+    2. Samples are multiplied by the HANN_WIN_480 ROM coefficients with the
+       Multiply rounding (round half to even)
+    3. The result is centered in an N_FFT-length output frame (zero-padded)
+    The sample/output alignment follows the RTL latencies assumed in
+    tool/win_model.py and has not yet been checked against a simulation.
+    The RTL multiplier has a_im = 0, so the imaginary output is always 0.
+    Returns lists of per-frame float arrays (Q1.15 values / 2**15).
     """
     num_samples = len(input_re)
     
@@ -56,54 +40,11 @@ def apply_window_golden(input_re, input_im, window):
         print(f"Warning: Not enough samples ({num_samples}) for first frame (need {WIN_LEN})")
         return [], []
     
-    # Calculate how many complete frames we can generate
-    # First frame needs WIN_LEN samples, each subsequent frame needs HOP_LEN more
-    num_frames = 1 + max(0, (num_samples - WIN_LEN) // HOP_LEN)
-    
     print(f"Input samples: {num_samples}")
-    print(f"Expected frames: {num_frames}")
-    
-    output_frames_re = []
-    output_frames_im = []
-    
-    for frame_idx in range(num_frames):
-        # Calculate the starting position for this frame
-        frame_start = frame_idx * HOP_LEN
-        frame_end = frame_start + WIN_LEN
-        
-        if frame_end > num_samples:
-            print(f"Frame {frame_idx}: Not enough samples (need {frame_end}, have {num_samples})")
-            break
-        
-        print(f"Frame {frame_idx}: samples [{frame_start}:{frame_end})")
-        
-        # Extract the frame data
-        frame_re = input_re[frame_start:frame_end]
-        frame_im = input_im[frame_start:frame_end]
-        
-        # Apply window (first WIN_LEN coefficients)
-        windowed_re = frame_re * window[:WIN_LEN]
-        windowed_im = frame_im * window[:WIN_LEN]
-        
-        # Zero-pad to N_FFT length: symmetrical padding
-        padded_re = np.zeros(N_FFT)
-        padded_im = np.zeros(N_FFT)
-        padded_re[(N_FFT - WIN_LEN) // 2: WIN_LEN + (N_FFT - WIN_LEN) // 2] = windowed_re
-        padded_im[(N_FFT - WIN_LEN) // 2: WIN_LEN + (N_FFT - WIN_LEN) // 2] = windowed_im
-
-        output_frames_re.append(padded_re)
-        output_frames_im.append(padded_im)
+    print(f"Expected frames: {win_model.num_frames(num_samples, WIN_LEN, HOP_LEN)}")
     
-    return output_frames_re, output_frames_im
-
-def summarize_error_stats(error_values):
-    if len(error_values) == 0:
-        return 0.0, 0.0, 0.0
-    error_array = np.array(error_values, dtype=np.float64)
-    max_abs = np.max(np.abs(error_array))
-    mean_abs = np.mean(np.abs(error_array))
-    rms = np.sqrt(np.mean(error_array ** 2))
-    return max_abs, mean_abs, rms
+    frames_re, frames_im = win_model.window_frames(input_re, N_FFT, WIN_LEN, HOP_LEN)
+    return list(qformat.to_float(frames_re, Q_FORMAT)), list(qformat.to_float(frames_im, Q_FORMAT))
 
 def analyze_frame_log(expected_frames):
     path = 'frame_log_vivado.txt' if VIVADO else 'frame_log.txt'
@@ -189,6 +130,45 @@ def analyze_frame_log(expected_frames):
     # if in_frame and current_frame_len > 0:
         # frame_lengths.append(current_frame_len)
 
+    report_buffer_control(frame_starts, frame_lengths, frame_jumps, expected_frames)
+
+def analyze_vcd(expected_frames, path=VCD_FILE):
+    """
+    Buffer control check from the simulation VCD (same rules as
+    analyze_frame_log, evaluated per clock edge with tool/vcd.py)
+    """
+    top = 'tb_Window_lut.'
+    names = {'clk': top + 'clk', 'doen': top + 'dut.dout_en', 'init': top + 'dut.frm_init',
+             'jump': top + 'dut.buf_rd_jump',
+             'ir_ptr': top + 'dut.CIRCULAR_BUFFER_inst.init_read_ptr'}
+    chg = vcd.read_changes(path, list(names.values()))
+    t = vcd.edges(chg[names['clk']])
+    doen, init, jump, ir_ptr = (vcd.sample(chg[names[k]], t).astype(np.int64)
+                                for k in ('doen', 'init', 'jump', 'ir_ptr'))
+    prev = lambda x: np.concatenate([[0], x[:-1]])
+
+    # sample_count before each cycle counts the dout_en cycles so far
+    sample_count = np.concatenate([[0], np.cumsum(doen)[:-1]])
+    start = ((prev(doen) == 0) & (doen == 1)) | ((init == 0) & (prev(init) == 1) & (doen != 0))
+    frame_starts = []
+    frame_lengths = []
+    in_frame = False
+    for c in np.flatnonzero(start | (init == 1)):
+        if init[c] == 1 and in_frame:
+            frame_lengths.append(int(sample_count[c] - frame_starts[-1] + 1))
+            in_frame = False
+        if start[c]:
+            frame_starts.append(int(sample_count[c]))
+            in_frame = True
+
+    # Hops: read pointer after each jump, modulo the pointer width
+    falls = (prev(jump) == 1) & (jump == 0)
+    frame_jumps = list(ir_ptr[falls])
+    print(f"\nBuffer control from {path}: {len(t)} clock cycles")
+    report_buffer_control(frame_starts, frame_lengths, frame_jumps, expected_frames,
+                          1 << chg[names['ir_ptr']].width)
+
+def report_buffer_control(frame_starts, frame_lengths, frame_jumps, expected_frames, ptr_range=None):
     print("\n" + "=" * 70)
     print("Buffer Control Check")
     print("=" * 70)
@@ -208,6 +188,8 @@ def analyze_frame_log(expected_frames):
         hop_lengths = []
         for i in range(1, len(frame_jumps)):
             hop = frame_jumps[i] - frame_jumps[i-1]
+            if ptr_range:
+                hop %= ptr_range
             hop_lengths.append(hop)
             status = "PASS" if hop == HOP_LEN else "FAIL"
             print(f"Hop {i}: Δsamples = {hop} (expected {HOP_LEN}) -> {status}")
@@ -215,60 +197,44 @@ def analyze_frame_log(expected_frames):
     if expected_frames is not None and expected_frames != len(frame_starts):
         print(f"⚠ Frame count mismatch: expected {expected_frames}, observed {len(frame_starts)}")
 
-def main():
+def main(plot=None):
     print("=" * 70)
     print("Window LUT Testbench - Verification Script")
     print("=" * 70)
     
-    # Load input data (floating point reference)
+    # Load input data (the Q1.15 samples the testbench feeds to the DUT)
     try:
-        data = np.load('input_float.npz')
-        input_re_float = data['signal_re']
-        input_im_float = data['signal_im']
-        print(f"Loaded {len(input_re_float)} input samples from input_float.npz")
-    except:
-        print("Error: Could not load input_float.npz")
+        input_re, input_im = hexio.read_hex_pairs('input.txt')
+        print(f"Loaded {len(input_re)} input samples from input.txt")
+    except OSError:
+        print("Error: Could not load input.txt")
         print("Please run generate_input.py first")
-        return
-    
-    # Load Hann window
-    hann_window = load_hann_window()
+        return False
     
     # Generate golden reference
     print("\nGenerating golden reference...")
-    golden_frames_re, golden_frames_im = apply_window_golden(
-        input_re_float, input_im_float, hann_window)
+    golden_frames_re, golden_frames_im = apply_window_golden(input_re)
     
     num_golden_frames = len(golden_frames_re)
     print(f"Generated {num_golden_frames} golden reference frames")
     
     # Save golden output
-    with open('golden_output.txt', 'w') as f:
-        for frame_idx in range(num_golden_frames):
-            for i in range(N_FFT):
-                re_q15 = float_to_q15(golden_frames_re[frame_idx][i])
-                im_q15 = float_to_q15(golden_frames_im[frame_idx][i])
-                # Write as hexadecimal (16-bit unsigned representation)
-                f.write(f"{re_q15 & 0xFFFF:04x} {im_q15 & 0xFFFF:04x}\n")
+    golden_re_q15 = qformat.quantize(np.ravel(golden_frames_re), WIDTH, Q_FORMAT)
+    golden_im_q15 = qformat.quantize(np.ravel(golden_frames_im), WIDTH, Q_FORMAT)
+    # Write as hexadecimal (16-bit unsigned representation)
+    hexio.write_hex_columns('golden_output.txt', [golden_re_q15, golden_im_q15])
     print(f"Golden reference written to: golden_output.txt")
     
     # Load RTL output
     try:
-        rtl_output = []
         output_file = 'output_vivado.txt' if VIVADO else 'output.txt'
-        with open(output_file, 'r') as f:
-            for line in f:
-                parts = line.strip().split()
-                if len(parts) == 2:
-                    # Parse as hexadecimal
-                    re_val = int(parts[0], 16)
-                    im_val = int(parts[1], 16)
-                    rtl_output.append((re_val, im_val))
+        # Parse as hexadecimal, kept as 16-bit unsigned pairs
+        rtl_output = hexio.read_hex_columns(output_file, ncols=2, signed=False)
         print(f"\nLoaded {len(rtl_output)} samples from RTL output")
     except:
         print("Error: Could not load output.txt")
         print("Please run the Verilog simulation first")
-        return
+        return False
     
     # Compare outputs
     print("\n" + "=" * 70)
@@ -284,87 +250,54 @@ def main():
     if actual_samples != expected_samples:
         print(f"\n⚠ WARNING: Sample count mismatch!")
     
-    # Compare sample by sample
-    errors = []
-    error_values_re = []
-    error_values_im = []
+    # Compare sample by sample in frame batches; only running statistics are kept
     max_samples = min(expected_samples, actual_samples)
-    
-    for i in range(max_samples):
-        frame_idx = i // N_FFT
-        sample_idx = i % N_FFT
-        
-        golden_re = golden_frames_re[frame_idx][sample_idx]
-        golden_im = golden_frames_im[frame_idx][sample_idx]
-        
-    
-        rtl_re_u16 = rtl_output[i][0]
-        rtl_im_u16 = rtl_output[i][1]
-        rtl_re_signed = u16_to_signed(rtl_re_u16)
-        rtl_im_signed = u16_to_signed(rtl_im_u16)
-        rtl_re_signed_float = q15_to_float(rtl_re_signed)
-        rtl_im_signed_float = q15_to_float(rtl_im_signed)
-
-
-        err_re_signed = rtl_re_signed_float - golden_re
-        err_im_signed = rtl_im_signed_float - golden_im
-
-        error_values_re.append(err_re_signed)
-        error_values_im.append(err_im_signed)
-
-        if golden_re != rtl_re_signed_float or golden_im != rtl_im_signed_float:
-            errors.append({
-                'index': i,
-                'frame': frame_idx,
-                'sample': sample_idx,
-                'golden_re': golden_re,
-                'golden_im': golden_im,
-                'rtl_re': rtl_re_signed_float,
-                'rtl_im': rtl_im_signed_float,
-                'err_re': err_re_signed,
-                'err_im': err_im_signed
-            })
-    
+    golden = golden_re_q15 + 1j * golden_im_q15
+    rtl = hexio.to_signed(rtl_output[:, 0]) + 1j * hexio.to_signed(rtl_output[:, 1])
+    stats = ErrorStats(n_bins=N_FFT)
+    stats.update_stream(golden[:max_samples], rtl[:max_samples])
+    errors = stats.mismatches
+
     # Print results
-    if len(errors) == 0:
+    if errors == 0:
         print("\n✓ PASS: All samples match perfectly!")
     else:
-        print(f"\n✗ FAIL: Found {len(errors)} mismatches")
-        print(f"Error rate: {len(errors)/max_samples*100:.2f}%")
-        
-        # Show first few errors
-        # print("\nFirst 10 errors:")
-        # for err in errors[:10]:
-        #     print(f"  Sample {err['index']} (Frame {err['frame']}, Pos {err['sample']}):")
-        #     print(f"    Golden: RE={err['golden_re']:6f}, IM={err['golden_im']:6f}")
-        #     print(f"    RTL:    RE={err['rtl_re']:6f}, IM={err['rtl_im']:6f}")
-        #     print(f"    Error:  RE={err['err_re']:6f}, IM={err['err_im']:6f}")
-
-    max_abs_re, mean_abs_re, rms_re = summarize_error_stats(error_values_re)
-    max_abs_im, mean_abs_im, rms_im = summarize_error_stats(error_values_im)
-
-    print("\nError Metrics (Q15 LSB):")
-    print(f"  Real: max={max_abs_re:.0f}, mean={mean_abs_re:.4f}, rms={rms_re:.4f}")
-    print(f"        max_float={max_abs_re / (2**Q_FORMAT):.6e}")
-    print(f"  Imag: max={max_abs_im:.0f}, mean={mean_abs_im:.4f}, rms={rms_im:.4f}")
-    print(f"        max_float={max_abs_im / (2**Q_FORMAT):.6e}")
+        print(f"\n✗ FAIL: Found {errors} mismatches")
+        print(f"Error rate: {errors/max_samples*100:.2f}%")
+
+    stats.report("Window error", unit="Q15 LSB")
+    max_abs_re, max_abs_im = stats.max_abs if stats.count else (0, 0)
+    print(f"  max_float: re={qformat.to_float(max_abs_re, Q_FORMAT):.6e}, "
+          f"im={qformat.to_float(max_abs_im, Q_FORMAT):.6e}")
     
-    # Generate comparison plots
-    if actual_samples > 0:
-        rtl_re_float = np.array([q15_to_float(u16_to_signed(sample[0])) for sample in rtl_output])
-        rtl_im_float = np.array([q15_to_float(u16_to_signed(sample[1])) for sample in rtl_output])
-        plot_comparison(rtl_re_float, rtl_im_float, golden_frames_re, golden_frames_im, num_golden_frames)
-        plot_frame_by_frame(rtl_re_float, rtl_im_float, golden_frames_re, golden_frames_im, num_golden_frames)
+    # Generate comparison plots (opt-in, failing frames only unless plot == 'all')
+    if plot and actual_samples > 0:
+        rtl_re_float = qformat.to_float(rtl.real, Q_FORMAT)
+        rtl_im_float = qformat.to_float(rtl.imag, Q_FORMAT)
+        mismatch = np.zeros(num_golden_frames * N_FFT, dtype=bool)
+        mismatch[:max_samples] = golden[:max_samples] != rtl[:max_samples]
+        failing = np.flatnonzero(mismatch.reshape(num_golden_frames, N_FFT).any(axis=1))
+        frames = range(num_golden_frames) if plot == 'all' else failing
+        if plot == 'all':
+            plotting.submit(plot_comparison, rtl_re_float, rtl_im_float,
+                            golden_frames_re, golden_frames_im, num_golden_frames)
+        plot_frame_by_frame(rtl_re_float, rtl_im_float, golden_frames_re, golden_frames_im,
+                            num_golden_frames, frames)
     
-    analyze_frame_log(num_golden_frames)
+    if os.path.exists(VCD_FILE):
+        analyze_vcd(num_golden_frames)
+    else:
+        analyze_frame_log(num_golden_frames)
     print("\n" + "=" * 70)
+    return errors == 0 and actual_samples == expected_samples
 
 def plot_comparison(rtl_re, rtl_im, golden_re, golden_im, num_frames):
-    """Plot combined RTL output vs Golden reference"""
+    """Plot combined RTL output vs Golden reference (plotting worker, returns the path)"""
 
     if len(rtl_re) == 0:
         print("No RTL samples to plot.")
-        return
+        return None
+    plt = plotting.pyplot()
 
     # Convert golden to 1D arrays
     golden_re_1d = np.concatenate([frame for frame in golden_re])
@@ -415,11 +348,12 @@ def plot_comparison(rtl_re, rtl_im, golden_re, golden_im, num_frames):
     plt.tight_layout()
     plt.savefig('verification_plot.png', dpi=150)
     plt.close(fig)
-    print("Verification plot saved to: verification_plot.png")
+    return 'verification_plot.png'
 
 
-def plot_frame_by_frame(rtl_re, rtl_im, golden_re_frames, golden_im_frames, num_frames):
-    """Create per-frame signal/error plots (vf/vf_fX.png)."""
+def plot_frame_by_frame(rtl_re, rtl_im, golden_re_frames, golden_im_frames, num_frames,
+                        frames=None):
+    """Queue per-frame signal/error plots (vf/vf_fX.png) of the selected frames (default all)."""
 
     if num_frames == 0:
         print("No golden frames available for frame-by-frame plotting.")
@@ -437,50 +371,60 @@ def plot_frame_by_frame(rtl_re, rtl_im, golden_re_frames, golden_im_frames, num_
         print("Insufficient samples to generate per-frame plots.")
         return
 
-    for frame_idx in range(max_frames):
+    for frame_idx in (range(max_frames) if frames is None else frames):
+        if frame_idx >= max_frames:
+            continue
         start = frame_idx * N_FFT
         end = start + N_FFT
-        rtl_frame_re = rtl_re[start:end]
-        rtl_frame_im = rtl_im[start:end]
-        golden_frame_re = golden_re_frames[frame_idx][:N_FFT]
-        golden_frame_im = golden_im_frames[frame_idx][:N_FFT]
-
-        err_re = rtl_frame_re - golden_frame_re
-        err_im = rtl_frame_im - golden_frame_im
-
-        fig, axes = plt.subplots(4, 1, figsize=(14, 10), sharex=True)
-        fig.suptitle(f'Frame {frame_idx + 1}')
-
-        axes[0].plot(golden_frame_re, 'b-', label='Golden', linewidth=1, alpha=0.8)
-        axes[0].plot(rtl_frame_re, 'r--', label='RTL', linewidth=1, alpha=0.8)
-        axes[0].set_ylabel('Real')
-        axes[0].set_title('Real Part (Signal)')
-        axes[0].legend()
-        axes[0].grid(True, alpha=0.3)
-
-        axes[1].plot(golden_frame_im, 'b-', label='Golden', linewidth=1, alpha=0.8)
-        axes[1].plot(rtl_frame_im, 'r--', label='RTL', linewidth=1, alpha=0.8)
-        axes[1].set_ylabel('Imag')
-        axes[1].set_title('Imaginary Part (Signal)')
-        axes[1].grid(True, alpha=0.3)
-
-        axes[2].stem(err_re, linefmt='b-', basefmt=' ')
-        axes[2].set_ylabel('Error (Real)')
-        axes[2].set_title('Real Part Error (RTL - Golden)')
-        axes[2].grid(True, alpha=0.3)
-
-        axes[3].stem(err_im, linefmt='r-', basefmt=' ')
-        axes[3].set_ylabel('Error (Imag)')
-        axes[3].set_xlabel('Sample Index')
-        axes[3].set_title('Imaginary Part Error (RTL - Golden)')
-        axes[3].grid(True, alpha=0.3)
-
-        fig.tight_layout(rect=(0, 0, 1, 0.97))
         plot_path = os.path.join(vf_dir, f'vf_f{frame_idx + 1}.png')
-        fig.savefig(plot_path, dpi=150)
-        plt.close(fig)
-        print(f"Saved frame plot: {plot_path}")
-    
+        plotting.submit(plot_frame, frame_idx, rtl_re[start:end], rtl_im[start:end],
+                        golden_re_frames[frame_idx][:N_FFT], golden_im_frames[frame_idx][:N_FFT],
+                        plot_path)
+
+
+def plot_frame(frame_idx, rtl_frame_re, rtl_frame_im, golden_frame_re, golden_frame_im, plot_path):
+    """Signal/error plot of one frame (plotting worker, returns the path)."""
+    plt = plotting.pyplot()
+    err_re = rtl_frame_re - golden_frame_re
+    err_im = rtl_frame_im - golden_frame_im
+
+    fig, axes = plt.subplots(4, 1, figsize=(14, 10), sharex=True)
+    fig.suptitle(f'Frame {frame_idx + 1}')
+
+    axes[0].plot(golden_frame_re, 'b-', label='Golden', linewidth=1, alpha=0.8)
+    axes[0].plot(rtl_frame_re, 'r--', label='RTL', linewidth=1, alpha=0.8)
+    axes[0].set_ylabel('Real')
+    axes[0].set_title('Real Part (Signal)')
+    axes[0].legend()
+    axes[0].grid(True, alpha=0.3)
+
+    axes[1].plot(golden_frame_im, 'b-', label='Golden', linewidth=1, alpha=0.8)
+    axes[1].plot(rtl_frame_im, 'r--', label='RTL', linewidth=1, alpha=0.8)
+    axes[1].set_ylabel('Imag')
+    axes[1].set_title('Imaginary Part (Signal)')
+    axes[1].grid(True, alpha=0.3)
+
+    axes[2].stem(err_re, linefmt='b-', basefmt=' ')
+    axes[2].set_ylabel('Error (Real)')
+    axes[2].set_title('Real Part Error (RTL - Golden)')
+    axes[2].grid(True, alpha=0.3)
+
+    axes[3].stem(err_im, linefmt='r-', basefmt=' ')
+    axes[3].set_ylabel('Error (Imag)')
+    axes[3].set_xlabel('Sample Index')
+    axes[3].set_title('Imaginary Part Error (RTL - Golden)')
+    axes[3].grid(True, alpha=0.3)
+
+    fig.tight_layout(rect=(0, 0, 1, 0.97))
+    fig.savefig(plot_path, dpi=150)
+    plt.close(fig)
+    return plot_path
+
 
 if __name__ == "__main__":
-    main()
+    parser = ArgumentParser(description="Verify the WIN_LUT windowed frames")
+    parser.add_argument('--plot', nargs='?', const='fail', choices=['fail', 'all'], default=None,
+                        help="Render plots in the background: failing frames (default) or all")
+    args = parser.parse_args()
+    main(plot=args.plot)
+    plotting.wait()